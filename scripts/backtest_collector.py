@@ -17,14 +17,19 @@ from config import (
     HN_ALGOLIA_API_URL, API_PER_PAGE, GITHUB_TOKEN, GITHUB_REPOSITORIES,
     GITHUB_FEATURE_LABELS, GITHUB_REACTION_THRESHOLD, USER_AGENT
 )
+from http_client import http_get
+from matcher import get_matcher
 from utils import (
-    setup_logging, DuplicateDetector, normalize_opportunity, clean_html
+    setup_logging, DuplicateDetector, get_duplicate_detector, normalize_opportunity, clean_html
 )
 from usage_tracker import UsageTracker
 
 # Setup logging
 logger = setup_logging(__name__, LOG_DIR / 'backtest.log')
 
+# Promo and Ask HN phrases matched together in one pass per story
+KEYWORD_MATCHER = get_matcher({'promo': HN_PROMO_INDICATORS, 'ask': HN_ASK_KEYWORDS})
+
 def fetch_hn_date_range(start_date: datetime, end_date: datetime, duplicate_detector: DuplicateDetector):
     """Fetch Ask HN stories for a specific date range."""
     results = []
@@ -42,7 +47,7 @@ def fetch_hn_date_range(start_date: datetime, end_date: datetime, duplicate_dete
     }
 
     try:
-        response = requests.get(HN_ALGOLIA_API_URL, params=query_params, timeout=REQUEST_TIMEOUT)
+        response = http_get(HN_ALGOLIA_API_URL, params=query_params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
 
@@ -54,13 +59,14 @@ def fetch_hn_date_range(start_date: datetime, end_date: datetime, duplicate_dete
             title = hit.get('title', '')
             story_text = hit.get('story_text', '')
             combined_text = (title + ' ' + story_text).lower()
+            matches = KEYWORD_MATCHER.match(combined_text)
 
             # Skip self-promotion
-            if any(promo in combined_text for promo in HN_PROMO_INDICATORS):
+            if 'promo' in matches:
                 continue
 
             # Check for keywords
-            matched_keywords = [kw for kw in HN_ASK_KEYWORDS if kw in combined_text]
+            matched_keywords = matches.get('ask', [])
 
             # Include if has keywords or high engagement
             if matched_keywords or hit.get('num_comments', 0) > HN_COMMENT_THRESHOLD:
@@ -132,7 +138,7 @@ def fetch_github_date_range(start_date: datetime, end_date: datetime, duplicate_
             }
 
             logger.info(f"  Searching {repo}...")
-            response = requests.get(
+            response = http_get(
                 'https://api.github.com/search/issues',
                 headers=headers,
                 params=params,
@@ -198,7 +204,7 @@ def backtest(start_date: datetime, end_date: datetime, chunk_days: int = 7):
         logger.info(f"Chunk size: {chunk_days} days")
         logger.info("")
 
-        duplicate_detector = DuplicateDetector()
+        duplicate_detector = get_duplicate_detector()
         all_hn_results = []
         all_github_results = []
 
@@ -288,7 +294,7 @@ def backtest(start_date: datetime, end_date: datetime, chunk_days: int = 7):
         logger.info(f"HackerNews opportunities: {len(all_hn_results)}")
         logger.info(f"GitHub opportunities: {len(all_github_results)}")
         logger.info(f"Total opportunities: {len(all_hn_results) + len(all_github_results)}")
-        logger.info(f"Total seen IDs tracked: {len(duplicate_detector.seen_ids)}")
+        logger.info(f"Total seen IDs tracked: {len(duplicate_detector)}")
         logger.info("=" * 60)
 
         job['items_processed'] = len(all_hn_results) + len(all_github_results)
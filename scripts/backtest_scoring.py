@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Scoring Config Grid Search
+Re-scores historical opportunities under many scoring_config.json variants.
+
+Text is scanned once: signal features are extracted for the whole history
+up front, then every variant is scored from those arrays in a process pool.
+
+Usage:
+    python3 backtest_scoring.py grid.json [--source processed|raw] [--days N] [--workers N]
+
+grid.json maps dotted config paths to candidate values; the grid is their
+cartesian product, applied on top of the current scoring_config.json:
+
+    {
+      "pain_point_signals.strong_pain.score": [10, 14, 18],
+      "source_weights.hackernews": [12, 15],
+      "thresholds.high_quality": [55, 60]
+    }
+"""
+import argparse
+import copy
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from config import DATA_DIR, RAW_DIR, PROCESSED_DIR, LOG_DIR
+from scoring import SCORING_CONFIG, config_phrases, extract_features, score_features, np
+from utils import setup_logging
+from validate import validate_opportunities
+
+REPORTS_DIR = DATA_DIR / 'reports'
+
+logger = setup_logging(__name__, LOG_DIR / 'backtest_scoring.log')
+
+# Features shipped to each worker once, by the pool initializer
+_FEATURES = None
+
+
+def load_history(source: str = 'processed', days_back: int = 0) -> List[Dict[str, Any]]:
+    """
+    Load historical opportunities from processed or raw JSONL files.
+
+    Raw items are validated the same way process_opportunities does.
+    days_back=0 loads everything.
+    """
+    if source == 'raw':
+        files = sorted(RAW_DIR.glob('*.jsonl'))
+    else:
+        files = sorted(PROCESSED_DIR.glob('opportunities_*.jsonl'))
+
+    if days_back:
+        cutoff = (datetime.now() - timedelta(days=days_back)).timestamp()
+        files = [f for f in files if f.stat().st_mtime >= cutoff]
+
+    opps = []
+    for file in files:
+        with open(file, 'r') as f:
+            for line in f:
+                try:
+                    data = json.loads(line.strip())
+                except json.JSONDecodeError:
+                    continue
+                if data.get('_metadata'):
+                    continue
+                opps.append(data)
+
+    if source == 'raw':
+        opps, errors = validate_opportunities(opps)
+        if errors:
+            logger.info(f"Skipped {len(errors)} invalid raw opportunities")
+
+    logger.info(f"Loaded {len(opps)} {source} opportunities from {len(files)} files")
+    return opps
+
+
+def set_path(config: Dict[str, Any], dotted: str, value: Any) -> None:
+    """Set a nested config value; the path must already exist."""
+    keys = dotted.split('.')
+    node = config
+    for key in keys[:-1]:
+        if key not in node:
+            raise ValueError(f"Unknown config path: {dotted}")
+        node = node[key]
+    if keys[-1] not in node:
+        raise ValueError(f"Unknown config path: {dotted}")
+    node[keys[-1]] = value
+
+
+def build_variants(grid: Dict[str, List[Any]], base: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of grid values applied on top of base.
+
+    Returns [{'overrides': {...}, 'config': {...}}, ...] with the unmodified
+    base config first, as the reference point.
+    """
+    paths = list(grid)
+    variants = [{'overrides': {}, 'config': base}]
+    for values in itertools.product(*(grid[p] for p in paths)):
+        overrides = dict(zip(paths, values))
+        config = copy.deepcopy(base)
+        for path, value in overrides.items():
+            set_path(config, path, value)
+        variants.append({'overrides': overrides, 'config': config})
+    return variants
+
+
+def _init_worker(features):
+    global _FEATURES
+    _FEATURES = features
+
+
+def evaluate_variant(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Score distribution and tier counts of one config over the shared features."""
+    scores = score_features(_FEATURES, config)
+    thresholds = config['thresholds']
+    summary = {
+        'mean': float(scores.mean()) if len(scores) else 0.0,
+        'p50': float(np.percentile(scores, 50)) if len(scores) else 0.0,
+        'p90': float(np.percentile(scores, 90)) if len(scores) else 0.0,
+        'max': float(scores.max()) if len(scores) else 0.0,
+        'top_tier': int((scores >= thresholds['top_tier']).sum()),
+        'high_quality': int((scores >= thresholds['high_quality']).sum()),
+        'above_minimum': int((scores >= thresholds['minimum_score']).sum()),
+    }
+    llm_config = config.get('llm_config', {})
+    if 'threshold' in llm_config:
+        summary['llm_candidates'] = int((scores >= llm_config['threshold']).sum())
+    return summary
+
+
+def run_grid(opps: List[Dict[str, Any]], variants: List[Dict[str, Any]], workers: int) -> List[Dict[str, Any]]:
+    """Extract features once, then evaluate every variant across a process pool."""
+    # One vocabulary covering every variant, so phrase-list overrides need no rescan
+    phrases = []
+    for variant in variants:
+        phrases.extend(config_phrases(variant['config']))
+
+    start = time.time()
+    features = extract_features(opps, phrases)
+    logger.info(f"Extracted features for {len(opps)} items in {time.time() - start:.2f}s")
+
+    start = time.time()
+    configs = [v['config'] for v in variants]
+    chunksize = max(1, len(configs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as executor:
+        summaries = list(executor.map(evaluate_variant, configs, chunksize=chunksize))
+    elapsed = time.time() - start
+    logger.info(f"Evaluated {len(configs)} variants in {elapsed:.2f}s "
+                f"({elapsed / len(configs) * 1000:.1f}ms each)")
+
+    return [{'overrides': v['overrides'], **s} for v, s in zip(variants, summaries)]
+
+
+def format_results(results: List[Dict[str, Any]], sort_key: str, top: int) -> str:
+    """Plain-text table of results, baseline first."""
+    baseline, rest = results[0], results[1:]
+    if sort_key != 'variant':
+        rest = sorted(rest, key=lambda r: r[sort_key], reverse=True)
+    rows = [baseline] + rest[:top]
+
+    lines = [f"{'mean':>6} {'p50':>5} {'p90':>5} {'80+':>5} {'60+':>5} {'40+':>5}  overrides"]
+    for r in rows:
+        label = ', '.join(f"{k}={v}" for k, v in r['overrides'].items()) or '(baseline)'
+        lines.append(f"{r['mean']:6.1f} {r['p50']:5.0f} {r['p90']:5.0f} "
+                     f"{r['top_tier']:5d} {r['high_quality']:5d} {r['above_minimum']:5d}  {label}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Grid search over scoring config variants')
+    parser.add_argument('grid', help='JSON file mapping dotted config paths to lists of values')
+    parser.add_argument('--source', choices=['processed', 'raw'], default='processed')
+    parser.add_argument('--days', type=int, default=0, help='Only files modified in the last N days (0 = all)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--sort', default='high_quality',
+                        choices=['variant', 'mean', 'p50', 'p90', 'top_tier', 'high_quality', 'above_minimum'])
+    parser.add_argument('--top', type=int, default=20, help='Variants to print (all are saved)')
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy is required for backtesting (pip install -r requirements.txt)", file=sys.stderr)
+        sys.exit(1)
+
+    with open(args.grid, 'r') as f:
+        grid = json.load(f)
+
+    variants = build_variants(grid, SCORING_CONFIG)
+    logger.info(f"Grid of {len(variants) - 1} variants over {len(grid)} parameters")
+
+    opps = load_history(args.source, args.days)
+    if not opps:
+        print("⚠️ No historical opportunities found")
+        return
+
+    results = run_grid(opps, variants, args.workers)
+
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    report_file = REPORTS_DIR / f"scoring_grid_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, 'w') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(),
+            'config_version': SCORING_CONFIG.get('version'),
+            'source': args.source,
+            'items': len(opps),
+            'grid': grid,
+            'results': results
+        }, f, indent=2)
+
+    print(format_results(results, args.sort, args.top))
+    print(f"\n📄 Report: {report_file}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"Scoring backtest failed: {e}", exc_info=True)
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
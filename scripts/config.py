@@ -196,6 +196,16 @@ API_CALL_DELAY = int(os.getenv('API_CALL_DELAY', '1'))  # seconds between reques
 RETRY_DELAY = int(os.getenv('RETRY_DELAY', '5'))  # seconds between retries
 API_PER_PAGE = int(os.getenv('API_PER_PAGE', '100'))  # max results per page
 
+# Shared HTTP connection pool (see http_client.py)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))  # hosts kept alive
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))  # connections per host
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))  # retries for idempotent requests
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '1.0'))  # seconds, doubles per retry
+
+# Reddit concurrent collection
+REDDIT_FETCH_WORKERS = int(os.getenv('REDDIT_FETCH_WORKERS', '4'))  # 1 = sequential
+REDDIT_MIN_REQUEST_INTERVAL = float(os.getenv('REDDIT_MIN_REQUEST_INTERVAL', '1.0'))  # seconds between requests to reddit.com
+
 # GitHub-specific settings
 GITHUB_RATE_LIMIT_WARNING = int(os.getenv('GITHUB_RATE_LIMIT_WARNING', '10'))
 GITHUB_REACTION_THRESHOLD = int(os.getenv('GITHUB_REACTION_THRESHOLD', '2'))
@@ -205,6 +215,9 @@ GITHUB_SEARCH_API_URL = os.getenv('GITHUB_SEARCH_API_URL', 'https://api.github.c
 # HackerNews API
 HN_ALGOLIA_API_URL = os.getenv('HN_ALGOLIA_API_URL', 'https://hn.algolia.com/api/v1/search')
 
+# OpenRouter API (point at scripts/openrouter_stub.py for offline runs)
+OPENROUTER_BASE_URL = os.getenv('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1/chat/completions')
+
 # Scoring Configuration
 MIN_OPPORTUNITY_SCORE = int(os.getenv('MIN_OPPORTUNITY_SCORE', '50'))
 
@@ -222,6 +235,13 @@ USER_AGENT = os.getenv('USER_AGENT', 'OpenClaw SaaS Hunter Bot (feedparser; Cont
 
 # Duplicate Detection
 SEEN_IDS_FILE = DATA_DIR / 'seen_ids.json'
+DEDUP_BACKEND = os.getenv('DEDUP_BACKEND', 'json')  # 'json' or 'sqlite'
+SEEN_IDS_DB = DATA_DIR / 'seen_ids.db'
+SEEN_IDS_TTL_DAYS = int(os.getenv('SEEN_IDS_TTL_DAYS', '90'))  # sqlite backend only, 0 = keep forever
+STATE_LOCK_TIMEOUT = int(os.getenv('STATE_LOCK_TIMEOUT', '60'))  # seconds to wait for other runs' locks
+
+# Conditional GET cache for RSS feeds (ETag / Last-Modified / newest entry)
+FEED_CACHE_FILE = DATA_DIR / 'feed_cache.json'
 
 # Content Limits
 BODY_PREVIEW_LENGTH = int(os.getenv('BODY_PREVIEW_LENGTH', '500'))  # characters
@@ -234,6 +254,8 @@ DIGEST_TOP_TIER_LIMIT = int(os.getenv('DIGEST_TOP_TIER_LIMIT', '5'))
 DIGEST_HIGH_POTENTIAL_LIMIT = int(os.getenv('DIGEST_HIGH_POTENTIAL_LIMIT', '5'))
 DIGEST_WORTH_EXPLORING_LIMIT = int(os.getenv('DIGEST_WORTH_EXPLORING_LIMIT', '10'))
 DIGEST_BODY_PREVIEW = int(os.getenv('DIGEST_BODY_PREVIEW', '200'))  # Preview length in digest
+DIGEST_STATE_FILE = DATA_DIR / 'digest_state.json'  # hourly digest summaries kept by process_opportunities
+DIGEST_STATE_RETENTION_HOURS = int(os.getenv('DIGEST_STATE_RETENTION_HOURS', '48'))  # longer windows read the store
 
 # Telegram Settings
 TELEGRAM_TOP_N = int(os.getenv('TELEGRAM_TOP_N', '3'))  # Top N opportunities for Telegram
@@ -241,5 +263,37 @@ TELEGRAM_TOP_N = int(os.getenv('TELEGRAM_TOP_N', '3'))  # Top N opportunities fo
 # Budget Settings
 MONTHLY_BUDGET_USD = float(os.getenv('MONTHLY_BUDGET_USD', '15.0'))
 
+# LLM Enhancement
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', '8'))  # concurrent OpenRouter requests, keep <= HTTP_POOL_MAXSIZE
+LLM_REQUEST_TIMEOUT = int(os.getenv('LLM_REQUEST_TIMEOUT', '30'))  # seconds per OpenRouter request
+LLM_BATCH_SIZE = int(os.getenv('LLM_BATCH_SIZE', '5'))  # opportunities per prompt, 1 = one request each
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))  # retries on 429/5xx/timeouts
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '1.0'))  # seconds, window doubles per retry
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '30.0'))  # seconds, also caps Retry-After
+LLM_CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('LLM_CIRCUIT_BREAKER_THRESHOLD', '5'))  # consecutive failed calls, 0 = off
+LLM_CIRCUIT_BREAKER_COOLDOWN = float(os.getenv('LLM_CIRCUIT_BREAKER_COOLDOWN', '60'))  # seconds before a trial call
+
+# LLM budget scheduling (candidates beyond this run's share of the budget wait for a later run)
+LLM_BUDGET_PACING = os.getenv('LLM_BUDGET_PACING', 'true').lower() == 'true'  # false = may spend all that remains
+LLM_RUNS_PER_DAY = int(os.getenv('LLM_RUNS_PER_DAY', '4'))  # processing runs per day (cron every 6h)
+LLM_DEFERRED_FILE = DATA_DIR / 'llm_deferred.json'
+LLM_DEFER_MAX_HOURS = int(os.getenv('LLM_DEFER_MAX_HOURS', '24'))  # then released with base score
+
+# LLM result cache (keyed on opportunity text, model and prompt version)
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_DB = DATA_DIR / 'llm_cache.db'
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '50000'))  # 0 = unlimited
+LLM_CACHE_MAX_AGE_DAYS = int(os.getenv('LLM_CACHE_MAX_AGE_DAYS', '30'))  # 0 = never expire
+
 # Processing Settings
+INGEST_LEDGER_FILE = DATA_DIR / 'ingest_ledger.json'  # bytes of each raw file already processed
+OPPORTUNITY_STORE_DB = DATA_DIR / 'opportunities.db'  # indexed copy of processed opportunities
+QUANTILE_SKETCH_DB = DATA_DIR / 'quantile_sketches.db'  # daily score/engagement sketches per source
+ROLLUP_DB = DATA_DIR / 'rollups.db'  # daily (source, domain, score bucket) rollups for reviews
+SKETCH_K = int(os.getenv('SKETCH_K', '200'))  # sketch accuracy: ~1.7/K rank error, exact up to K values
 FUZZY_MATCH_THRESHOLD = int(os.getenv('FUZZY_MATCH_THRESHOLD', '75'))  # % similarity for deduplication
+
+# Cross-run near-duplicate index (SimHash signatures of processed opportunities)
+SIMILARITY_INDEX_DB = DATA_DIR / 'similarity_index.db'
+CROSS_RUN_DEDUP_DAYS = int(os.getenv('CROSS_RUN_DEDUP_DAYS', '30'))  # 0 = disabled
+SIMHASH_MAX_DISTANCE = int(os.getenv('SIMHASH_MAX_DISTANCE', '6'))  # differing bits out of 64
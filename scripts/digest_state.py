@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Rolling Digest State
+Per-hour digest summaries, updated by process_opportunities at the end of
+each run, so the digest and Telegram stages render from a few small
+buckets instead of reloading and re-ranking the whole window.
+
+Each hourly bucket holds a TierRanking (per-tier top-K, Telegram top-N,
+score counters) plus domain and pain-keyword counts. Buckets older than
+DIGEST_STATE_RETENTION_HOURS are dropped. Windows are whole hours; one
+the state does not fully cover (history from before it existed, expired
+buckets, changed tiers) is built from the opportunity store instead.
+"""
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from config import (
+    DIGEST_STATE_FILE, DIGEST_STATE_RETENTION_HOURS, DIGEST_BODY_PREVIEW, TELEGRAM_TOP_N
+)
+from matcher import get_matcher
+from opportunity_store import OpportunityStore
+from ranking import TierRanking, digest_tiers, delivery_cutoffs, delivery_ranking
+from utils import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Pain point indicators reported in the digest trends section
+PAIN_INDICATORS = ['sick of', 'frustrated', 'tired of', 'hate', 'alternative']
+PAIN_INDICATOR_MATCHER = get_matcher({'pain': PAIN_INDICATORS})
+
+BUCKET_FORMAT = '%Y%m%d%H'
+# Applied runs remembered, so a run redone after a crash is not counted twice
+MAX_APPLIED_RUNS = 50
+
+# Fields kept for ranked opportunities (all the digest and Telegram render)
+RENDER_FIELDS = ('opportunity_id', 'title', 'score', 'source', 'url', 'domain', 'engagement_data', 'processed_at')
+
+
+def floor_hour(when: datetime) -> datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def compact(opp: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of an opportunity needed to render it"""
+    item = {field: opp[field] for field in RENDER_FIELDS if field in opp}
+    item['body'] = opp.get('body', '')[:DIGEST_BODY_PREVIEW]
+    return item
+
+
+def pain_keywords(opp: Dict[str, Any]) -> List[str]:
+    text = (opp.get('title', '') + ' ' + opp.get('body', '')).lower()
+    return PAIN_INDICATOR_MATCHER.match(text).get('pain', [])
+
+
+def layout() -> Dict[str, Any]:
+    """What a saved ranking depends on; state saved under another layout is discarded"""
+    return {'tiers': digest_tiers(), 'top_n': TELEGRAM_TOP_N, 'cutoffs': delivery_cutoffs(),
+            'body_preview': DIGEST_BODY_PREVIEW}
+
+
+class DigestSummary:
+    """Ranking plus domain and pain-keyword counts for one window"""
+
+    def __init__(self):
+        self.ranking = delivery_ranking(TELEGRAM_TOP_N)
+        self.domains: Counter = Counter()
+        self.keywords: Counter = Counter()
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        self.ranking.add(compact(opp))
+        self.domains[opp.get('domain', 'other')] += 1
+        for keyword in pain_keywords(opp):
+            self.keywords[keyword] += 1
+
+    def merge(self, other: 'DigestSummary') -> 'DigestSummary':
+        """Fold in a summary of later opportunities"""
+        self.ranking.merge(other.ranking)
+        self.domains.update(other.domains)
+        self.keywords.update(other.keywords)
+        return self
+
+    @property
+    def total(self) -> int:
+        return self.ranking.total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'ranking': self.ranking.to_dict(), 'domains': dict(self.domains), 'keywords': dict(self.keywords)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DigestSummary':
+        summary = cls()
+        summary.ranking = TierRanking.from_dict(data['ranking'], digest_tiers(), TELEGRAM_TOP_N, delivery_cutoffs())
+        summary.domains = Counter(data['domains'])
+        summary.keywords = Counter(data['keywords'])
+        return summary
+
+    @classmethod
+    def from_opportunities(cls, opps: Iterable[Dict[str, Any]]) -> 'DigestSummary':
+        summary = cls()
+        for opp in opps:
+            summary.add(opp)
+        return summary
+
+
+class DigestState:
+    """
+    Hourly DigestSummary buckets, persisted between runs.
+
+    add() collects this run's opportunities; save() folds them into the
+    stored buckets and expires old ones.
+    """
+
+    def __init__(self, state_file: Path = DIGEST_STATE_FILE, retention_hours: int = DIGEST_STATE_RETENTION_HOURS):
+        self.state_file = state_file
+        self.retention_hours = retention_hours
+        self._pending: Dict[str, DigestSummary] = {}
+        data = self._load()
+        if data.get('layout') != json.loads(json.dumps(layout())):
+            if data:
+                logger.info("Digest tiers or limits changed, starting a new digest state")
+            data = {}
+        self.started_at = datetime.fromisoformat(data['started_at']) if data else datetime.now()
+        self.buckets: Dict[str, Dict[str, Any]] = data.get('buckets', {})
+        self.applied_runs: List[str] = data.get('applied_runs', [])
+
+    def _load(self) -> Dict[str, Any]:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.error(f"Failed to load digest state: {e}")
+        return {}
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        """Count a processed opportunity in its processing hour"""
+        hour = datetime.fromisoformat(opp['processed_at']).strftime(BUCKET_FORMAT)
+        self._pending.setdefault(hour, DigestSummary()).add(opp)
+
+    def save(self, run_id: Optional[str] = None) -> None:
+        """
+        Fold this run into the stored buckets, expire old ones and persist
+
+        run_id identifies the run; a run already applied (redone after a
+        crash) is not counted again.
+        """
+        if run_id is not None and run_id in self.applied_runs:
+            logger.info(f"Digest state already includes run {run_id}")
+        else:
+            for hour in sorted(self._pending):
+                if hour in self.buckets:
+                    bucket = DigestSummary.from_dict(self.buckets[hour]).merge(self._pending[hour])
+                else:
+                    bucket = self._pending[hour]
+                self.buckets[hour] = bucket.to_dict()
+            if run_id is not None:
+                self.applied_runs = (self.applied_runs + [run_id])[-MAX_APPLIED_RUNS:]
+        self._pending = {}
+
+        horizon = floor_hour(datetime.now() - timedelta(hours=self.retention_hours)).strftime(BUCKET_FORMAT)
+        self.buckets = {hour: bucket for hour, bucket in self.buckets.items() if hour >= horizon}
+
+        try:
+            atomic_write_json(self.state_file, {
+                'layout': layout(),
+                'started_at': self.started_at.isoformat(),
+                'buckets': self.buckets,
+                'applied_runs': self.applied_runs,
+                'last_updated': datetime.now().isoformat()
+            })
+        except IOError as e:
+            logger.error(f"Failed to save digest state: {e}")
+
+    def covers(self, since: datetime, now: Optional[datetime] = None) -> bool:
+        """True if every bucket from since's hour onwards is complete and kept"""
+        now = now or datetime.now()
+        start = floor_hour(since)
+        return start >= self.started_at and start >= floor_hour(now - timedelta(hours=self.retention_hours))
+
+    def window(self, since: datetime) -> DigestSummary:
+        """Merged summary of the buckets from since's hour onwards"""
+        first = floor_hour(since).strftime(BUCKET_FORMAT)
+        summary = DigestSummary()
+        for hour in sorted(self.buckets):
+            if hour >= first:
+                summary.merge(DigestSummary.from_dict(self.buckets[hour]))
+        return summary
+
+
+def load_summary(since: datetime) -> DigestSummary:
+    """
+    Digest summary of opportunities processed from the start of since's
+    hour, from the rolling state when it covers the window, else from the
+    store
+    """
+    state = DigestState()
+    if state.covers(since):
+        return state.window(since)
+
+    logger.info("Digest state does not cover the window, summarizing from the opportunity store")
+    store = OpportunityStore()
+    try:
+        return DigestSummary.from_opportunities(store.recent(floor_hour(since)))
+    finally:
+        store.close()
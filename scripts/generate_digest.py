@@ -2,17 +2,14 @@
 """
 Generate Daily Digest - Create markdown summary of top opportunities
 """
-import json
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
 from usage_tracker import UsageTracker
 from utils import setup_logging
+from digest_state import load_summary
 from config import (
-    LOG_DIR, PROCESSED_DIR, DIGEST_HOURS_BACK,
-    DIGEST_TOP_TIER_LIMIT, DIGEST_HIGH_POTENTIAL_LIMIT, DIGEST_WORTH_EXPLORING_LIMIT,
-    DIGEST_BODY_PREVIEW
+    LOG_DIR, DIGEST_HOURS_BACK, DIGEST_BODY_PREVIEW
 )
 from scoring import SCORING_CONFIG
 
@@ -24,41 +21,11 @@ DIGEST_DIR.mkdir(parents=True, exist_ok=True)
 # Setup logging
 logger = setup_logging(__name__, LOG_DIR / 'digest.log')
 
-def load_recent_opportunities(hours=None):
-    """Load processed opportunities from last N hours"""
+def load_recent_summary(hours=None):
+    """Digest summary of opportunities processed in the last N hours"""
     if hours is None:
         hours = DIGEST_HOURS_BACK
-    cutoff = datetime.now() - timedelta(hours=hours)
-    opportunities = []
-    
-    # Load from today's JSONL file
-    today = datetime.now().strftime('%Y%m%d')
-    jsonl_file = PROCESSED_DIR / f'opportunities_{today}.jsonl'
-    
-    if not jsonl_file.exists():
-        return []
-    
-    with open(jsonl_file, 'r') as f:
-        for line in f:
-            opp = json.loads(line)
-            # Check if processed recently
-            processed_at = datetime.fromisoformat(opp['processed_at'])
-            if processed_at > cutoff:
-                opportunities.append(opp)
-    
-    # Also check yesterday's file if we're early in the day
-    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
-    yesterday_file = PROCESSED_DIR / f'opportunities_{yesterday}.jsonl'
-    
-    if yesterday_file.exists():
-        with open(yesterday_file, 'r') as f:
-            for line in f:
-                opp = json.loads(line)
-                processed_at = datetime.fromisoformat(opp['processed_at'])
-                if processed_at > cutoff:
-                    opportunities.append(opp)
-    
-    return opportunities
+    return load_summary(datetime.now() - timedelta(hours=hours))
 
 def format_opportunity(opp, rank):
     """Format single opportunity for digest"""
@@ -94,35 +61,12 @@ def format_opportunity(opp, rank):
     
     return md
 
-def analyze_trends(opportunities):
-    """Analyze trends across opportunities"""
-    # Group by domain
-    by_domain = defaultdict(list)
-    for opp in opportunities:
-        by_domain[opp.get('domain', 'other')].append(opp)
-    
-    # Common keywords
-    keywords = defaultdict(int)
-    pain_indicators = ['sick of', 'frustrated', 'tired of', 'hate', 'alternative']
-    
-    for opp in opportunities:
-        text = (opp.get('title', '') + ' ' + opp.get('body', '')).lower()
-        for keyword in pain_indicators:
-            if keyword in text:
-                keywords[keyword] += 1
-    
-    return {
-        'domains': dict(by_domain),
-        'keywords': dict(keywords)
-    }
-
-def generate_digest(opportunities):
-    """Generate markdown digest"""
-    if not opportunities:
+def generate_digest(summary):
+    """Generate markdown digest from a DigestSummary"""
+    if not summary.total:
         return None
 
-    # Sort by score
-    sorted_opps = sorted(opportunities, key=lambda x: x.get('score', 0), reverse=True)
+    ranking = summary.ranking
 
     # Date
     date_str = datetime.now().strftime('%B %d, %Y')
@@ -134,31 +78,31 @@ def generate_digest(opportunities):
 
     # Start digest
     md = f"# SaaS Opportunities — {date_str}\n\n"
-    md += f"**Summary:** {len(opportunities)} opportunities collected and processed\n\n"
+    md += f"**Summary:** {ranking.total} opportunities collected and processed\n\n"
     md += "---\n\n"
 
     # Top tier
-    top_tier = [o for o in sorted_opps if o.get('score', 0) >= top_tier_threshold]
+    top_tier = ranking.tier('top_tier')
     if top_tier:
         md += f"## 🔥 Top Opportunities (Score {top_tier_threshold}+)\n\n"
-        for i, opp in enumerate(top_tier[:DIGEST_TOP_TIER_LIMIT], 1):
+        for i, opp in enumerate(top_tier, 1):
             md += format_opportunity(opp, i)
         md += "---\n\n"
 
     # High potential
-    high_potential = [o for o in sorted_opps if high_quality_threshold <= o.get('score', 0) < top_tier_threshold]
+    high_potential = ranking.tier('high_potential')
     if high_potential:
         md += f"## ⭐ High Potential (Score {high_quality_threshold}-{top_tier_threshold-1})\n\n"
-        for i, opp in enumerate(high_potential[:DIGEST_HIGH_POTENTIAL_LIMIT], 1):
+        for i, opp in enumerate(high_potential, 1):
             md += format_opportunity(opp, i)
         md += "---\n\n"
 
     # Worth exploring
-    worth_exploring = [o for o in sorted_opps if minimum_score <= o.get('score', 0) < high_quality_threshold]
+    worth_exploring = ranking.tier('worth_exploring')
     if worth_exploring:
         md += f"## 💡 Worth Exploring (Score {minimum_score}-{high_quality_threshold-1})\n\n"
         # Just titles for this tier
-        for opp in worth_exploring[:DIGEST_WORTH_EXPLORING_LIMIT]:
+        for opp in worth_exploring:
             title = opp['title']
             score = opp['score']
             source = opp['source']
@@ -166,30 +110,28 @@ def generate_digest(opportunities):
         md += "\n---\n\n"
     
     # Trends
-    trends = analyze_trends(opportunities)
-    
     md += "## 📊 Trends\n\n"
     
     # Domain breakdown
-    if trends['domains']:
+    if summary.domains:
         md += "**By Domain:**\n"
-        for domain, opps in sorted(trends['domains'].items(), key=lambda x: len(x[1]), reverse=True)[:5]:
-            md += f"- {domain.capitalize()}: {len(opps)} opportunities\n"
+        for domain, count in sorted(summary.domains.items(), key=lambda x: x[1], reverse=True)[:5]:
+            md += f"- {domain.capitalize()}: {count} opportunities\n"
         md += "\n"
     
     # Pain point keywords
-    if trends['keywords']:
+    if summary.keywords:
         md += "**Pain Point Indicators:**\n"
-        for keyword, count in sorted(trends['keywords'].items(), key=lambda x: x[1], reverse=True):
+        for keyword, count in sorted(summary.keywords.items(), key=lambda x: x[1], reverse=True):
             md += f"- '{keyword}': {count} mentions\n"
         md += "\n"
     
     # Footer
     md += "---\n\n"
-    md += f"**Collected:** {len(opportunities)} total | "
+    md += f"**Collected:** {ranking.total} total | "
     
-    score_80_plus = len([o for o in opportunities if o.get('score', 0) >= 80])
-    score_60_plus = len([o for o in opportunities if o.get('score', 0) >= 60])
+    score_80_plus = ranking.count(80)
+    score_60_plus = ranking.count(60)
     
     md += f"**High Quality:** {score_60_plus} (60+) | "
     md += f"**Top Tier:** {score_80_plus} (80+)\n\n"
@@ -207,18 +149,19 @@ def main():
         logger.info("Generating Daily Digest")
         logger.info("=" * 60)
         
-        # Load recent opportunities
-        opportunities = load_recent_opportunities()
-        logger.info(f"Loaded {len(opportunities)} opportunities from last 24h")
+        # Load the ranked summary of recent opportunities
+        summary = load_recent_summary()
+        total = summary.total
+        logger.info(f"Loaded {total} opportunities from last {DIGEST_HOURS_BACK}h")
         
-        if not opportunities:
+        if not total:
             logger.warning("No opportunities to digest")
             print("No opportunities found for digest")
             job['items_processed'] = 0
             return
         
         # Generate digest
-        digest_md = generate_digest(opportunities)
+        digest_md = generate_digest(summary)
         
         if not digest_md:
             logger.warning("Failed to generate digest")
@@ -234,20 +177,19 @@ def main():
             f.write(digest_md)
         
         logger.info(f"Saved digest to {output}")
-        logger.info(f"Digest contains {len(opportunities)} opportunities")
+        logger.info(f"Digest contains {total} opportunities")
         
         # Log score distribution
-        scores = [o.get('score', 0) for o in opportunities]
-        avg_score = sum(scores) / len(scores) if scores else 0
-        max_score = max(scores) if scores else 0
+        avg_score = summary.ranking.average
+        max_score = summary.ranking.max_score
         
         logger.info(f"Score range: {avg_score:.1f} avg, {max_score} max")
         logger.info("=" * 60)
         
-        job['items_processed'] = len(opportunities)
+        job['items_processed'] = total
         
         # Print summary
-        print(f"✅ Generated digest with {len(opportunities)} opportunities")
+        print(f"✅ Generated digest with {total} opportunities")
         print(f"   Saved to: {output}")
         print(f"   Score range: {avg_score:.1f} avg, {max_score} max")
 
@@ -18,8 +18,9 @@ from config import (
     BODY_PREVIEW_LENGTH, GITHUB_HOURS_BACK, USER_AGENT, LOG_DIR,
     GITHUB_RATE_LIMIT_WARNING, GITHUB_REACTION_THRESHOLD, GITHUB_REPO_DELAY, GITHUB_SEARCH_API_URL
 )
+from http_client import http_get
 from utils import (
-    setup_logging, DuplicateDetector, normalize_opportunity
+    setup_logging, DuplicateDetector, get_duplicate_detector, normalize_opportunity
 )
 from usage_tracker import UsageTracker
 
@@ -58,7 +59,7 @@ def fetch_github_search_issues(hours_back: int, duplicate_detector: DuplicateDet
         while True:
             logger.info(f"  Fetching page {page} for {repo}...")
             try:
-                response = requests.get(search_api_url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+                response = http_get(search_api_url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
                 
                 # Check rate limit
                 remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
@@ -156,7 +157,7 @@ def main():
         logger.info(f"Looking back: {GITHUB_HOURS_BACK} hours")
         logger.info("")
 
-        duplicate_detector = DuplicateDetector()
+        duplicate_detector = get_duplicate_detector()
         all_results = []
 
         # Fetch issues using our combined search query
@@ -195,7 +196,7 @@ def main():
         logger.info("=" * 60)
         logger.info(f"Summary:")
         logger.info(f" Total new opportunities: {len(all_results)}")
-        logger.info(f" Total seen IDs tracked: {len(duplicate_detector.seen_ids)}")
+        logger.info(f" Total seen IDs tracked: {len(duplicate_detector)}")
         logger.info(f" Saved to: {output_file}")
         logger.info("=" * 60)
 
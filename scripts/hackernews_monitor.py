@@ -17,14 +17,19 @@ from config import (
     REQUEST_TIMEOUT, RETRY_DELAY, BODY_PREVIEW_LENGTH, COLLECTION_HOURS_BACK, LOG_DIR,
     HN_ALGOLIA_API_URL, API_PER_PAGE
 )
+from http_client import http_get
+from matcher import get_matcher
 from utils import (
-    setup_logging, DuplicateDetector, normalize_opportunity
+    setup_logging, DuplicateDetector, get_duplicate_detector, normalize_opportunity
 )
 from usage_tracker import UsageTracker
 
 # Setup logging
 logger = setup_logging(__name__, LOG_DIR / 'hackernews_monitor.log')
 
+# Promo and Ask HN phrases matched together in one pass per story
+KEYWORD_MATCHER = get_matcher({'promo': HN_PROMO_INDICATORS, 'ask': HN_ASK_KEYWORDS})
+
 def fetch_hn_ask_hn_stories(hours_back: int, duplicate_detector: DuplicateDetector):
     """Fetch Ask HN stories from Algolia API."""
     results = []
@@ -49,7 +54,7 @@ def fetch_hn_ask_hn_stories(hours_back: int, duplicate_detector: DuplicateDetect
     logger.info(f"Fetching Ask HN stories...")
     
     try:
-        response = requests.get(HN_ALGOLIA_API_URL, params=query_params, timeout=REQUEST_TIMEOUT)
+        response = http_get(HN_ALGOLIA_API_URL, params=query_params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
         data = response.json()
@@ -70,13 +75,14 @@ def fetch_hn_ask_hn_stories(hours_back: int, duplicate_detector: DuplicateDetect
             title = hit.get('title', '')
             story_text = hit.get('story_text', '')
             combined_text = (title + ' ' + story_text).lower()
+            matches = KEYWORD_MATCHER.match(combined_text)
 
             # Skip self-promotion posts
-            if any(promo in combined_text for promo in HN_PROMO_INDICATORS):
+            if 'promo' in matches:
                 continue
 
             # Check for keywords
-            matched_keywords = [kw for kw in HN_ASK_KEYWORDS if kw in combined_text]
+            matched_keywords = matches.get('ask', [])
 
             # Include if it has keywords or has significant engagement (high threshold)
             if matched_keywords or hit.get('num_comments', 0) > HN_COMMENT_THRESHOLD:
@@ -128,7 +134,7 @@ def main():
         logger.info(f"Looking back: {COLLECTION_HOURS_BACK} hours")
         logger.info("")
 
-        duplicate_detector = DuplicateDetector()
+        duplicate_detector = get_duplicate_detector()
 
         logger.info("Scanning Ask HN stories via Algolia...")
         results = fetch_hn_ask_hn_stories(hours_back=COLLECTION_HOURS_BACK, duplicate_detector=duplicate_detector)
@@ -163,7 +169,7 @@ def main():
         logger.info("=" * 60)
         logger.info(f"Summary:")
         logger.info(f" Total new opportunities: {len(results)}")
-        logger.info(f" Total seen IDs tracked: {len(duplicate_detector.seen_ids)}")
+        logger.info(f" Total seen IDs tracked: {len(duplicate_detector)}")
         logger.info(f" Saved to: {output_file}")
         logger.info("=" * 60)
 
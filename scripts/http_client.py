@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+SaaS Hunter - Shared HTTP Client
+Pooled keep-alive sessions for the collectors and the LLM scorer, so
+repeated requests to the same host reuse TCP/TLS connections.
+
+GETs go through a session that retries transient failures. POSTs use a
+session that never retries: urllib3 retries connect errors for any
+method, and the LLM scorer already retries with its own backoff and
+circuit breaker.
+"""
+import threading
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    REQUEST_TIMEOUT, USER_AGENT, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR
+)
+
+# Transient statuses worth retrying for idempotent requests
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions: Dict[bool, requests.Session] = {}
+_session_lock = threading.Lock()
+
+
+def _build_session(retrying: bool) -> requests.Session:
+    """Create a session with pooled adapters, retrying idempotent requests or nothing."""
+    if retrying:
+        retry = Retry(
+            total=HTTP_MAX_RETRIES,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False  # hand the last response back so raise_for_status() reports it
+        )
+    else:
+        retry = Retry(total=0, raise_on_status=False)
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': 'gzip, deflate'
+    })
+    return session
+
+
+def get_session(retrying: bool = True) -> requests.Session:
+    """Return the process-wide retrying (or non-retrying) session, creating it on first use."""
+    session = _sessions.get(retrying)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retrying)
+            if session is None:
+                session = _sessions[retrying] = _build_session(retrying)
+    return session
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET through the shared session (defaults to REQUEST_TIMEOUT)."""
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    return get_session().get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """POST through the non-retrying session (defaults to REQUEST_TIMEOUT)."""
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    return get_session(retrying=False).post(url, **kwargs)
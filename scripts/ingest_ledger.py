@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Raw File Ingestion Ledger
+Records, per raw JSONL file, how many bytes processing has consumed, so
+each run reads exactly the unread complete lines instead of comparing
+modification times.
+
+Output is committed in two phases: begin() records the processed file's
+size before appending, mark_written() its size and content hash once the
+append is flushed, and commit() advances the file offsets. State derived
+from the output (opportunity store, digest state, ...) is applied between
+mark_written() and commit(), keyed by run_id, and state files staged at
+begin() (the deferred LLM queue) are only moved into place by commit().
+If a run dies in between, recover() on the next start truncates a
+half-written append (the bytes are read again, staged files are dropped)
+or keeps a finished one, whose derived state the caller applies again
+before commit(), so nothing is appended or counted twice.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config import INGEST_LEDGER_FILE
+from utils import atomic_write_json
+
+# Bytes at the start of a file whose hash identifies it, to notice rewrites
+HEAD_HASH_BYTES = 4096
+
+
+def head_hash(path: Path, length: int) -> str:
+    """sha256 of the first min(length, HEAD_HASH_BYTES) bytes of path"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(min(length, HEAD_HASH_BYTES))).hexdigest()
+
+
+class IngestLedger:
+    """
+    Consumed byte offsets of raw files, persisted between runs.
+
+    Offsets read in this run are staged and only become durable through
+    begin() / mark_written() / commit().
+    """
+
+    def __init__(self, ledger_file: Path = INGEST_LEDGER_FILE):
+        self.ledger_file = ledger_file
+        data = self._load()
+        self.exists = data is not None
+        data = data or {}
+        self.files: Dict[str, Dict[str, Any]] = data.get('files', {})
+        self.pending: Optional[Dict[str, Any]] = data.get('pending')
+        self._staged: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        """Load the ledger, or None if there is none yet."""
+        if self.ledger_file.exists():
+            try:
+                with open(self.ledger_file, 'r') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logging.error(f"Failed to load ingestion ledger: {e}")
+                return {}
+        return None
+
+    def save(self) -> None:
+        """Persist the ledger (raises on failure, callers must not continue)."""
+        atomic_write_json(self.ledger_file, {
+            'files': self.files,
+            'pending': self.pending,
+            'last_updated': datetime.now().isoformat()
+        }, indent=2)
+
+    def migrate(self, raw_files: List[Path], since: datetime) -> int:
+        """
+        Seed a new ledger from the old mtime watermark
+
+        Files last modified before since count as fully consumed, as the
+        mtime-based runs treated them. Returns the number of files seeded.
+        """
+        seeded = 0
+        for path in raw_files:
+            stat = path.stat()
+            if datetime.fromtimestamp(stat.st_mtime) <= since:
+                self.files[path.name] = {
+                    'size': stat.st_size,
+                    'offset': stat.st_size,
+                    'head_sha256': head_hash(path, stat.st_size),
+                    'updated_at': datetime.now().isoformat()
+                }
+                seeded += 1
+        self.exists = True
+        self.save()
+        return seeded
+
+    def recover(self, on_rollback: Optional[Callable[[Iterator[str]], None]] = None) -> Optional[str]:
+        """
+        Deal with a run that died between begin() and commit()
+
+        A finished append stays pending: the caller re-applies its derived
+        state (see iter_written) and then calls commit(). A half-written one
+        is passed to on_rollback as lines, then truncated, and its staged
+        files are deleted.
+
+        Returns:
+            'rolled_forward', 'rolled_back' or None if nothing was pending
+        """
+        if not self.pending:
+            return None
+        pending = self.pending
+        output = Path(pending['output'])
+        output_size = output.stat().st_size if output.exists() else 0
+        written = pending.get('written_size')
+        if written is not None and output_size >= written:
+            return 'rolled_forward'
+
+        if output_size > pending['output_size']:
+            if on_rollback is not None:
+                on_rollback(self._lines(output, pending['output_size'], output_size))
+            with open(output, 'r+b') as f:
+                f.truncate(pending['output_size'])
+        for staging in pending.get('replacements', {}).values():
+            Path(staging).unlink(missing_ok=True)
+        self.pending = None
+        self.save()
+        return 'rolled_back'
+
+    @staticmethod
+    def _lines(path: Path, start: int, end: int) -> Iterator[str]:
+        """Complete lines of path between byte offsets start and end"""
+        with open(path, 'rb') as f:
+            f.seek(start)
+            position = start
+            for line in f:
+                position += len(line)
+                if position > end or not line.endswith(b'\n'):
+                    break
+                yield line.decode('utf-8', errors='replace')
+
+    def unread(self, raw_files: List[Path]) -> List[Tuple[Path, int]]:
+        """
+        Raw files with unread bytes, and the offset to start reading at
+
+        Files that shrank or whose first bytes changed were rewritten and
+        are read again from the start. Ledger entries for deleted files are
+        dropped at the next commit.
+        """
+        names = {path.name for path in raw_files}
+        for name in list(self.files):
+            if name not in names:
+                self._staged[name] = None
+
+        result = []
+        for path in raw_files:
+            entry = self.files.get(path.name)
+            size = path.stat().st_size
+            offset = 0
+            if entry:
+                offset = entry['offset']
+                if size < offset or head_hash(path, offset) != entry['head_sha256']:
+                    logging.warning(f"{path.name} was rewritten since it was ingested, reading it again")
+                    offset = 0
+            if size > offset:
+                result.append((path, offset))
+        return result
+
+    def iter_lines(self, path: Path, offset: int) -> Iterator[str]:
+        """
+        Yield complete lines of path from offset, staging the consumed offset
+
+        A trailing line without a newline is still being written and is
+        left for the next run.
+        """
+        consumed = offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                consumed += len(line)
+                yield line.decode('utf-8', errors='replace')
+        if consumed > offset:
+            self._staged[path.name] = {
+                'size': path.stat().st_size,
+                'offset': consumed,
+                'head_sha256': head_hash(path, consumed),
+                'updated_at': datetime.now().isoformat()
+            }
+
+    def begin(self, output: Path, replacements: Optional[Dict[Path, Path]] = None) -> None:
+        """
+        Record the intent to append to output, before writing
+
+        replacements maps state files to already written staging copies,
+        which commit() moves over them.
+        """
+        self.pending = {
+            'output': str(output),
+            'output_size': output.stat().st_size if output.exists() else 0,
+            'files': {name: entry for name, entry in self._staged.items() if entry is not None},
+            'replacements': {str(target): str(staging) for target, staging in (replacements or {}).items()}
+        }
+        self.save()
+
+    @property
+    def run_id(self) -> Optional[str]:
+        """
+        Identifies the written append by output file, starting size and
+        content hash; None before mark_written(). A run redone after a
+        roll-back gets a new id unless it wrote exactly the same bytes.
+        """
+        if not self.pending or 'content_sha256' not in self.pending:
+            return None
+        return (f"{Path(self.pending['output']).name}:{self.pending['output_size']}:"
+                f"{self.pending['content_sha256'][:16]}")
+
+    def mark_written(self, output_size: int, content_sha256: str) -> None:
+        """Record that the append is complete and flushed to disk, and the sha256 of its bytes"""
+        self.pending['written_size'] = output_size
+        self.pending['content_sha256'] = content_sha256
+        self.save()
+
+    def iter_written(self) -> Iterator[str]:
+        """Lines of the pending append recorded by mark_written()"""
+        return self._lines(Path(self.pending['output']), self.pending['output_size'], self.pending['written_size'])
+
+    def commit(self) -> None:
+        """Advance offsets to everything read in the pending run and install its staged files"""
+        if self.pending:
+            for target, staging in self.pending.get('replacements', {}).items():
+                if Path(staging).exists():
+                    os.replace(staging, target)
+            self.files.update(self.pending['files'])
+        for name, entry in self._staged.items():
+            if entry is None:
+                self.files.pop(name, None)
+        self._staged = {}
+        self.pending = None
+        self.save()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+LLM Scoring Cache
+Persistent, content-addressed store of parsed LLM analyses, so the same
+opportunity text is never sent to OpenRouter twice for one model and
+prompt version.
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from config import LLM_CACHE_DB, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_MAX_AGE_DAYS, STATE_LOCK_TIMEOUT
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case and collapse whitespace, so trivial reformatting still hits."""
+    return _WHITESPACE_RE.sub(' ', text or '').strip().lower()
+
+
+def cache_key(opp: Dict[str, Any], model: str, prompt_version: str) -> str:
+    """sha256 of (normalized title, normalized body, model, prompt version)."""
+    material = json.dumps([
+        normalize_text(opp.get('title', '')),
+        normalize_text(opp.get('body', '')),
+        model,
+        prompt_version
+    ])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of parsed LLM analyses keyed by cache_key.
+
+    Safe to share between scoring threads. Entries older than max_age_days
+    or beyond the max_entries most recently used are removed by prune().
+    """
+
+    def __init__(self, db_path: Path = LLM_CACHE_DB, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_age_days: int = LLM_CACHE_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            analysis TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            hit_count INTEGER NOT NULL DEFAULT 0
+        )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)')
+        self._conn.commit()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.max_age_days * 86400
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for key, or None (counts a hit or a miss)."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT analysis FROM llm_cache WHERE cache_key = ? AND created_at >= ?',
+                    (key, self._cutoff() if self.max_age_days > 0 else 0)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                with self._conn:
+                    self._conn.execute(
+                        'UPDATE llm_cache SET last_used = ?, hit_count = hit_count + 1 WHERE cache_key = ?',
+                        (time.time(), key)
+                    )
+                self.hits += 1
+                return json.loads(row[0])
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logging.warning(f"LLM cache read failed: {e}")
+                self.misses += 1
+                return None
+
+    def contains(self, key: str) -> bool:
+        """True if a live entry exists for key (does not count as a lookup)."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT 1 FROM llm_cache WHERE cache_key = ? AND created_at >= ?',
+                    (key, self._cutoff() if self.max_age_days > 0 else 0)
+                ).fetchone()
+                return row is not None
+            except sqlite3.Error:
+                return False
+
+    def put(self, key: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis (written at once, so paid results survive a crash)."""
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        '''INSERT OR REPLACE INTO llm_cache (cache_key, analysis, created_at, last_used, hit_count)
+                           VALUES (?, ?, ?, ?, 0)''',
+                        (key, json.dumps(analysis), now, now)
+                    )
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache write failed: {e}")
+
+    def prune(self) -> int:
+        """Remove expired and least recently used entries; returns rows removed."""
+        with self._lock:
+            try:
+                with self._conn:
+                    removed = 0
+                    if self.max_age_days > 0:
+                        removed += self._conn.execute(
+                            'DELETE FROM llm_cache WHERE created_at < ?', (self._cutoff(),)
+                        ).rowcount
+                    if self.max_entries > 0:
+                        removed += self._conn.execute(
+                            '''DELETE FROM llm_cache WHERE cache_key NOT IN
+                               (SELECT cache_key FROM llm_cache ORDER BY last_used DESC LIMIT ?)''',
+                            (self.max_entries,)
+                        ).rowcount
+                return removed
+            except sqlite3.Error as e:
+                logging.warning(f"LLM cache prune failed: {e}")
+                return 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the stored entry count."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
+
+    def close(self) -> None:
+        self._conn.close()
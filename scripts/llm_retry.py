@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+LLM Call Resilience
+Retry delays, a circuit breaker and per-run counters for OpenRouter calls.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from config import (
+    LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_CIRCUIT_BREAKER_THRESHOLD, LLM_CIRCUIT_BREAKER_COOLDOWN
+)
+
+# Statuses worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None,
+                  base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX) -> float:
+    """
+    Seconds to sleep before retry number attempt + 1
+
+    Full jitter over an exponentially growing window, so concurrent workers
+    throttled together do not retry in lockstep. A server's Retry-After is
+    a floor (capped at cap).
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class CircuitBreaker:
+    """
+    Stops calls after `threshold` consecutive failed calls.
+
+    While open, allow() is False. After `cooldown` seconds the breaker lets
+    one trial call through (half-open): success closes it, failure re-opens
+    it for another cooldown.
+    """
+
+    def __init__(self, threshold: int = LLM_CIRCUIT_BREAKER_THRESHOLD,
+                 cooldown: float = LLM_CIRCUIT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_count = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may be made now."""
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if self.threshold > 0 and (trial_failed or (self.opened_at is None and self.failures >= self.threshold)):
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.opened_at is not None
+
+
+class CallStats:
+    """Thread-safe counters for one processing run"""
+
+    FIELDS = ('requests', 'retries', 'rate_limited', 'failures', 'fallbacks', 'circuit_rejected')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class UsageTotals:
+    """Thread-safe token and cost totals for one processing run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals: Dict[str, Any] = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0,
+                                       'cost_usd': 0.0}
+
+    def add(self, usage_stats: Dict[str, Any], cost: float) -> None:
+        with self._lock:
+            self.totals['calls'] += 1
+            for key in ('input_tokens', 'output_tokens', 'total_tokens'):
+                self.totals[key] += usage_stats.get(key, 0)
+            self.totals['cost_usd'] += cost
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.totals)
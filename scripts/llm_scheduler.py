@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+LLM Budget Scheduler
+Decides which LLM candidates are enhanced this run: highest base score
+first, within a per-run share of the monthly budget. Candidates that do
+not fit wait in a deferred queue for a later run.
+"""
+import calendar
+import heapq
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config import LLM_BUDGET_PACING, LLM_RUNS_PER_DAY, LLM_DEFERRED_FILE, LLM_DEFER_MAX_HOURS
+from llm_cache import cache_key
+from llm_scorer import (
+    MODEL, BATCH_ITEM_MAX_TOKENS, build_scoring_prompt, build_batch_scoring_prompt,
+    calculate_cost, get_cache, prompt_version
+)
+from utils import atomic_write_json
+
+# Rough tokenizer-free estimate for English prompts
+CHARS_PER_TOKEN = 4
+# Typical answer length per opportunity (score, 1-2 sentences, 2-3 signals)
+EST_OUTPUT_TOKENS = 120
+
+
+def run_allowance(tracker, now: Optional[datetime] = None) -> float:
+    """
+    USD this run may spend on the LLM
+
+    The remaining monthly budget (per UsageTracker) spread evenly over the
+    runs left this month, or all of it when pacing is disabled.
+    """
+    now = now or datetime.now()
+    remaining = max(0.0, tracker.get_monthly_usage(now.strftime('%Y-%m'))['budget_remaining'])
+    if not LLM_BUDGET_PACING:
+        return remaining
+
+    days_in_month = calendar.monthrange(now.year, now.month)[1]
+    month_end = datetime(now.year, now.month, days_in_month, 23, 59, 59)
+    hours_left = (month_end - now).total_seconds() / 3600
+    runs_left = max(1, math.ceil(hours_left * LLM_RUNS_PER_DAY / 24))
+    return remaining / runs_left
+
+
+def estimate_cost(base_score: int, opp: Dict[str, Any], batch_size: int) -> float:
+    """Expected USD for enhancing one opportunity, from prompt length"""
+    if batch_size <= 1:
+        input_chars = len(build_scoring_prompt(opp, base_score))
+    else:
+        # Own section plus a share of the instructions sent once per batch
+        instructions = len(build_batch_scoring_prompt([]))
+        own_section = len(build_batch_scoring_prompt([(base_score, opp)])) - instructions
+        input_chars = own_section + instructions / batch_size
+    output_tokens = min(EST_OUTPUT_TOKENS, BATCH_ITEM_MAX_TOKENS)
+    return calculate_cost({'input_tokens': input_chars / CHARS_PER_TOKEN, 'output_tokens': output_tokens})
+
+
+def candidate_cost(base_score: int, opp: Dict[str, Any], batch_size: int) -> Optional[float]:
+    """Estimated USD for one candidate, or None if a cached analysis makes it free"""
+    cache = get_cache()
+    if cache and cache.contains(cache_key(opp, MODEL, prompt_version(batch_size > 1))):
+        return None
+    return estimate_cost(base_score, opp, batch_size)
+
+
+def plan_schedule(costs: List[Tuple[int, Optional[float]]], allowance: float) -> Tuple[List[int], List[int], float]:
+    """
+    Choose candidates to enhance from (base_score, cost) pairs
+
+    Candidates are taken highest base score first (ties in input order)
+    until the next paid one would exceed the allowance. Free candidates
+    (cost None, i.e. cached) are always scheduled.
+
+    Returns:
+        Tuple of (scheduled, deferred, estimated_cost); scheduled and
+        deferred are indices into costs, in priority order
+    """
+    heap = [(-base_score, seq) for seq, (base_score, _) in enumerate(costs)]
+    heapq.heapify(heap)
+
+    scheduled, deferred = [], []
+    estimated = 0.0
+    exhausted = False
+    while heap:
+        _, seq = heapq.heappop(heap)
+        cost = costs[seq][1]
+        if cost is None:
+            scheduled.append(seq)
+            continue
+        if exhausted or estimated + cost > allowance:
+            # Keep strict priority: nothing cheaper jumps ahead of a deferred item
+            exhausted = True
+            deferred.append(seq)
+            continue
+        estimated += cost
+        scheduled.append(seq)
+
+    return scheduled, deferred, estimated
+
+
+class DeferredQueue:
+    """
+    Opportunities waiting for LLM budget, persisted between runs.
+
+    Queued opportunities rejoin the next run's candidates; after
+    max_hours in the queue they are released with their base score.
+    """
+
+    def __init__(self, queue_file: Path = LLM_DEFERRED_FILE, max_hours: int = LLM_DEFER_MAX_HOURS):
+        self.queue_file = queue_file
+        self.max_hours = max_hours
+        self.entries: List[Dict[str, Any]] = self._load()
+        self._queued_at: Dict[str, float] = {}
+
+    def _load(self) -> List[Dict[str, Any]]:
+        """Load queued entries from file."""
+        if self.queue_file.exists():
+            try:
+                with open(self.queue_file, 'r') as f:
+                    return json.load(f).get('entries', [])
+            except (json.JSONDecodeError, IOError) as e:
+                logging.error(f"Failed to load deferred LLM queue: {e}")
+        return []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _key(opp: Dict[str, Any]) -> str:
+        return f"{opp.get('source')}:{opp.get('source_id')}"
+
+    def take_all(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Empty the queue into this run
+
+        Returns:
+            Tuple of (waiting, expired) opportunities; re-add waiting ones
+            that are deferred again with add()
+        """
+        cutoff = time.time() - self.max_hours * 3600
+        waiting, expired = [], []
+        for entry in self.entries:
+            opp = entry['opportunity']
+            if entry['queued_at'] < cutoff:
+                expired.append(opp)
+            else:
+                self._queued_at[self._key(opp)] = entry['queued_at']
+                waiting.append(opp)
+        self.entries = []
+        return waiting, expired
+
+    def add(self, opps: List[Dict[str, Any]]) -> None:
+        """Queue opportunities, keeping the original time for re-deferred ones"""
+        now = time.time()
+        for opp in opps:
+            self.entries.append({'queued_at': self._queued_at.get(self._key(opp), now), 'opportunity': opp})
+
+    def save(self, path: Optional[Path] = None) -> None:
+        """Persist the queue (to path instead of queue_file, to be moved into place later)."""
+        try:
+            atomic_write_json(path or self.queue_file, {
+                'entries': self.entries,
+                'last_updated': datetime.now().isoformat(),
+                'total_count': len(self.entries)
+            })
+        except IOError as e:
+            logging.error(f"Failed to save deferred LLM queue: {e}")
@@ -5,11 +5,25 @@ Uses Claude Haiku via OpenRouter for enhanced opportunity scoring
 """
 import os
 import json
+import logging
+import sqlite3
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional
 from dotenv import load_dotenv
 from scoring import SCORING_CONFIG
+from http_client import http_post
+from config import (
+    OPENROUTER_BASE_URL, LLM_MAX_IN_FLIGHT, LLM_REQUEST_TIMEOUT, LLM_CACHE_ENABLED, LLM_BATCH_SIZE,
+    LLM_MAX_RETRIES
+)
+from llm_cache import LLMCache, cache_key
+from llm_retry import (
+    RETRYABLE_STATUSES, CallStats, CircuitBreaker, CircuitOpenError, UsageTotals, backoff_delay, parse_retry_after
+)
 
 # Load environment variables
 ENV_FILE = Path(__file__).parent.parent / '.env'
@@ -23,7 +37,6 @@ if SCRIPTS_ENV.exists():
 
 # OpenRouter configuration
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', '')
-OPENROUTER_BASE_URL = 'https://openrouter.ai/api/v1/chat/completions'
 
 # Model configuration from scoring_config.json
 LLM_CONFIG = SCORING_CONFIG.get('llm_config', {})
@@ -31,11 +44,49 @@ MODEL = LLM_CONFIG.get('model', 'anthropic/claude-3-haiku')
 LLM_WEIGHT = LLM_CONFIG.get('weight', 0.4)
 BASE_WEIGHT = LLM_CONFIG.get('base_weight', 0.6)
 
+# Output budget per opportunity in batch prompts
+BATCH_ITEM_MAX_TOKENS = 200
+
+# Bump when build_scoring_prompt / build_batch_scoring_prompt changes meaningfully,
+# so cached analyses are not reused
+PROMPT_VERSION = '1'
+BATCH_PROMPT_VERSION = '1'
+
+# Shared by all scoring threads for the life of the process (one processing run)
+CIRCUIT_BREAKER = CircuitBreaker()
+CALL_STATS = CallStats()
+# Paid calls whose answer scored no opportunity, so their cost is not on any llm_analysis
+UNATTRIBUTED_USAGE = UsageTotals()
+
+_cache = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the shared LLM result cache, or None if caching is disabled."""
+    global _cache, _cache_failed
+    if not LLM_CACHE_ENABLED or _cache_failed:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None and not _cache_failed:
+                try:
+                    _cache = LLMCache()
+                except sqlite3.Error as e:
+                    logging.warning(f"LLM cache unavailable, scoring without it: {e}")
+                    _cache_failed = True
+    return _cache
+
 
 def call_openrouter(prompt: str, max_tokens: int = 500) -> Tuple[Optional[str], Dict[str, Any]]:
     """
     Call OpenRouter API with Claude Haiku
 
+    Throttling (429), transient 5xx errors and timeouts are retried up to
+    LLM_MAX_RETRIES times with jittered exponential backoff, honouring
+    Retry-After. Calls fail fast while the circuit breaker is open.
+
     Args:
         prompt: The prompt to send
         max_tokens: Maximum tokens in response
@@ -65,32 +116,65 @@ def call_openrouter(prompt: str, max_tokens: int = 500) -> Tuple[Optional[str],
         'temperature': 0.3,  # Lower temperature for more consistent scoring
     }
 
-    try:
-        response = requests.post(
-            OPENROUTER_BASE_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        response.raise_for_status()
-
-        data = response.json()
-
-        # Extract response and usage
-        content = data['choices'][0]['message']['content']
-        usage = data.get('usage', {})
-
-        return content, {
-            'input_tokens': usage.get('prompt_tokens', 0),
-            'output_tokens': usage.get('completion_tokens', 0),
-            'total_tokens': usage.get('total_tokens', 0),
-            'model': MODEL
-        }
-
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"OpenRouter API error: {e}")
-    except (KeyError, IndexError) as e:
-        raise Exception(f"Invalid API response format: {e}")
+    # Once per call: a half-open trial keeps its own retries, and always
+    # ends in record_success() or record_failure()
+    if not CIRCUIT_BREAKER.allow():
+        CALL_STATS.incr('circuit_rejected')
+        raise CircuitOpenError("OpenRouter circuit breaker open after repeated failures")
+
+    error = None
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        CALL_STATS.incr('requests')
+        retry_after = None
+        try:
+            response = http_post(
+                OPENROUTER_BASE_URL,
+                headers=headers,
+                json=payload,
+                timeout=LLM_REQUEST_TIMEOUT
+            )
+            if response.status_code in RETRYABLE_STATUSES:
+                # Throttled or transient upstream failure: retry after a pause
+                if response.status_code == 429:
+                    CALL_STATS.incr('rate_limited')
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                error = Exception(f"OpenRouter API error: HTTP {response.status_code}")
+            else:
+                response.raise_for_status()
+
+                data = response.json()
+
+                # Extract response and usage
+                content = data['choices'][0]['message']['content']
+                usage = data.get('usage', {})
+
+                CIRCUIT_BREAKER.record_success()
+                return content, {
+                    'input_tokens': usage.get('prompt_tokens', 0),
+                    'output_tokens': usage.get('completion_tokens', 0),
+                    'total_tokens': usage.get('total_tokens', 0),
+                    'model': MODEL
+                }
+
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            error = Exception(f"OpenRouter API error: {e}")
+        except (KeyError, IndexError, ValueError) as e:
+            # The service answered; retrying the same request will not fix the format
+            CIRCUIT_BREAKER.record_success()
+            raise Exception(f"Invalid API response format: {e}")
+        except requests.exceptions.RequestException as e:
+            # Not retryable (e.g. 401/400)
+            CALL_STATS.incr('failures')
+            CIRCUIT_BREAKER.record_failure()
+            raise Exception(f"OpenRouter API error: {e}")
+
+        if attempt < LLM_MAX_RETRIES:
+            CALL_STATS.incr('retries')
+            time.sleep(backoff_delay(attempt, retry_after))
+
+    CALL_STATS.incr('failures')
+    CIRCUIT_BREAKER.record_failure()
+    raise error
 
 
 def build_scoring_prompt(opp: Dict[str, Any], base_score: int) -> str:
@@ -146,6 +230,105 @@ Be critical - most opportunities are NOT worth pursuing. Only score highly if th
     return prompt
 
 
+def _format_batch_item(number: int, opp: Dict[str, Any], base_score: int) -> str:
+    """One opportunity section of a batch prompt"""
+    title = opp.get('title', '')
+    body = opp.get('body', '')[:400]  # Limit body length
+    source = opp.get('source', '')
+    engagement = opp.get('engagement_data', {})
+
+    return f"""### Opportunity {number}
+Title: {title}
+Source: {source}
+Engagement: {engagement}
+Base Score: {base_score}/100 (from rule-based system)
+Content Preview:
+{body}"""
+
+
+def build_batch_scoring_prompt(items: List[Tuple[int, Dict[str, Any]]]) -> str:
+    """
+    Build one prompt scoring several opportunities
+
+    The instructions are sent once for the whole batch; the model answers
+    with a JSON array holding one object per opportunity, tagged by id.
+
+    Args:
+        items: List of (base_score, opportunity) pairs
+
+    Returns:
+        Formatted prompt string
+    """
+    sections = '\n\n'.join(
+        _format_batch_item(number, opp, base_score)
+        for number, (base_score, opp) in enumerate(items, 1)
+    )
+
+    prompt = f"""Analyze each of these {len(items)} SaaS opportunities independently and provide an enhanced score for each.
+
+{sections}
+
+**Your Task:**
+For EACH opportunity:
+1. Assess the QUALITY of this opportunity for a SaaS builder:
+   - Is the pain point clear and specific?
+   - Does it indicate willingness to pay?
+   - Is there a viable business opportunity?
+   - How urgent/frustrated does the poster seem?
+   - How could this problem be solved with a saas?
+
+2. Provide:
+   - LLM_SCORE: 0-100 (your assessment)
+   - REASONING: 1-2 sentences explaining your score
+   - SIGNALS: List 2-3 key positive or negative signals you detected
+
+**Output Format (JSON array, one object per opportunity, same order):**
+[
+  {{"id": 1, "llm_score": <0-100>, "reasoning": "<brief explanation>", "signals": ["signal1", "signal2", "signal3"]}},
+  ...
+]
+
+Return only the JSON array. Be critical - most opportunities are NOT worth pursuing. Only score highly if there's clear pain + willingness to pay + specificity."""
+
+    return prompt
+
+
+def _strip_code_fence(response_text: str) -> str:
+    """Remove a surrounding markdown code block, if any"""
+    response_text = response_text.strip()
+    if response_text.startswith('```'):
+        lines = response_text.split('\n')
+        response_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else response_text
+        response_text = response_text.replace('```json', '').replace('```', '').strip()
+    return response_text
+
+
+def _iter_json_objects(text: str):
+    """Yield each top-level JSON object embedded in text, skipping anything unparseable"""
+    decoder = json.JSONDecoder()
+    pos = text.find('{')
+    while pos != -1:
+        try:
+            obj, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            pos = text.find('{', pos + 1)
+            continue
+        if isinstance(obj, dict):
+            yield obj
+        pos = text.find('{', end)
+
+
+def _validate_analysis(data: Any) -> Optional[Dict[str, Any]]:
+    """Check required fields and clamp the score, or None if invalid"""
+    if not isinstance(data, dict) or 'llm_score' not in data:
+        return None
+    try:
+        data['llm_score'] = max(0, min(100, int(data['llm_score'])))
+    except (TypeError, ValueError):
+        return None
+    return data
+
+
 def parse_llm_response(response_text: str) -> Optional[Dict[str, Any]]:
     """
     Parse LLM JSON response
@@ -156,29 +339,64 @@ def parse_llm_response(response_text: str) -> Optional[Dict[str, Any]]:
     Returns:
         Parsed dictionary or None if invalid
     """
+    if not response_text:
+        return None
+    response_text = _strip_code_fence(response_text)
+
     try:
-        # Try to extract JSON from response (may have markdown code blocks)
-        response_text = response_text.strip()
+        return _validate_analysis(json.loads(response_text))
+    except json.JSONDecodeError:
+        pass
 
-        # Remove markdown code blocks if present
-        if response_text.startswith('```'):
-            lines = response_text.split('\n')
-            response_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else response_text
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
+    # Prose around the JSON: use the first object that validates
+    for obj in _iter_json_objects(response_text):
+        analysis = _validate_analysis(obj)
+        if analysis:
+            return analysis
+    return None
 
-        data = json.loads(response_text)
 
-        # Validate required fields
-        if 'llm_score' not in data:
-            return None
+def parse_batch_response(response_text: str, count: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Parse a batch response into one analysis per opportunity
 
-        # Ensure score is in valid range
-        data['llm_score'] = max(0, min(100, int(data['llm_score'])))
+    Items are matched by their 1-based "id", falling back to position.
+    A truncated or partly malformed array still yields every complete,
+    valid object; the rest come back as None.
 
-        return data
+    Args:
+        response_text: Raw response from LLM
+        count: Number of opportunities in the batch
 
-    except (json.JSONDecodeError, ValueError, KeyError):
-        return None
+    Returns:
+        List of parsed dictionaries (or None) in batch order
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * count
+    if not response_text:
+        return results
+    response_text = _strip_code_fence(response_text)
+
+    try:
+        data = json.loads(response_text)
+        if isinstance(data, dict):
+            # Tolerate {"results": [...]} style wrappers
+            data = next((v for v in data.values() if isinstance(v, list)), [data])
+        objects = data if isinstance(data, list) else []
+    except json.JSONDecodeError:
+        objects = list(_iter_json_objects(response_text))
+
+    for position, obj in enumerate(objects):
+        analysis = _validate_analysis(obj)
+        if not analysis:
+            continue
+        try:
+            index = int(analysis.pop('id')) - 1
+        except (KeyError, TypeError, ValueError):
+            index = position
+        if 0 <= index < count and results[index] is None:
+            results[index] = analysis
+
+    return results
 
 
 def calculate_final_score(base_score: int, llm_score: int) -> int:
@@ -197,6 +415,87 @@ def calculate_final_score(base_score: int, llm_score: int) -> int:
     return int(round(final))
 
 
+def calculate_cost(usage_stats: Dict[str, Any]) -> float:
+    """
+    Cost of a request in USD (Claude Haiku pricing via OpenRouter)
+
+    Approximate: $0.25/M input, $1.25/M output tokens
+    """
+    input_cost = (usage_stats['input_tokens'] / 1_000_000) * 0.25
+    output_cost = (usage_stats['output_tokens'] / 1_000_000) * 1.25
+    return input_cost + output_cost
+
+
+def _build_llm_data(base_score: int, analysis: Dict[str, Any], usage_stats: Dict[str, Any],
+                    cost: float) -> Tuple[int, Dict[str, Any]]:
+    """Final score and llm_analysis record for a parsed analysis"""
+    llm_score = analysis['llm_score']
+    final_score = calculate_final_score(base_score, llm_score)
+    return final_score, {
+        'llm_score': llm_score,
+        'base_score': base_score,
+        'final_score': final_score,
+        'reasoning': analysis.get('reasoning', ''),
+        'signals': analysis.get('signals', []),
+        'tokens': usage_stats,
+        'cost_usd': round(cost, 6),
+        'model': MODEL
+    }
+
+
+def prompt_version(batched: bool) -> str:
+    """Cache version of the single or the batch prompt, so their analyses are cached apart"""
+    return f"batch-{BATCH_PROMPT_VERSION}" if batched else f"single-{PROMPT_VERSION}"
+
+
+def _cached_score(base_score: int, opp: Dict[str, Any], batched: bool) -> Optional[Tuple[int, Dict[str, Any]]]:
+    """Result from an earlier analysis of opp by the same prompt, if cached (no request, no cost)"""
+    cache = get_cache()
+    if not cache:
+        return None
+    cached = cache.get(cache_key(opp, MODEL, prompt_version(batched)))
+    if not cached:
+        return None
+    no_usage = {'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0, 'model': MODEL}
+    final_score, llm_data = _build_llm_data(base_score, cached, no_usage, 0.0)
+    llm_data['cached'] = True
+    return final_score, llm_data
+
+
+def _store_analysis(opp: Dict[str, Any], llm_data: Dict[str, Any], batched: bool) -> None:
+    """Remember a fresh analysis for later runs, under the prompt that produced it"""
+    cache = get_cache()
+    if cache:
+        cache.put(cache_key(opp, MODEL, prompt_version(batched)), {
+            'llm_score': llm_data['llm_score'],
+            'reasoning': llm_data['reasoning'],
+            'signals': llm_data['signals'],
+            'prompt_version': prompt_version(batched)
+        })
+
+
+def _score_single(base_score: int, opp: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """One-opportunity request, after the cache missed"""
+    # Build prompt
+    prompt = build_scoring_prompt(opp, base_score)
+
+    # Call LLM
+    response_text, usage_stats = call_openrouter(prompt)
+
+    # Parse response
+    llm_analysis = parse_llm_response(response_text)
+
+    if not llm_analysis:
+        # Failed to parse, return base score (the call is still paid for)
+        UNATTRIBUTED_USAGE.add(usage_stats, calculate_cost(usage_stats))
+        CALL_STATS.incr('fallbacks')
+        return base_score, None
+
+    final_score, llm_data = _build_llm_data(base_score, llm_analysis, usage_stats, calculate_cost(usage_stats))
+    _store_analysis(opp, llm_data, batched=False)
+    return final_score, llm_data
+
+
 def enhanced_score(base_score: int, opp: Dict[str, Any]) -> Tuple[int, Optional[Dict[str, Any]]]:
     """
     Get LLM-enhanced score for an opportunity
@@ -211,48 +510,137 @@ def enhanced_score(base_score: int, opp: Dict[str, Any]) -> Tuple[int, Optional[
         - llm_data: Dict with LLM analysis, tokens, cost, or None if failed
     """
     try:
-        # Build prompt
-        prompt = build_scoring_prompt(opp, base_score)
-
-        # Call LLM
-        response_text, usage_stats = call_openrouter(prompt)
-
-        # Parse response
-        llm_analysis = parse_llm_response(response_text)
-
-        if not llm_analysis:
-            # Failed to parse, return base score
-            return base_score, None
-
-        # Calculate final score
-        llm_score = llm_analysis['llm_score']
-        final_score = calculate_final_score(base_score, llm_score)
-
-        # Calculate cost (Claude Haiku pricing via OpenRouter)
-        # Approximate: $0.25/M input, $1.25/M output tokens
-        input_cost = (usage_stats['input_tokens'] / 1_000_000) * 0.25
-        output_cost = (usage_stats['output_tokens'] / 1_000_000) * 1.25
-        total_cost = input_cost + output_cost
-
-        # Return final score and LLM data
-        llm_data = {
-            'llm_score': llm_score,
-            'base_score': base_score,
-            'final_score': final_score,
-            'reasoning': llm_analysis.get('reasoning', ''),
-            'signals': llm_analysis.get('signals', []),
-            'tokens': usage_stats,
-            'cost_usd': round(total_cost, 6),
-            'model': MODEL
-        }
-
-        return final_score, llm_data
+        # Reuse a previous analysis of the same text: no request, no cost
+        cached = _cached_score(base_score, opp, batched=False)
+        if cached:
+            return cached
+        return _score_single(base_score, opp)
 
     except Exception as e:
         # On any error, return base score
+        logging.warning(f"LLM scoring failed, using base score: {e}")
+        CALL_STATS.incr('fallbacks')
         return base_score, None
 
 
+def enhanced_score_batch(items: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Get LLM-enhanced scores for several opportunities with one request
+
+    Cached items are answered locally; the rest share one batch prompt.
+    Token usage and cost are split evenly across the items the batch
+    scored, and items missing from the batch answer are retried alone.
+    A batch answer that scores nothing is counted in UNATTRIBUTED_USAGE.
+
+    Args:
+        items: List of (base_score, opportunity) pairs
+
+    Returns:
+        List of (final_score, llm_data) in the same order as items
+    """
+    results: List[Optional[Tuple[int, Optional[Dict[str, Any]]]]] = [None] * len(items)
+    pending = []  # indexes of items needing the LLM
+
+    for index, (base_score, opp) in enumerate(items):
+        try:
+            cached = _cached_score(base_score, opp, batched=True)
+        except Exception:
+            cached = None
+        if cached:
+            results[index] = cached
+        else:
+            pending.append(index)
+
+    if len(pending) == 1:
+        index = pending[0]
+        try:
+            results[index] = _score_single(*items[index])
+        except Exception:
+            CALL_STATS.incr('fallbacks')
+            results[index] = (items[index][0], None)
+
+    elif pending:
+        batch = [items[index] for index in pending]
+        try:
+            response_text, usage_stats = call_openrouter(
+                build_batch_scoring_prompt(batch),
+                max_tokens=BATCH_ITEM_MAX_TOKENS * len(batch)
+            )
+            analyses = parse_batch_response(response_text, len(batch))
+        except Exception:
+            # Request failed outright: keep base scores, as a single call would
+            CALL_STATS.incr('fallbacks', len(pending))
+            for index in pending:
+                results[index] = (items[index][0], None)
+            return results
+
+        scored = sum(1 for analysis in analyses if analysis)
+        if not scored:
+            # Nothing parsed: every item is retried alone, but this call is still paid for
+            UNATTRIBUTED_USAGE.add(usage_stats, calculate_cost(usage_stats))
+            scored = 1
+        item_usage = {
+            'input_tokens': round(usage_stats['input_tokens'] / scored),
+            'output_tokens': round(usage_stats['output_tokens'] / scored),
+            'total_tokens': round(usage_stats['total_tokens'] / scored),
+            'model': usage_stats.get('model', MODEL)
+        }
+        item_cost = calculate_cost(usage_stats) / scored
+
+        for index, analysis in zip(pending, analyses):
+            base_score, opp = items[index]
+            if analysis:
+                final_score, llm_data = _build_llm_data(base_score, analysis, dict(item_usage), item_cost)
+                llm_data['batch_size'] = len(batch)
+                _store_analysis(opp, llm_data, batched=True)
+                results[index] = (final_score, llm_data)
+            else:
+                # Unparseable in the batch answer: fall back to a single-item call
+                try:
+                    results[index] = _score_single(base_score, opp)
+                except Exception:
+                    CALL_STATS.incr('fallbacks')
+                    results[index] = (base_score, None)
+
+    return results
+
+
+def enhanced_score_many(items: List[Tuple[int, Dict[str, Any]]],
+                        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                        batch_size: int = LLM_BATCH_SIZE) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Get LLM-enhanced scores for many opportunities concurrently
+
+    Args:
+        items: List of (base_score, opportunity) pairs
+        max_in_flight: Maximum concurrent OpenRouter requests
+        batch_size: Opportunities per request (1 = one prompt per item)
+
+    Returns:
+        List of (final_score, llm_data) in the same order as items
+    """
+    if not items:
+        return []
+
+    def score_singles(chunk):
+        return [enhanced_score(*item) for item in chunk]
+
+    if batch_size <= 1:
+        score_chunk = score_singles
+        chunks = [[item] for item in items]
+    else:
+        score_chunk = enhanced_score_batch
+        chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    if max_in_flight <= 1 or len(chunks) == 1:
+        chunk_results = [score_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks))) as executor:
+            chunk_results = list(executor.map(score_chunk, chunks))
+
+    return [result for chunk in chunk_results for result in chunk]
+
+
 if __name__ == '__main__':
     # Test LLM scorer
     print("Testing LLM Scorer...")
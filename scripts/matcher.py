@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Multi-pattern Keyword Matcher
+Aho-Corasick automaton that finds every phrase of every category in one
+pass over the text, instead of one substring scan per phrase.
+"""
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Match many phrases, grouped by category, in a single scan.
+
+    Semantics are those of `phrase in text`: plain substring matching,
+    case-sensitive (callers lower-case the text, phrases are lower-case).
+    """
+
+    def __init__(self, categories: Dict[Hashable, Iterable[str]]):
+        self.categories: List[Hashable] = list(categories)
+        self.phrases: List[List[str]] = [list(phrases) for phrases in categories.values()]
+
+        # Trie: goto[state] maps char -> state, out[state] lists (category_idx, phrase_idx)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+        for cat_idx, phrases in enumerate(self.phrases):
+            for phrase_idx, phrase in enumerate(phrases):
+                if phrase:
+                    self._add(phrase, (cat_idx, phrase_idx))
+        self._fail: List[int] = [0] * len(self._goto)
+        self._build_failure_links()
+
+    def _add(self, phrase: str, label: Tuple[int, int]) -> None:
+        """Insert a phrase into the trie."""
+        state = 0
+        for char in phrase:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._out.append([])
+            state = nxt
+        self._out[state].append(label)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass linking each state to its longest proper suffix state."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                # Inherit matches that end at the suffix state
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str) -> Set[Tuple[int, int]]:
+        """Return (category_idx, phrase_idx) for every phrase found in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
+
+    def match(self, text: str) -> Dict[Hashable, List[str]]:
+        """
+        Matched phrases per category, in configured order.
+
+        Categories without a match are omitted.
+        """
+        by_category: Dict[int, List[int]] = {}
+        for cat_idx, phrase_idx in self._scan(text):
+            by_category.setdefault(cat_idx, []).append(phrase_idx)
+
+        return {
+            self.categories[cat_idx]: [self.phrases[cat_idx][i] for i in sorted(by_category[cat_idx])]
+            for cat_idx in sorted(by_category)
+        }
+
+    def matched_categories(self, text: str) -> Set[Hashable]:
+        """Categories with at least one phrase in text."""
+        return {self.categories[cat_idx] for cat_idx, _ in self._scan(text)}
+
+    def first_category(self, text: str, default=None):
+        """First category (in configured order) with a match, or default."""
+        hits = self._scan(text)
+        if not hits:
+            return default
+        return self.categories[min(cat_idx for cat_idx, _ in hits)]
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(frozen: Tuple[Tuple[Hashable, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(frozen))
+
+
+def get_matcher(categories: Dict[Hashable, Iterable[str]]) -> KeywordMatcher:
+    """Compiled matcher for these categories, built once per distinct phrase set."""
+    return _cached_matcher(tuple((cat, tuple(phrases)) for cat, phrases in categories.items()))
+
+
+def get_signal_matcher(config: Dict) -> KeywordMatcher:
+    """
+    Matcher over the phrase signals of a scoring config.
+
+    Categories are (section, signal_type) tuples, e.g.
+    ('pain_point_signals', 'strong_pain').
+    """
+    categories = {}
+    for section in ('pain_point_signals', 'competition_signals', 'market_signals'):
+        for signal_type, signal_data in config.get(section, {}).items():
+            categories[(section, signal_type)] = signal_data['phrases']
+    return get_matcher(categories)
+
+
+if __name__ == '__main__':
+    # Quick self-check against plain substring matching
+    cats = {'pain': ['sick of', 'hate', 'hate using', 'tired of'], 'pay': ['$', 'would pay', 'pay']}
+    text = "i hate using spreadsheets, sick of it and would pay $20"
+    matcher = get_matcher(cats)
+    expected = {c: [p for p in ps if p in text] for c, ps in cats.items()}
+    print(matcher.match(text))
+    print("OK" if matcher.match(text) == {c: ps for c, ps in expected.items() if ps} else "MISMATCH")
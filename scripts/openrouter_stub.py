@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Local OpenRouter Stand-in
+Imitates the chat-completions endpoint so the LLM scoring path can be run
+and benchmarked offline, with configurable latency and failure rates.
+
+Scores are deterministic: each opportunity's llm_score is derived from a
+hash of its title, so repeated runs give identical results. Batch prompts
+(see llm_scorer.build_batch_scoring_prompt) get a JSON array answer.
+
+Usage:
+    python3 openrouter_stub.py --port 8765 --latency 0.8 --error-rate 0.05 --rate-limit-rate 0.05
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/api/v1/chat/completions \\
+    OPENROUTER_API_KEY=stub python3 process_opportunities.py
+
+GET /stats returns request counters (and peak concurrency) as JSON.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+_OPPORTUNITY_RE = re.compile(r'^### Opportunity (\d+)\nTitle: (.*)$', re.MULTILINE)
+_TITLE_RE = re.compile(r'^Title: (.*)$', re.MULTILINE)
+
+
+def stub_analysis(title: str) -> Dict[str, Any]:
+    """Deterministic analysis for an opportunity title"""
+    digest = hashlib.sha256(title.encode('utf-8')).digest()
+    score = digest[0] * 100 // 255
+    return {
+        'llm_score': score,
+        'reasoning': f"Stub assessment ({score}/100).",
+        'signals': ['stub signal']
+    }
+
+
+def stub_completion(prompt: str) -> str:
+    """Answer text for a single or batch scoring prompt"""
+    batch = _OPPORTUNITY_RE.findall(prompt)
+    if batch:
+        return json.dumps([{'id': int(number), **stub_analysis(title)} for number, title in batch], indent=2)
+    match = _TITLE_RE.search(prompt)
+    return json.dumps(stub_analysis(match.group(1) if match else prompt), indent=2)
+
+
+class StubStats:
+    """Thread-safe request counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'in_flight': 0, 'peak_in_flight': 0}
+
+    def incr(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+            if key == 'in_flight':
+                self.counts['peak_in_flight'] = max(self.counts['peak_in_flight'], self.counts['in_flight'])
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles POST .../chat/completions and GET /stats"""
+
+    # Set by make_server
+    options: argparse.Namespace = None
+    stats: StubStats = None
+    rng: random.Random = None
+    rng_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        if self.options.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self._send_json(200, self.stats.snapshot())
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+            prompt = request['messages'][-1]['content']
+        except (json.JSONDecodeError, KeyError, IndexError, TypeError):
+            self._send_json(400, {'error': {'message': 'Invalid request body'}})
+            return
+
+        self.stats.incr('requests')
+        self.stats.incr('in_flight')
+        try:
+            with self.rng_lock:
+                roll = self.rng.random()
+                delay = max(0.0, self.rng.gauss(self.options.latency, self.options.jitter))
+            time.sleep(delay)
+
+            if roll < self.options.rate_limit_rate:
+                self.stats.incr('rate_limited')
+                self._send_json(429, {'error': {'message': 'Rate limit exceeded (stub)'}},
+                                {'Retry-After': str(self.options.retry_after)})
+                return
+            if roll < self.options.rate_limit_rate + self.options.error_rate:
+                self.stats.incr('errors')
+                self._send_json(502, {'error': {'message': 'Upstream error (stub)'}})
+                return
+
+            content = stub_completion(prompt)
+            prompt_tokens = len(prompt) // 4
+            completion_tokens = len(content) // 4
+            self.stats.incr('ok')
+            self._send_json(200, {
+                'id': f"stub-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}",
+                'object': 'chat.completion',
+                'model': request.get('model', 'stub'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens
+                }
+            })
+        finally:
+            self.stats.incr('in_flight', -1)
+
+
+def make_server(options: argparse.Namespace) -> ThreadingHTTPServer:
+    """Build (but do not start) a stub server for the given options"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {
+        'options': options,
+        'stats': StubStats(),
+        'rng': random.Random(options.seed),
+        'rng_lock': threading.Lock()
+    })
+    server = ThreadingHTTPServer((options.host, options.port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenRouter chat-completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Mean response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Standard deviation of the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 502')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency and failure draws')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    return parser.parse_args(argv)
+
+
+def main():
+    options = parse_args()
+    server = make_server(options)
+    print(f"OpenRouter stub listening on http://{options.host}:{options.port}/api/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.RequestHandlerClass.stats.snapshot()))
+
+
+if __name__ == '__main__':
+    main()
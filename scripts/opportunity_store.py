@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Opportunity Store
+SQLite table of processed opportunities, indexed on processed_at, score,
+source and domain, so the digest, Telegram and weekly review stages run
+time-window and top-N queries instead of re-parsing processed JSONL.
+
+Titles and bodies are also indexed for full-text search (FTS5, kept in
+sync by triggers); see search_opportunities.py.
+
+process_opportunities upserts every saved opportunity (keyed by
+opportunity_id); the processed JSONL files remain as an append-only archive.
+
+Usage:
+    python3 opportunity_store.py --backfill    # import existing processed JSONL
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from config import OPPORTUNITY_STORE_DB, PROCESSED_DIR, STATE_LOCK_TIMEOUT
+
+# bm25 weight of a title match relative to a body match
+TITLE_WEIGHT = 5.0
+
+
+def quote_terms(query: str) -> str:
+    """FTS5 query matching every word of query literally"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+class OpportunityStore:
+    """
+    Processed opportunities keyed by opportunity_id.
+
+    processed_at is stored as the ISO string written by process_opportunities,
+    which sorts chronologically. Each row keeps the full opportunity as JSON.
+    If this SQLite build lacks FTS5, everything but search() still works.
+    """
+
+    def __init__(self, db_path: Path = OPPORTUNITY_STORE_DB):
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._init_db()
+
+    def _init_db(self) -> None:
+        # Explicit integer key: the full-text index refers to rows by it
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS opportunities (
+            id INTEGER PRIMARY KEY,
+            opportunity_id TEXT NOT NULL UNIQUE,
+            processed_at TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            title TEXT NOT NULL,
+            body TEXT NOT NULL,
+            data TEXT NOT NULL
+        )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunities_processed_at ON opportunities(processed_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunities_score ON opportunities(score)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunities_source ON opportunities(source, processed_at)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_opportunities_domain ON opportunities(domain, processed_at)')
+        self._conn.commit()
+        self.fts_enabled = self._init_fts()
+
+    def _init_fts(self) -> bool:
+        """Create the external-content FTS5 index and its sync triggers; False if unsupported."""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'opportunities_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            with self._conn:
+                self._conn.execute('''CREATE VIRTUAL TABLE opportunities_fts USING fts5(
+                    title, body, content='opportunities', content_rowid='id', tokenize='porter unicode61'
+                )''')
+                self._conn.execute('''CREATE TRIGGER opportunities_fts_insert AFTER INSERT ON opportunities BEGIN
+                    INSERT INTO opportunities_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+                END''')
+                self._conn.execute('''CREATE TRIGGER opportunities_fts_delete AFTER DELETE ON opportunities BEGIN
+                    INSERT INTO opportunities_fts (opportunities_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                END''')
+                self._conn.execute('''CREATE TRIGGER opportunities_fts_update AFTER UPDATE ON opportunities BEGIN
+                    INSERT INTO opportunities_fts (opportunities_fts, rowid, title, body)
+                    VALUES ('delete', old.id, old.title, old.body);
+                    INSERT INTO opportunities_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+                END''')
+                # Index rows stored before the full-text index existed
+                self._conn.execute("INSERT INTO opportunities_fts (opportunities_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Full-text search unavailable (SQLite without FTS5?): {e}")
+            return False
+
+    def upsert_many(self, opps: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace opportunities in one transaction; returns rows written."""
+        rows = [(
+            opp['opportunity_id'],
+            opp['processed_at'],
+            opp.get('score', 0),
+            opp.get('source', 'unknown'),
+            opp.get('domain', 'other'),
+            opp.get('title', ''),
+            opp.get('body', ''),
+            json.dumps(opp)
+        ) for opp in opps]
+        with self._conn:
+            self._conn.executemany(
+                '''INSERT INTO opportunities
+                   (opportunity_id, processed_at, score, source, domain, title, body, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(opportunity_id) DO UPDATE SET
+                       processed_at = excluded.processed_at, score = excluded.score,
+                       source = excluded.source, domain = excluded.domain,
+                       title = excluded.title, body = excluded.body, data = excluded.data''',
+                rows
+            )
+        return len(rows)
+
+    def delete_many(self, opportunity_ids: Iterable[str]) -> int:
+        """Delete opportunities by opportunity_id in one transaction; returns rows deleted."""
+        with self._conn:
+            cursor = self._conn.executemany('DELETE FROM opportunities WHERE opportunity_id = ?',
+                                            [(opportunity_id,) for opportunity_id in opportunity_ids])
+        return cursor.rowcount
+
+    def iter_recent(self, since: datetime, until: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """Opportunities processed after since (and up to until), in processing order, one at a time."""
+        query = 'SELECT data FROM opportunities WHERE processed_at > ?'
+        params = [since.isoformat()]
+        if until is not None:
+            query += ' AND processed_at <= ?'
+            params.append(until.isoformat())
+        query += ' ORDER BY processed_at, opportunity_id'
+        for row in self._conn.execute(query, params):
+            yield json.loads(row[0])
+
+    def recent(self, since: datetime, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Opportunities processed after since (and up to until), in processing order."""
+        return list(self.iter_recent(since, until))
+
+    def top(self, since: datetime, limit: int, min_score: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Highest-scored opportunities processed after since."""
+        query = 'SELECT data FROM opportunities WHERE processed_at > ?'
+        params: List[Any] = [since.isoformat()]
+        if min_score is not None:
+            query += ' AND score >= ?'
+            params.append(min_score)
+        query += ' ORDER BY score DESC, processed_at LIMIT ?'
+        params.append(limit)
+        return [json.loads(row[0]) for row in self._conn.execute(query, params)]
+
+    def count(self, since: datetime, min_score: Optional[int] = None) -> int:
+        """Number of opportunities processed after since (scoring at least min_score)."""
+        query = 'SELECT COUNT(*) FROM opportunities WHERE processed_at > ?'
+        params: List[Any] = [since.isoformat()]
+        if min_score is not None:
+            query += ' AND score >= ?'
+            params.append(min_score)
+        return self._conn.execute(query, params).fetchone()[0]
+
+    def search(self, query: str, source: Optional[str] = None, domain: Optional[str] = None,
+               min_score: Optional[int] = None, since: Optional[datetime] = None,
+               until: Optional[datetime] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over titles and bodies, best match first
+
+        query uses FTS5 syntax ("exact phrase", AND/OR/NOT, prefix*); if it
+        does not parse, each word is searched for literally instead. source
+        matches exactly or as a prefix ('reddit' matches 'reddit:SaaS').
+
+        Returns:
+            List of {'opportunity', 'rank', 'snippet'}; lower rank is better (bm25)
+        """
+        if not self.fts_enabled:
+            raise RuntimeError("Full-text search needs SQLite with FTS5")
+
+        sql = f'''SELECT o.data, bm25(opportunities_fts, {TITLE_WEIGHT}, 1.0) AS rank,
+                        snippet(opportunities_fts, 1, '[', ']', '...', 16)
+                 FROM opportunities_fts JOIN opportunities o ON o.id = opportunities_fts.rowid
+                 WHERE opportunities_fts MATCH ?'''
+        params: List[Any] = []
+        if source:
+            # Prefix compared literally: LIKE would treat '_' and '%' in source as wildcards
+            sql += " AND (o.source = ? OR substr(o.source, 1, length(?) + 1) = ? || ':')"
+            params.extend([source, source, source])
+        if domain:
+            sql += ' AND o.domain = ?'
+            params.append(domain)
+        if min_score is not None:
+            sql += ' AND o.score >= ?'
+            params.append(min_score)
+        if since is not None:
+            sql += ' AND o.processed_at >= ?'
+            params.append(since.isoformat())
+        if until is not None:
+            sql += ' AND o.processed_at < ?'
+            params.append(until.isoformat())
+        sql += ' ORDER BY rank LIMIT ?'
+        params.append(limit)
+
+        try:
+            rows = self._conn.execute(sql, [query] + params).fetchall()
+        except sqlite3.OperationalError as e:
+            if 'fts5' not in str(e) and 'syntax' not in str(e):
+                raise
+            rows = self._conn.execute(sql, [quote_terms(query)] + params).fetchall()
+        return [{'opportunity': json.loads(data), 'rank': rank, 'snippet': snippet}
+                for data, rank, snippet in rows]
+
+    def is_empty(self) -> bool:
+        return self._conn.execute('SELECT 1 FROM opportunities LIMIT 1').fetchone() is None
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def backfill(store: OpportunityStore, processed_dir: Path = PROCESSED_DIR, batch_size: int = 1000) -> int:
+    """Upsert every opportunity in the processed JSONL files; returns rows written."""
+    total = 0
+    for file in sorted(processed_dir.glob('opportunities_*.jsonl')):
+        batch = []
+        with open(file, 'r') as f:
+            for line in f:
+                try:
+                    opp = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'opportunity_id' not in opp or 'processed_at' not in opp:
+                    continue
+                batch.append(opp)
+                if len(batch) >= batch_size:
+                    total += store.upsert_many(batch)
+                    batch = []
+        total += store.upsert_many(batch)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Opportunity store maintenance')
+    parser.add_argument('--backfill', action='store_true', help='Import existing processed JSONL files')
+    args = parser.parse_args()
+
+    if not args.backfill:
+        parser.print_help()
+        return
+
+    store = OpportunityStore()
+    try:
+        count = backfill(store)
+    finally:
+        store.close()
+    print(f"✅ Backfilled {count} opportunities into {OPPORTUNITY_STORE_DB}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -2,15 +2,27 @@
 """
 Process Opportunities - Score, deduplicate, and enrich
 """
+import hashlib
+import itertools
 import json
 import sys
 import os
+import time
+from contextlib import ExitStack
 from pathlib import Path
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from fuzzywuzzy import fuzz
+from matcher import get_matcher
+from similarity import TitleIndex, SimHashIndex, opportunity_simhash
 from usage_tracker import UsageTracker
-from utils import setup_logging
+from digest_state import DigestState
+from ingest_ledger import IngestLedger
+from llm_scheduler import DeferredQueue
+from opportunity_store import OpportunityStore, backfill
+from rollups import RollupStore
+from sketches import SketchStore
+from utils import setup_logging, file_lock, RecordSpool
+from config import INGEST_LEDGER_FILE, CROSS_RUN_DEDUP_DAYS, LLM_MAX_IN_FLIGHT, LLM_BATCH_SIZE
 
 # Load environment variables first
 ENV_FILE = Path(__file__).parent.parent / '.env'
@@ -26,13 +38,13 @@ logger = setup_logging(__name__, LOG_DIR / 'processing.log')
 
 # Use config-driven scoring
 try:
-    from scoring import score_opportunity
-    from validate import validate_opportunities
+    from scoring import score_opportunities
+    from validate import validate_opportunity
     SCORING_IMPORTED = True
 except ImportError:
     SCORING_IMPORTED = False
     logger.error("Failed to import scoring.py - using fallback")
-    validate_opportunities = None
+    validate_opportunity = None
 
 # Check if LLM scoring is enabled (skip placeholder keys)
 api_key = os.getenv('OPENROUTER_API_KEY', '')
@@ -40,7 +52,8 @@ LLM_ENABLED = api_key and api_key not in ['your_openrouter_key_here', '', 'your_
 
 if LLM_ENABLED:
     try:
-        from llm_scorer import enhanced_score
+        from llm_scorer import enhanced_score_many, get_cache, CALL_STATS, CIRCUIT_BREAKER, UNATTRIBUTED_USAGE
+        from llm_scheduler import run_allowance, candidate_cost, plan_schedule
         logger.info("LLM scoring enabled with OpenRouter (Claude Haiku)")
     except ImportError:
         logger.warning("LLM scorer module not found, falling back to rule-based")
@@ -54,83 +67,207 @@ RAW_DIR = DATA_DIR / 'raw'
 PROCESSED_DIR = DATA_DIR / 'processed'
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-# Last run tracking
+# Last run timestamp of mtime-based runs, read once to seed the ingestion ledger
 LAST_RUN_FILE = DATA_DIR / 'last_processing_run.txt'
 
+# Records scored per vectorized batch while streaming
+SCORE_CHUNK_SIZE = 1000
+
 def load_last_run_time():
-    """Get timestamp of last processing run"""
+    """Get timestamp of the last mtime-based processing run (before the ingestion ledger)"""
     if LAST_RUN_FILE.exists():
         with open(LAST_RUN_FILE, 'r') as f:
             return datetime.fromisoformat(f.read().strip())
     return datetime.now() - timedelta(days=1)  # Process last 24h on first run
 
-def save_last_run_time():
-    """Save current timestamp"""
-    with open(LAST_RUN_FILE, 'w') as f:
-        f.write(datetime.now().isoformat())
+def find_raw_files():
+    """All raw JSONL files, oldest name first"""
+    return sorted(RAW_DIR.glob('*.jsonl'))
+
+def open_ledger():
+    """
+    Load the ingestion ledger, finishing any interrupted run and seeding
+    a new ledger from the old last-run timestamp
+    """
+    ledger = IngestLedger()
+    outcome = ledger.recover(on_rollback=forget_output)
+    if outcome == 'rolled_back':
+        logger.warning("Previous run stopped while saving output; its partial output was removed and will be redone")
+    elif outcome == 'rolled_forward':
+        logger.warning("Previous run stopped after saving output; finishing it")
+        apply_output(ledger)
+        ledger.commit()
+    if not ledger.exists:
+        last_run = load_last_run_time()
+        seeded = ledger.migrate(find_raw_files(), last_run)
+        logger.info(f"Created ingestion ledger: {seeded} raw files from before {last_run.isoformat()} marked as processed")
+    return ledger
+
+def forget_output(lines):
+    """Remove opportunities of a rolled-back append from the opportunity store"""
+    ids = []
+    for line in lines:
+        try:
+            ids.append(json.loads(line)['opportunity_id'])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            continue
+    store = OpportunityStore()
+    try:
+        removed = store.delete_many(ids)
+    finally:
+        store.close()
+    if removed:
+        logger.info(f"Opportunity store: removed {removed} opportunities of the rolled-back output")
+
+def apply_output(ledger, similarity_index=None):
+    """
+    Apply the written append to the state derived from it: opportunity
+    store, digest state, quantile sketches, rollups and similarity
+    signatures
 
-def find_new_files(since):
-    """Find raw JSONL files created since timestamp"""
-    files = []
-    for file in sorted(RAW_DIR.glob('*.jsonl')):
-        if datetime.fromtimestamp(file.stat().st_mtime) > since:
-            files.append(file)
-    return files
+    Each step is idempotent (upserts, or skipped for a run_id already
+    applied), so a run that stopped partway through is finished by
+    applying it again. similarity_index, if given, already holds this
+    run's signatures uncommitted; otherwise they are indexed again.
+    """
+    reindex = similarity_index is None and CROSS_RUN_DEDUP_DAYS > 0
+    if reindex:
+        similarity_index = SimHashIndex()
+    store = OpportunityStore()
+    if store.is_empty():
+        backfilled = backfill(store)
+        if backfilled:
+            logger.info(f"Opportunity store: imported {backfilled} earlier processed opportunities")
+    digest_state = DigestState()
+    sketches = SketchStore()
+    rollups = RollupStore()
+    try:
+        for lines in chunked(ledger.iter_written(), SCORE_CHUNK_SIZE):
+            batch = [json.loads(line) for line in lines]
+            store.upsert_many(batch)
+            for opp in batch:
+                digest_state.add(opp)
+                sketches.add(opp)
+                rollups.add(opp)
+                if reindex:
+                    similarity_index.add(opp['opportunity_id'], opportunity_simhash(opp))
+    finally:
+        store.close()
+    if similarity_index:
+        similarity_index.commit()
+        similarity_index.close()
+    # Saved after the store holds the run: sketches and rollups may rebuild from it
+    digest_state.save(run_id=ledger.run_id)
+    sketches.save(run_id=ledger.run_id)
+    sketches.close()
+    rollups.save(run_id=ledger.run_id)
+    rollups.close()
 
-def deduplicate_opportunities(opps):
+def dedup_rows(scores, titles, rows=None):
     """
     Deduplicate using fuzzy title matching
     Keep highest-scored version of duplicates
+    
+    Works on compact columns (score and lower-cased title per row), so
+    callers need not hold the full opportunities.
+    
+    Returns:
+        list: Kept row indices, highest score first
     """
     from config import FUZZY_MATCH_THRESHOLD
 
-    if not opps:
-        return []
+    if rows is None:
+        rows = range(len(scores))
 
-    unique = []
-    seen_titles = []
+    kept = []
+    # Blocks kept titles on shared n-grams so we don't compare every pair
+    seen_titles = TitleIndex(FUZZY_MATCH_THRESHOLD)
 
     # Sort by score descending
-    opps_sorted = sorted(opps, key=lambda x: x.get('score', 0), reverse=True)
-
-    for opp in opps_sorted:
-        title = opp.get('title', '').lower()
+    for row in sorted(rows, key=lambda r: scores[r], reverse=True):
+        title = titles[row]
 
         # Check if similar to any seen title
-        is_duplicate = False
-        for seen in seen_titles:
-            similarity = fuzz.ratio(title, seen)
-            if similarity > FUZZY_MATCH_THRESHOLD:
-                is_duplicate = True
-                break
+        if not seen_titles.is_similar(title):
+            kept.append(row)
+            seen_titles.add(title)
+
+    return kept
 
-        if not is_duplicate:
-            unique.append(opp)
-            seen_titles.append(title)
+def is_cross_run_duplicate(opp, index):
+    """
+    True if the opportunity's title+body SimHash is near one already indexed
+    (from earlier runs, or earlier in this batch); otherwise it is indexed.
+    """
+    signature = opportunity_simhash(opp)
+    match = index.find_near_duplicate(signature)
+    if match:
+        logger.debug(f"Near-duplicate of {match}: {opp.get('title', '')[:60]}")
+        return True
+    index.add(opp['opportunity_id'], signature)
+    return False
 
-    return unique
+def iter_raw_opportunities(ledger, unread):
+    """Yield opportunities from the unread lines of raw JSONL files"""
+    for file, offset in unread:
+        count = 0
+        try:
+            for line_num, line in enumerate(ledger.iter_lines(file, offset), 1):
+                try:
+                    data = json.loads(line.strip())
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Failed to parse line {line_num} in {file.name}: {e}")
+                    continue
+                # Skip metadata line
+                if data.get('_metadata'):
+                    continue
+                count += 1
+                yield data
+            logger.info(f"Loaded {count} from {file.name}" + (f" (from byte {offset})" if offset else ""))
+        except OSError as e:
+            logger.error(f"Error loading {file}: {e}")
+
+def iter_valid_opportunities(opps, stats):
+    """Yield opportunities that pass validation, counting loaded/invalid in stats"""
+    for opp in opps:
+        stats['loaded'] += 1
+        if validate_opportunity:
+            is_valid, error_msg = validate_opportunity(opp)
+            if not is_valid:
+                stats['invalid'] += 1
+                if stats['invalid'] <= 5:  # Log first 5 errors
+                    logger.warning(f"  {error_msg}: {opp.get('title', 'Unknown title')[:100]}")
+                continue
+        yield opp
+
+def chunked(iterable, size):
+    """Yield lists of up to size items"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Domain keywords (first matching domain wins, in this order)
+DOMAIN_KEYWORDS = {
+    'productivity': ['productivity', 'task', 'todo', 'calendar', 'scheduling'],
+    'communication': ['email', 'chat', 'messaging', 'slack', 'team'],
+    'development': ['api', 'code', 'developer', 'devops', 'deployment'],
+    'marketing': ['marketing', 'seo', 'analytics', 'campaign'],
+    'finance': ['invoice', 'payment', 'billing', 'accounting', 'tax'],
+    'automation': ['automation', 'workflow', 'zapier', 'integration'],
+    'data': ['data', 'database', 'analytics', 'reporting'],
+    'design': ['design', 'ui', 'ux', 'figma', 'prototype']
+}
+DOMAIN_MATCHER = get_matcher(DOMAIN_KEYWORDS)
 
 def classify_domain(opp):
     """Simple domain classification via keywords"""
     text = (opp.get('title', '') + ' ' + opp.get('body', '')).lower()
-    
-    # Domain keywords
-    domains = {
-        'productivity': ['productivity', 'task', 'todo', 'calendar', 'scheduling'],
-        'communication': ['email', 'chat', 'messaging', 'slack', 'team'],
-        'development': ['api', 'code', 'developer', 'devops', 'deployment'],
-        'marketing': ['marketing', 'seo', 'analytics', 'campaign'],
-        'finance': ['invoice', 'payment', 'billing', 'accounting', 'tax'],
-        'automation': ['automation', 'workflow', 'zapier', 'integration'],
-        'data': ['data', 'database', 'analytics', 'reporting'],
-        'design': ['design', 'ui', 'ux', 'figma', 'prototype']
-    }
-    
-    for domain, keywords in domains.items():
-        if any(kw in text for kw in keywords):
-            return domain
-    
-    return 'other'
+    return DOMAIN_MATCHER.first_category(text, default='other')
 
 def enrich_opportunity(opp):
     """Add computed fields"""
@@ -154,8 +291,15 @@ def enrich_opportunity(opp):
     
     return opp
 
-def main():
-    """Main processing pipeline"""
+def process():
+    """
+    Main processing pipeline
+    
+    Records stream from the raw files through validation and rule-based
+    scoring into a scratch spool. In memory we keep only compact per-row
+    state (spool offset, score, lower-cased title, LLM result); the LLM
+    stage and the final enrich/write pass re-read the rows they need.
+    """
     tracker = UsageTracker()
     
     with tracker.track_job('processing', 'process_opportunities') as job:
@@ -163,121 +307,210 @@ def main():
         logger.info("Processing Opportunities")
         logger.info("=" * 60)
         
-        # 1. Find new raw files
-        last_run = load_last_run_time()
-        logger.info(f"Processing files since: {last_run.isoformat()}")
+        # 1. Find raw files with bytes not yet processed
+        ledger = open_ledger()
+        unread = ledger.unread(find_raw_files())
+        logger.info(f"Found {len(unread)} raw files with new data")
         
-        raw_files = find_new_files(last_run)
-        logger.info(f"Found {len(raw_files)} new raw files")
+        # Opportunities waiting for LLM budget from earlier runs
+        deferred_queue = DeferredQueue()
         
-        if not raw_files:
+        if not unread and not deferred_queue:
             logger.info("No new files to process")
             job['items_processed'] = 0
             return
         
-        # 2. Load all opportunities from JSONL files
-        all_opps = []
-        for file in raw_files:
-            try:
-                opps = []
-                with open(file, 'r') as f:
-                    for line_num, line in enumerate(f, 1):
-                        try:
-                            data = json.loads(line.strip())
-                            # Skip metadata line
-                            if data.get('_metadata'):
-                                continue
-                            opps.append(data)
-                        except json.JSONDecodeError as e:
-                            logger.warning(f"Failed to parse line {line_num} in {file.name}: {e}")
-                all_opps.extend(opps)
-                logger.info(f"Loaded {len(opps)} from {file.name}")
-            except Exception as e:
-                logger.error(f"Error loading {file}: {e}")
+        # 2. Rejoin deferred opportunities first; those queued too long, or all of
+        #    them once LLM scoring is off, keep their base score
+        waiting, expired = deferred_queue.take_all()
+        if not LLM_ENABLED:
+            waiting, expired = [], waiting + expired
+        for opp in expired:
+            opp['llm_deferred'] = True
+        queued = [(opp, False) for opp in waiting] + [(opp, True) for opp in expired]
+        if queued:
+            logger.info(f"Re-queued {len(waiting)} LLM-deferred opportunities ({len(expired)} released with base score)")
         
-        logger.info(f"Total opportunities loaded: {len(all_opps)}")
+        # 3. Stream: load -> validate -> rule-based score -> spool
+        load_stats = {'loaded': 0, 'invalid': 0}
+        records = itertools.chain(
+            queued,
+            ((opp, False) for opp in iter_valid_opportunities(iter_raw_opportunities(ledger, unread), load_stats))
+        )
         
-        # 2.5. Validate data
-        if validate_opportunities:
-            valid_opps, errors = validate_opportunities(all_opps)
-            if errors:
-                logger.warning(f"Validation errors: {len(errors)} invalid opportunities")
-                for err in errors[:5]:  # Log first 5 errors
-                    logger.warning(f"  {err['error']}: {err['title']}")
-            all_opps = valid_opps
-            logger.info(f"After validation: {len(all_opps)} valid opportunities")
+        spool = RecordSpool(DATA_DIR)
+        offsets, scores, titles = [], [], []
+        candidates = []  # (row, base_score, estimated cost or None if cached)
         
-        # 3. Score each
+        for chunk in chunked(records, SCORE_CHUNK_SIZE):
+            base_scores = score_opportunities([opp for opp, _ in chunk])
+            for (opp, expired), base_score in zip(chunk, base_scores):
+                opp['score'] = base_score
+                row = len(offsets)
+                offsets.append(spool.append(opp))
+                scores.append(base_score)
+                titles.append(opp.get('title', '').lower())
+                if LLM_ENABLED and base_score >= 45 and not expired:
+                    candidates.append((row, base_score, candidate_cost(base_score, opp, LLM_BATCH_SIZE)))
+        
+        logger.info(f"Total opportunities loaded: {load_stats['loaded']}")
+        if load_stats['invalid']:
+            logger.warning(f"Validation errors: {load_stats['invalid']} invalid opportunities")
+        logger.info(f"After validation: {load_stats['loaded'] - load_stats['invalid']} valid opportunities")
+        
+        # 4. LLM enhancement of promising opportunities, best first within this run's budget
         llm_enhanced_count = 0
         total_llm_cost = 0.0
         total_tokens = 0
+        llm_results = {}  # row -> llm_analysis
+        deferred_rows = set()
+        
+        if candidates:
+            allowance = run_allowance(tracker)
+            scheduled, deferred, estimated_cost = plan_schedule([(base, cost) for _, base, cost in candidates], allowance)
+            if deferred:
+                deferred_rows = {candidates[i][0] for i in deferred}
+                deferred_queue.add([spool.read(offsets[candidates[i][0]]) for i in deferred])
+                logger.info(f"LLM budget: ${allowance:.4f} for this run, deferred {len(deferred)} "
+                            f"lower-priority opportunities to a later run")
+            
+            if scheduled:
+                scheduled_rows = [candidates[i][0] for i in scheduled]
+                logger.info(f"LLM-enhancing {len(scheduled_rows)} opportunities (~${estimated_cost:.4f}, "
+                            f"batches of {LLM_BATCH_SIZE}, {LLM_MAX_IN_FLIGHT} in flight)...")
+                llm_start = time.time()
+                # Only a window of full records is in memory at a time
+                for rows in chunked(scheduled_rows, LLM_BATCH_SIZE * LLM_MAX_IN_FLIGHT * 4):
+                    items = [(scores[row], spool.read(offsets[row])) for row in rows]
+                    for row, (final_score, llm_data) in zip(rows, enhanced_score_many(items)):
+                        scores[row] = final_score
+                        if llm_data:
+                            llm_results[row] = llm_data
+                            llm_enhanced_count += 1
+                            total_llm_cost += llm_data.get('cost_usd', 0)
+                            total_tokens += llm_data.get('tokens', {}).get('total_tokens', 0)
+                logger.info(f"LLM stage finished in {time.time() - llm_start:.1f}s")
+                
+                # Paid calls whose answers scored nothing still count against the budget
+                unattributed = UNATTRIBUTED_USAGE.snapshot()
+                if unattributed['calls']:
+                    logger.warning(f"LLM: {unattributed['calls']} calls answered nothing usable "
+                                   f"(${unattributed['cost_usd']:.6f}, {unattributed['total_tokens']} tokens)")
+                    total_llm_cost += unattributed['cost_usd']
+                    total_tokens += unattributed['total_tokens']
+                
+                call_stats = CALL_STATS.snapshot()
+                call_stats['circuit_opened'] = CIRCUIT_BREAKER.open_count
+                logger.info(f"LLM calls: {call_stats['requests']} requests, {call_stats['retries']} retries "
+                            f"({call_stats['rate_limited']} rate-limited), {call_stats['failures']} failed, "
+                            f"{call_stats['fallbacks']} fell back to base score")
+                if call_stats['circuit_opened']:
+                    logger.warning(f"LLM circuit breaker opened {call_stats['circuit_opened']} times, "
+                                   f"{call_stats['circuit_rejected']} calls skipped")
+                tracker.record_llm_stats('process_opportunities', call_stats)
 
-        for opp in all_opps:
-            base_score = score_opportunity(opp)
-
-            # Apply LLM enhancement if enabled and score is promising
-            if LLM_ENABLED and base_score >= 45:
-                try:
-                    final_score, llm_data = enhanced_score(base_score, opp)
-                    opp['score'] = final_score
-                    if llm_data:
-                        opp['llm_analysis'] = llm_data
-                        llm_enhanced_count += 1
-                        total_llm_cost += llm_data.get('cost_usd', 0)
-                        total_tokens += llm_data.get('tokens', {}).get('total_tokens', 0)
-                except Exception as e:
-                    # LLM failed, use base score
-                    logger.debug(f"LLM enhancement skipped for opportunity (using base score): {str(e)[:100]}")
-                    opp['score'] = base_score
-            else:
-                opp['score'] = base_score
-
-        logger.info(f"Scored {len(all_opps)} opportunities ({llm_enhanced_count} LLM-enhanced)")
-        if llm_enhanced_count > 0:
+                cache = get_cache()
+                if cache:
+                    stats = cache.stats()
+                    logger.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+                                f"({stats['hit_rate']:.0%}), {stats['entries']} entries")
+                    pruned = cache.prune()
+                    if pruned:
+                        logger.info(f"LLM cache: pruned {pruned} expired/least-used entries")
+        
+        scored_count = len(offsets) - len(deferred_rows)
+        logger.info(f"Scored {scored_count} opportunities ({llm_enhanced_count} LLM-enhanced)")
+        if total_llm_cost or total_tokens:
             logger.info(f"LLM cost: ${total_llm_cost:.6f}, tokens: {total_tokens}")
             job['cost_usd'] = total_llm_cost
             job['input_tokens'] = total_tokens  # Approximate
             job['output_tokens'] = 0
         
-        # 4. Deduplicate
-        unique_opps = deduplicate_opportunities(all_opps)
-        logger.info(f"After deduplication: {len(unique_opps)} unique ({len(all_opps) - len(unique_opps)} duplicates removed)")
-        
-        # 5. Enrich
-        for opp in unique_opps:
-            enrich_opportunity(opp)
+        # 5. Deduplicate on (score, title) columns
+        kept_rows = dedup_rows(scores, titles, (row for row in range(len(offsets)) if row not in deferred_rows))
+        del titles
+        logger.info(f"After deduplication: {len(kept_rows)} unique ({scored_count - len(kept_rows)} duplicates removed)")
         
-        logger.info(f"Enriched {len(unique_opps)} opportunities")
+        # 6. Stream kept rows: enrich -> drop near-duplicates of earlier runs -> save as JSONL
+        similarity_index = SimHashIndex() if CROSS_RUN_DEDUP_DAYS > 0 else None
+        cross_run_removed = 0
+        saved_count = 0
+        score_total = 0
+        top_score = None
         
-        # 6. Save as JSONL (one per line)
         today = datetime.now().strftime('%Y%m%d')
         output = PROCESSED_DIR / f'opportunities_{today}.jsonl'
         
+        # The new deferred queue only replaces the old one when the run commits
+        replacements = {}
+        if queued or deferred_queue:
+            staging = deferred_queue.queue_file.with_name(deferred_queue.queue_file.name + '.pending')
+            deferred_queue.save(staging)
+            replacements[deferred_queue.queue_file] = staging
+        
+        # Recorded first so a crash mid-append can be rolled back instead of appended twice
+        ledger.begin(output, replacements)
+        written = hashlib.sha256()
         with open(output, 'a') as f:
-            for opp in unique_opps:
-                f.write(json.dumps(opp) + '\n')
+            for row in kept_rows:
+                opp = spool.read(offsets[row])
+                opp['score'] = scores[row]
+                if row in llm_results:
+                    opp['llm_analysis'] = llm_results[row]
+                enrich_opportunity(opp)
+                
+                if similarity_index and is_cross_run_duplicate(opp, similarity_index):
+                    cross_run_removed += 1
+                    continue
+                
+                line = json.dumps(opp) + '\n'
+                f.write(line)
+                written.update(line.encode('utf-8'))
+                saved_count += 1
+                score_total += opp['score']
+                top_score = opp['score'] if top_score is None else max(top_score, opp['score'])
+            f.flush()
+            os.fsync(f.fileno())
+        ledger.mark_written(output.stat().st_size, written.hexdigest())
         
+        spool.close()
+        
+        if similarity_index:
+            logger.info(f"After cross-run deduplication: {saved_count} unique "
+                        f"({cross_run_removed} near-duplicates of the last {CROSS_RUN_DEDUP_DAYS} days removed)")
         logger.info(f"Saved to {output}")
         
-        # 7. Update last run time
-        save_last_run_time()
+        # Derived state, signatures included, only follows output that is durably written
+        apply_output(ledger, similarity_index)
+        
+        # 7. Mark the raw bytes read in this run as processed
+        ledger.commit()
         
         # Log summary
-        if unique_opps:
-            top_score = max(o['score'] for o in unique_opps)
-            avg_score = sum(o['score'] for o in unique_opps) / len(unique_opps)
-            logger.info(f"Score range: {avg_score:.1f} avg, {top_score} max")
+        if saved_count:
+            logger.info(f"Score range: {score_total / saved_count:.1f} avg, {top_score} max")
         
         logger.info("=" * 60)
-        logger.info(f"Processing complete: {len(all_opps)} → {len(unique_opps)} unique")
+        logger.info(f"Processing complete: {scored_count} → {saved_count} unique")
         logger.info("=" * 60)
         
-        job['items_processed'] = len(unique_opps)
+        job['items_processed'] = saved_count
         
         # Print summary
-        print(f"Processed {len(all_opps)} opportunities → {len(unique_opps)} unique")
+        print(f"Processed {scored_count} opportunities → {saved_count} unique")
         print(f"Saved to: {output}")
 
+def main():
+    """Run the pipeline, one run at a time"""
+    lock_path = INGEST_LEDGER_FILE.with_name(INGEST_LEDGER_FILE.name + '.lock')
+    with ExitStack() as stack:
+        try:
+            stack.enter_context(file_lock(lock_path))
+        except TimeoutError:
+            logger.warning("Another processing run holds the ingestion ledger, skipping this run")
+            return
+        process()
+
 if __name__ == '__main__':
     try:
         main()
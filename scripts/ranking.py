@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Opportunity Ranking
+One pass over opportunities that keeps a bounded top-K per score tier, an
+overall top-N and counts at score cutoffs, instead of sorting everything.
+
+Order matches a stable sort by score descending: ties go to the
+opportunity seen first.
+"""
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import DIGEST_TOP_TIER_LIMIT, DIGEST_HIGH_POTENTIAL_LIMIT, DIGEST_WORTH_EXPLORING_LIMIT
+from scoring import SCORING_CONFIG
+
+
+class TopK:
+    """The k highest-scored items pushed so far"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[int, int, Any]] = []  # min-heap of (score, -seq, item)
+
+    def push(self, score: int, seq: int, item: Any) -> None:
+        if self.k <= 0:
+            return
+        entry = (score, -seq, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Any]:
+        """Items by score descending, ties in push order"""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def entries(self) -> List[Tuple[int, int, Any]]:
+        """(score, seq, item) for every kept item"""
+        return [(score, -neg_seq, item) for score, neg_seq, item in self._heap]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class TierRanking:
+    """
+    Top-K per score tier, overall top-N and cutoff counts from one pass.
+
+    tiers are (name, min_score, limit); a tier holds scores from its
+    min_score up to the next higher tier's. Scores below every tier are
+    only counted in total and count_at.
+    """
+
+    def __init__(self, tiers: List[Tuple[str, int, int]], top_n: int = 0, count_at: Iterable[int] = ()):
+        self.tiers = sorted(tiers, key=lambda t: t[1], reverse=True)
+        self.tier_top = {name: TopK(limit) for name, _, limit in self.tiers}
+        self.tier_counts = {name: 0 for name, _, _ in self.tiers}
+        self.top = TopK(top_n)
+        self.cutoff_counts = {cutoff: 0 for cutoff in count_at}
+        self.total = 0
+        self.score_total = 0
+        self.max_score: Optional[int] = None
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        score = opp.get('score', 0)
+        seq = self.total
+        self.total += 1
+        self.score_total += score
+        self.max_score = score if self.max_score is None else max(self.max_score, score)
+
+        self.top.push(score, seq, opp)
+        for name, min_score, _ in self.tiers:
+            if score >= min_score:
+                self.tier_top[name].push(score, seq, opp)
+                self.tier_counts[name] += 1
+                break
+        for cutoff in self.cutoff_counts:
+            if score >= cutoff:
+                self.cutoff_counts[cutoff] += 1
+
+    def add_all(self, opps: Iterable[Dict[str, Any]]) -> 'TierRanking':
+        for opp in opps:
+            self.add(opp)
+        return self
+
+    def merge(self, other: 'TierRanking') -> 'TierRanking':
+        """
+        Fold in a ranking of opportunities seen after this one's
+
+        Both must use the same tiers, top_n and count_at. Top-K of the
+        union is the top-K of the two top-Ks, so nothing is lost.
+        """
+        offset = self.total
+        for name, top in other.tier_top.items():
+            for score, seq, item in top.entries():
+                self.tier_top[name].push(score, offset + seq, item)
+            self.tier_counts[name] += other.tier_counts[name]
+        for score, seq, item in other.top.entries():
+            self.top.push(score, offset + seq, item)
+        for cutoff, count in other.cutoff_counts.items():
+            self.cutoff_counts[cutoff] += count
+        self.total += other.total
+        self.score_total += other.score_total
+        if other.max_score is not None:
+            self.max_score = other.max_score if self.max_score is None else max(self.max_score, other.max_score)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state (see from_dict)"""
+        return {
+            'tiers': {name: top.entries() for name, top in self.tier_top.items()},
+            'tier_counts': self.tier_counts,
+            'top': self.top.entries(),
+            'cutoff_counts': {str(cutoff): count for cutoff, count in self.cutoff_counts.items()},
+            'total': self.total,
+            'score_total': self.score_total,
+            'max_score': self.max_score
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], tiers: List[Tuple[str, int, int]], top_n: int = 0,
+                  count_at: Iterable[int] = ()) -> 'TierRanking':
+        """Rebuild a ranking saved by to_dict, with the same tiers, top_n and count_at"""
+        ranking = cls(tiers, top_n, count_at)
+        for name, entries in data['tiers'].items():
+            for score, seq, item in entries:
+                ranking.tier_top[name].push(score, seq, item)
+        for score, seq, item in data['top']:
+            ranking.top.push(score, seq, item)
+        ranking.tier_counts = dict(data['tier_counts'])
+        ranking.cutoff_counts = {int(cutoff): count for cutoff, count in data['cutoff_counts'].items()}
+        ranking.total = data['total']
+        ranking.score_total = data['score_total']
+        ranking.max_score = data['max_score']
+        return ranking
+
+    def tier(self, name: str) -> List[Dict[str, Any]]:
+        """Best opportunities in a tier, up to its limit"""
+        return self.tier_top[name].items()
+
+    def count(self, min_score: int) -> int:
+        """Opportunities scoring at least min_score (must be one of count_at)"""
+        return self.cutoff_counts[min_score]
+
+    @property
+    def average(self) -> float:
+        return self.score_total / self.total if self.total else 0.0
+
+
+def digest_tiers() -> List[Tuple[str, int, int]]:
+    """Digest tiers from scoring_config.json thresholds and the DIGEST_*_LIMIT settings"""
+    thresholds = SCORING_CONFIG.get('thresholds', {})
+    return [
+        ('top_tier', thresholds.get('top_tier', 80), DIGEST_TOP_TIER_LIMIT),
+        ('high_potential', thresholds.get('high_quality', 60), DIGEST_HIGH_POTENTIAL_LIMIT),
+        ('worth_exploring', thresholds.get('minimum_score', 40), DIGEST_WORTH_EXPLORING_LIMIT)
+    ]
+
+
+def delivery_cutoffs() -> List[int]:
+    """Score cutoffs counted for delivery: footer 60/80 and the high-quality threshold"""
+    high_quality = SCORING_CONFIG.get('thresholds', {}).get('high_quality', 60)
+    return sorted({60, 80, high_quality})
+
+
+def delivery_ranking(top_n: int = 0) -> TierRanking:
+    """
+    Empty ranking shared by the digest and Telegram: digest tiers, an
+    overall top_n, and counts at delivery_cutoffs()
+    """
+    return TierRanking(digest_tiers(), top_n, count_at=delivery_cutoffs())
+
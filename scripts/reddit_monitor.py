@@ -9,6 +9,7 @@ import feedparser
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import requests
 
@@ -16,32 +17,72 @@ import requests
 from config import (
     RAW_DIR, REDDIT_SUBREDDITS, REDDIT_PAIN_KEYWORDS, REDDIT_PROMO_INDICATORS,
     REQUEST_TIMEOUT, USER_AGENT, RETRY_DELAY, BODY_PREVIEW_LENGTH,
-    COLLECTION_HOURS_BACK, LOG_DIR
+    COLLECTION_HOURS_BACK, LOG_DIR, REDDIT_FETCH_WORKERS, REDDIT_MIN_REQUEST_INTERVAL
 )
+from http_client import http_get
+from matcher import get_matcher
 from utils import (
-    setup_logging, DuplicateDetector, clean_html,
-    normalize_opportunity, validate_opportunity
+    setup_logging, DuplicateDetector, get_duplicate_detector, FeedCache, HostRateLimiter,
+    clean_html, normalize_opportunity, validate_opportunity
 )
 from usage_tracker import UsageTracker
 
 # Setup logging
 logger = setup_logging(__name__, LOG_DIR / 'reddit_monitor.log')
 
-def fetch_subreddit_rss(subreddit: str, hours_back: int, duplicate_detector: DuplicateDetector):
-    """Fetch posts from a subreddit's RSS feed."""
+# Promo and pain phrases matched together in one pass per post
+KEYWORD_MATCHER = get_matcher({'promo': REDDIT_PROMO_INDICATORS, 'pain': REDDIT_PAIN_KEYWORDS})
+
+def _entry_published(entry):
+    """Entry publish time as naive UTC datetime, or None if missing."""
+    if 'published_parsed' in entry and entry.published_parsed:
+        # feedparser often gives naive, assume UTC for simplicity
+        return datetime(*entry.published_parsed[:6])
+    return None
+
+def fetch_subreddit_rss(subreddit: str, hours_back: int, duplicate_detector: DuplicateDetector,
+                        rate_limiter: HostRateLimiter = None, feed_cache: FeedCache = None):
+    """
+    Fetch posts from a subreddit's RSS feed.
+
+    With a feed_cache, the request is conditional (ETag / Last-Modified) so
+    unchanged feeds return 304 and are skipped before parsing, and entry
+    processing stops at the newest post seen on the previous fetch.
+    """
     from config import API_PER_PAGE
     results = []
     rss_url = f'https://www.reddit.com/r/{subreddit}/new/.rss?limit={API_PER_PAGE}'
+    cached = feed_cache.get(rss_url) if feed_cache else {}
     
     try:
+        if rate_limiter:
+            rate_limiter.wait(rss_url)
         logger.info(f"Fetching: {rss_url}")
         
         headers = {'User-Agent': USER_AGENT}
-        response = requests.get(rss_url, timeout=REQUEST_TIMEOUT, headers=headers)
+        if feed_cache:
+            headers.update(feed_cache.conditional_headers(rss_url))
+        response = http_get(rss_url, timeout=REQUEST_TIMEOUT, headers=headers)
         response.raise_for_status()
 
+        if response.status_code == 304:
+            logger.info(f"r/{subreddit} unchanged since last fetch (304)")
+            return results
+
         feed = feedparser.parse(response.content)
 
+        # Newest entry of this response becomes the stop marker for the next run
+        newest_id, newest_pub = None, None
+        for entry in feed.entries:
+            pub = _entry_published(entry)
+            if pub and (newest_pub is None or pub > newest_pub):
+                newest_id, newest_pub = entry.get('id', entry.link), pub
+        if feed_cache:
+            feed_cache.update(rss_url, etag=response.headers.get('ETag'),
+                              last_modified=response.headers.get('Last-Modified'),
+                              newest_entry_id=newest_id,
+                              newest_published=newest_pub.isoformat() if newest_pub else None)
+
         if not feed.entries:
             logger.warning(f"No entries found for r/{subreddit}")
             return results
@@ -49,16 +90,21 @@ def fetch_subreddit_rss(subreddit: str, hours_back: int, duplicate_detector: Dup
         # Time filter
         time_filter = datetime.now() - timedelta(hours=hours_back)
 
+        # Entries up to here were already evaluated on a previous run
+        seen_id = cached.get('newest_entry_id')
+        seen_published = datetime.fromisoformat(cached['newest_published']) if cached.get('newest_published') else None
+
         for entry in feed.entries:
             try:
                 # Parse timestamp
-                if 'published_parsed' in entry and entry.published_parsed:
-                    pub_date_naive = datetime(*entry.published_parsed[:6])
-                    # Assume pub_date is UTC if no timezone is specified by feedparser
-                    pub_date_utc = pub_date_naive # feedparser often gives naive, assume UTC for simplicity
-                else:
+                pub_date_utc = _entry_published(entry)
+                if pub_date_utc is None:
                     continue # Skip if no publish date
 
+                # /new/ is newest-first: stop once we reach already-seen posts
+                if entry.get('id', entry.link) == seen_id or (seen_published and pub_date_utc < seen_published):
+                    break
+
                 # Skip old posts
                 if pub_date_utc < time_filter:
                     continue
@@ -69,13 +115,14 @@ def fetch_subreddit_rss(subreddit: str, hours_back: int, duplicate_detector: Dup
                 content_clean = clean_html(content_raw)
                 
                 text = (title + " " + content_clean).lower()
+                matches = KEYWORD_MATCHER.match(text)
 
                 # Skip self-promotion / spam
-                if any(promo in text for promo in REDDIT_PROMO_INDICATORS):
+                if 'promo' in matches:
                     continue
 
                 # Check for pain point keywords
-                matched_keywords = [kw for kw in REDDIT_PAIN_KEYWORDS if kw in text]
+                matched_keywords = matches.get('pain', [])
 
                 # Include if has keywords
                 if matched_keywords:
@@ -114,6 +161,31 @@ def fetch_subreddit_rss(subreddit: str, hours_back: int, duplicate_detector: Dup
         logger.error(f"Unexpected error fetching r/{subreddit}: {e}")
         return []
 
+def fetch_all_subreddits(subreddits, hours_back: int, duplicate_detector: DuplicateDetector,
+                         workers: int = REDDIT_FETCH_WORKERS, feed_cache: FeedCache = None):
+    """
+    Fetch several subreddits, concurrently when workers > 1.
+
+    Requests to reddit.com are spaced by REDDIT_MIN_REQUEST_INTERVAL regardless
+    of worker count. Results come back in subreddit order so output files are
+    deterministic.
+
+    Returns:
+        List of (subreddit, results) tuples
+    """
+    rate_limiter = HostRateLimiter(REDDIT_MIN_REQUEST_INTERVAL)
+
+    def fetch(sub):
+        return fetch_subreddit_rss(sub, hours_back=hours_back, duplicate_detector=duplicate_detector,
+                                   rate_limiter=rate_limiter, feed_cache=feed_cache)
+
+    if workers <= 1:
+        return [(sub, fetch(sub)) for sub in subreddits]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() yields in input order, independent of completion order
+        return list(zip(subreddits, executor.map(fetch, subreddits)))
+
 def main():
     """Main execution"""
     tracker = UsageTracker()
@@ -125,16 +197,18 @@ def main():
         logger.info(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         logger.info(f"Method: RSS feeds (no API needed)")
         logger.info(f"Looking back: {COLLECTION_HOURS_BACK} hours")
+        logger.info(f"Workers: {REDDIT_FETCH_WORKERS}")
         logger.info("")
 
-        duplicate_detector = DuplicateDetector()
+        duplicate_detector = get_duplicate_detector()
+        feed_cache = FeedCache()
         all_results = []
 
-        for sub in REDDIT_SUBREDDITS:
-            logger.info(f"Scanning r/{sub}...")
-            results = fetch_subreddit_rss(sub, hours_back=COLLECTION_HOURS_BACK, duplicate_detector=duplicate_detector)
+        fetched = fetch_all_subreddits(REDDIT_SUBREDDITS, COLLECTION_HOURS_BACK, duplicate_detector,
+                                       feed_cache=feed_cache)
+        for sub, results in fetched:
             all_results.extend(results)
-            logger.info(f" ✓ Found {len(results)} new opportunities (duplicates filtered)")
+            logger.info(f"r/{sub}: ✓ Found {len(results)} new opportunities (duplicates filtered)")
 
         # Save seen IDs
         duplicate_detector.save()
@@ -163,11 +237,14 @@ def main():
             for opp in normalized_opportunities:
                 f.write(json.dumps(opp) + '\n')
 
+        # Only advance feed markers once the results they cover are on disk
+        feed_cache.save()
+
         logger.info("")
         logger.info("=" * 60)
         logger.info(f"Summary:")
         logger.info(f" Total new opportunities: {len(all_results)}")
-        logger.info(f" Total seen IDs tracked: {len(duplicate_detector.seen_ids)}")
+        logger.info(f" Total seen IDs tracked: {len(duplicate_detector)}")
         logger.info(f" Saved to: {output_file}")
         logger.info("=" * 60)
 
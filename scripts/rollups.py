@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Daily Rollups
+Pre-aggregated metrics of processed opportunities, one row per
+(day, source, domain, score bucket) with counts, score sums and extremes
+and LLM usage, plus daily keyword counts and the first engagement/score
+mismatch examples of each day. Reviews over any window sum a few rows per
+day instead of re-reading every opportunity.
+
+process_opportunities updates the rollups at the end of each run. The
+first run after they are created (or after SCORE_BUCKET_WIDTH changes)
+rebuilds them from the opportunity store.
+
+Usage:
+    python3 rollups.py --rebuild       # rebuild every day from the opportunity store
+    python3 rollups.py --days 30       # per-source, per-domain and keyword totals
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from config import ROLLUP_DB, STATE_LOCK_TIMEOUT
+from digest_state import pain_keywords
+from opportunity_store import OpportunityStore
+from sketches import window_days
+
+logger = logging.getLogger(__name__)
+
+# Divides the 40/60/80 review cutoffs, so bucket counts are exact at them
+SCORE_BUCKET_WIDTH = 10
+# Mismatch examples kept per day and kind (the review shows the first 5)
+EXAMPLES_PER_DAY = 5
+# Applied runs remembered, so a run redone after a crash is not counted twice
+MAX_APPLIED_RUNS = 50
+
+# Summed rollup columns, then (column, SQL aggregate) for the others
+SUM_FIELDS = ('count', 'score_total', 'llm_count', 'llm_cost', 'llm_tokens', 'llm_change_total', 'llm_change_count')
+EXTREME_FIELDS = (('score_min', 'MIN'), ('score_max', 'MAX'), ('llm_max_increase', 'MAX'),
+                  ('llm_max_decrease', 'MIN'), ('first_seen', 'MIN'))
+
+
+def score_bucket(score: int) -> int:
+    """Lowest score of score's bucket"""
+    return score // SCORE_BUCKET_WIDTH * SCORE_BUCKET_WIDTH
+
+
+def engagement_mismatch(opp: Dict[str, Any]) -> Optional[str]:
+    """
+    'high_engagement_low_score' (10+ comments and reactions, score < 50),
+    'low_engagement_high_score' (< 5, score 60+) or None
+    """
+    engagement = opp.get('engagement_data', {})
+    score = opp.get('score', 0)
+    total_engagement = engagement.get('comments', 0) + engagement.get('reactions', 0)
+    if total_engagement >= 10 and score < 50:
+        return 'high_engagement_low_score'
+    if total_engagement < 5 and score >= 60:
+        return 'low_engagement_high_score'
+    return None
+
+
+def mismatch_example(opp: Dict[str, Any]) -> Dict[str, Any]:
+    engagement = opp.get('engagement_data', {})
+    return {
+        'title': opp.get('title', '')[:60],
+        'score': opp.get('score', 0),
+        'engagement': engagement.get('comments', 0) + engagement.get('reactions', 0),
+        'source': opp.get('source', '')
+    }
+
+
+def collector_keywords(opp: Dict[str, Any]) -> List[str]:
+    """Keywords a collector matched (HN matched_keywords, Reddit engagement_data.keywords)"""
+    return opp.get('matched_keywords') or opp.get('engagement_data', {}).get('keywords') or []
+
+
+class Rollup:
+    """Aggregates of the opportunities sharing one (day, source, domain, score bucket)"""
+
+    def __init__(self):
+        self.count = 0
+        self.score_total = 0
+        self.score_min: Optional[int] = None
+        self.score_max: Optional[int] = None
+        self.llm_count = 0
+        self.llm_cost = 0.0
+        self.llm_tokens = 0
+        self.llm_change_total = 0
+        self.llm_change_count = 0
+        self.llm_max_increase: Optional[int] = None
+        self.llm_max_decrease: Optional[int] = None
+        self.first_seen: Optional[str] = None
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        score = opp.get('score', 0)
+        self.count += 1
+        self.score_total += score
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+        if self.first_seen is None:
+            self.first_seen = opp['processed_at']
+
+        if 'llm_analysis' not in opp:
+            return
+        llm_data = opp.get('llm_analysis', {})
+        self.llm_count += 1
+        self.llm_cost += llm_data.get('cost_usd', 0)
+        self.llm_tokens += llm_data.get('tokens', {}).get('total_tokens', 0)
+        base = llm_data.get('base_score', 0)
+        final = llm_data.get('final_score', 0)
+        if base and final:
+            change = final - base
+            self.llm_change_total += change
+            self.llm_change_count += 1
+            self.llm_max_increase = change if self.llm_max_increase is None else max(self.llm_max_increase, change)
+            self.llm_max_decrease = change if self.llm_max_decrease is None else min(self.llm_max_decrease, change)
+
+    def values(self) -> Tuple[Any, ...]:
+        """Column values in SUM_FIELDS then EXTREME_FIELDS order"""
+        return tuple(getattr(self, field) for field in SUM_FIELDS) + \
+            tuple(getattr(self, field) for field, _ in EXTREME_FIELDS)
+
+
+class RollupStore:
+    """
+    Daily rollups in SQLite.
+
+    add() collects this run's opportunities; save() adds them to the
+    stored rows in one transaction.
+    """
+
+    def __init__(self, db_path: Path = ROLLUP_DB):
+        self._rollups: Dict[Tuple[str, str, str, int], Rollup] = {}
+        self._keywords: Counter = Counter()  # (day, kind, keyword) -> count
+        self._examples: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._init_db()
+
+    def _init_db(self) -> None:
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS daily_rollups (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            domain TEXT NOT NULL,
+            score_bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            score_total INTEGER NOT NULL,
+            llm_count INTEGER NOT NULL,
+            llm_cost REAL NOT NULL,
+            llm_tokens INTEGER NOT NULL,
+            llm_change_total INTEGER NOT NULL,
+            llm_change_count INTEGER NOT NULL,
+            score_min INTEGER NOT NULL,
+            score_max INTEGER NOT NULL,
+            llm_max_increase INTEGER,
+            llm_max_decrease INTEGER,
+            first_seen TEXT NOT NULL,
+            PRIMARY KEY (day, source, domain, score_bucket)
+        )''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS daily_keywords (
+            day TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, kind, keyword)
+        )''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS daily_examples (
+            day TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            example TEXT NOT NULL,
+            PRIMARY KEY (day, kind, position)
+        )''')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS rollup_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS applied_runs (
+            run_id TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )''')
+        self._conn.commit()
+
+    @property
+    def built(self) -> bool:
+        """True once rebuilt from the store with the current SCORE_BUCKET_WIDTH"""
+        row = self._conn.execute("SELECT value FROM rollup_meta WHERE key = 'bucket_width'").fetchone()
+        return row is not None and int(row[0]) == SCORE_BUCKET_WIDTH
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        """Count a processed opportunity on its processing day"""
+        day = opp['processed_at'][:10]
+        key = (day, opp.get('source', 'unknown'), opp.get('domain', 'other'), score_bucket(opp.get('score', 0)))
+        rollup = self._rollups.get(key)
+        if rollup is None:
+            rollup = self._rollups[key] = Rollup()
+        rollup.add(opp)
+
+        for keyword in pain_keywords(opp):
+            self._keywords[(day, 'pain', keyword)] += 1
+        for keyword in collector_keywords(opp):
+            self._keywords[(day, 'collector', keyword)] += 1
+
+        kind = engagement_mismatch(opp)
+        if kind:
+            examples = self._examples.setdefault((day, kind), [])
+            if len(examples) < EXAMPLES_PER_DAY:
+                examples.append(mismatch_example(opp))
+
+    def save(self, run_id: Optional[str] = None) -> None:
+        """
+        Add this run to the stored rollups
+
+        run_id identifies the run; a run already applied (redone after a
+        crash) is not counted again. Rollups not yet built are rebuilt from
+        the opportunity store, which by now holds this run's opportunities.
+        """
+        if not self.built:
+            logger.info("Building daily rollups from the opportunity store")
+            self._clear_pending()
+            store = OpportunityStore()
+            try:
+                self.rebuild(store.iter_recent(datetime.min))
+            finally:
+                store.close()
+            if run_id is not None:
+                with self._conn:
+                    self._mark_applied(run_id)
+            return
+
+        with self._conn:
+            if run_id is not None:
+                applied = self._conn.execute('SELECT 1 FROM applied_runs WHERE run_id = ?', (run_id,)).fetchone()
+                if applied:
+                    logger.info(f"Daily rollups already include run {run_id}")
+                    self._clear_pending()
+                    return
+            self._write_pending()
+            if run_id is not None:
+                self._mark_applied(run_id)
+
+    def _clear_pending(self) -> None:
+        self._rollups = {}
+        self._keywords = Counter()
+        self._examples = {}
+
+    def _mark_applied(self, run_id: str) -> None:
+        self._conn.execute('INSERT OR IGNORE INTO applied_runs (run_id, applied_at) VALUES (?, ?)',
+                           (run_id, datetime.now().isoformat()))
+        self._conn.execute('''DELETE FROM applied_runs WHERE run_id NOT IN (
+            SELECT run_id FROM applied_runs ORDER BY applied_at DESC LIMIT ?)''', (MAX_APPLIED_RUNS,))
+
+    def _write_pending(self) -> None:
+        columns = SUM_FIELDS + tuple(field for field, _ in EXTREME_FIELDS)
+        updates = [f'{field} = {field} + excluded.{field}' for field in SUM_FIELDS] + [
+            f'{field} = {func}(COALESCE({field}, excluded.{field}), COALESCE(excluded.{field}, {field}))'
+            for field, func in EXTREME_FIELDS
+        ]
+        self._conn.executemany(
+            f'''INSERT INTO daily_rollups (day, source, domain, score_bucket, {', '.join(columns)})
+                VALUES ({', '.join('?' * (4 + len(columns)))})
+                ON CONFLICT(day, source, domain, score_bucket) DO UPDATE SET {', '.join(updates)}''',
+            [key + rollup.values() for key, rollup in sorted(self._rollups.items())]
+        )
+        self._conn.executemany(
+            '''INSERT INTO daily_keywords (day, kind, keyword, count) VALUES (?, ?, ?, ?)
+               ON CONFLICT(day, kind, keyword) DO UPDATE SET count = count + excluded.count''',
+            [key + (count,) for key, count in sorted(self._keywords.items())]
+        )
+        for (day, kind), examples in sorted(self._examples.items()):
+            kept = self._conn.execute('SELECT COUNT(*) FROM daily_examples WHERE day = ? AND kind = ?',
+                                      (day, kind)).fetchone()[0]
+            self._conn.executemany(
+                'INSERT INTO daily_examples (day, kind, position, example) VALUES (?, ?, ?, ?)',
+                [(day, kind, position, json.dumps(example))
+                 for position, example in enumerate(examples[:EXAMPLES_PER_DAY - kept], kept)]
+            )
+        self._clear_pending()
+
+    def rebuild(self, opps: Iterable[Dict[str, Any]]) -> int:
+        """Replace every stored rollup with rollups of opps (in processing order); returns opportunities read"""
+        count = 0
+        for opp in opps:
+            self.add(opp)
+            count += 1
+        with self._conn:
+            for table in ('daily_rollups', 'daily_keywords', 'daily_examples'):
+                self._conn.execute(f'DELETE FROM {table}')
+            self._write_pending()
+            self._conn.execute("INSERT OR REPLACE INTO rollup_meta (key, value) VALUES ('bucket_width', ?)",
+                               (str(SCORE_BUCKET_WIDTH),))
+        return count
+
+    def rows(self, first_day: date, last_day: date) -> Iterator[Dict[str, Any]]:
+        """
+        Rollups from first_day to last_day (inclusive), summed per
+        (source, domain, score bucket), earliest first seen first
+        """
+        aggregates = [f'SUM({field})' for field in SUM_FIELDS] + [f'{func}({field})' for field, func in EXTREME_FIELDS]
+        fields = ('source', 'domain', 'score_bucket') + SUM_FIELDS + tuple(field for field, _ in EXTREME_FIELDS)
+        query = f'''SELECT source, domain, score_bucket, {', '.join(aggregates)} FROM daily_rollups
+                    WHERE day >= ? AND day <= ? GROUP BY source, domain, score_bucket
+                    ORDER BY MIN(first_seen), source, domain, score_bucket'''
+        for row in self._conn.execute(query, (first_day.isoformat(), last_day.isoformat())):
+            yield dict(zip(fields, row))
+
+    def keywords(self, first_day: date, last_day: date, kind: str = 'pain') -> Counter:
+        """Keyword counts from first_day to last_day (inclusive)"""
+        query = '''SELECT keyword, SUM(count) FROM daily_keywords WHERE kind = ? AND day >= ? AND day <= ?
+                   GROUP BY keyword ORDER BY MIN(day), keyword'''
+        return Counter(dict(self._conn.execute(query, (kind, first_day.isoformat(), last_day.isoformat()))))
+
+    def examples(self, first_day: date, last_day: date, limit: int = EXAMPLES_PER_DAY) -> Dict[str, List[Dict[str, Any]]]:
+        """The first limit mismatch examples of each kind from first_day to last_day (inclusive)"""
+        result: Dict[str, List[Dict[str, Any]]] = {'high_engagement_low_score': [], 'low_engagement_high_score': []}
+        query = '''SELECT kind, example FROM daily_examples WHERE day >= ? AND day <= ? ORDER BY day, position'''
+        for kind, example in self._conn.execute(query, (first_day.isoformat(), last_day.isoformat())):
+            if len(result[kind]) < limit:
+                result[kind].append(json.loads(example))
+        return result
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily rollups of processed opportunities')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild every day from the opportunity store')
+    parser.add_argument('--days', type=int, default=7, help='Window in days, today included')
+    args = parser.parse_args()
+
+    rollups = RollupStore()
+    try:
+        if args.rebuild:
+            store = OpportunityStore()
+            try:
+                count = rollups.rebuild(store.iter_recent(datetime.min))
+            finally:
+                store.close()
+            print(f"✅ Rebuilt daily rollups from {count} opportunities")
+            return
+
+        first_day, last_day = window_days(args.days)
+        sources: Counter = Counter()
+        domains: Counter = Counter()
+        score_totals: Counter = Counter()
+        llm_cost = 0.0
+        for row in rollups.rows(first_day, last_day):
+            sources[row['source']] += row['count']
+            domains[row['domain']] += row['count']
+            score_totals[row['source']] += row['score_total']
+            llm_cost += row['llm_cost']
+
+        print(f"Rollups {first_day} to {last_day}: {sum(sources.values())} opportunities, ${llm_cost:.4f} LLM cost")
+        print("\nSources")
+        for source, count in sources.most_common():
+            print(f"  {source}: {count} (avg {score_totals[source] / count:.1f})")
+        print("\nDomains")
+        for domain, count in domains.most_common():
+            print(f"  {domain}: {count}")
+        print("\nPain keywords")
+        for keyword, count in rollups.keywords(first_day, last_day).most_common(10):
+            print(f"  {keyword}: {count}")
+    finally:
+        rollups.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -6,6 +6,12 @@ Separated from process_opportunities.py for easier backtesting
 import json
 from pathlib import Path
 from datetime import datetime
+from matcher import get_matcher, get_signal_matcher
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # batch scoring falls back to the scalar loop
 
 # Load scoring config
 CONFIG_PATH = Path(__file__).parent.parent / 'scoring_config.json'
@@ -18,6 +24,24 @@ def load_config():
 # Global config (reloaded on import)
 SCORING_CONFIG = load_config()
 
+# Config sections made of phrase lists
+SIGNAL_SECTIONS = ('pain_point_signals', 'competition_signals', 'market_signals')
+
+def source_weight(source, config):
+    """Source credibility points for a source string"""
+    source_weights = config['source_weights']
+    
+    if source.startswith('github:'):
+        return source_weights['github']
+    elif source == 'hackernews':
+        return source_weights['hackernews']
+    elif source.startswith('reddit:'):
+        # Extract subreddit name
+        subreddit = source.replace('reddit:', '')
+        key = f'reddit:{subreddit}'
+        return source_weights.get(key, source_weights['reddit:default'])
+    return 0
+
 def score_opportunity(opp, config=None):
     """
     Score opportunity 0-100 based on config-driven signals
@@ -35,19 +59,11 @@ def score_opportunity(opp, config=None):
     score = 0
     text = (opp.get('title', '') + ' ' + opp.get('body', '')).lower()
     
-    # 1. Source credibility
-    source = opp.get('source', '')
-    source_weights = config['source_weights']
+    # All phrase signals found in a single pass over the text
+    signal_hits = get_signal_matcher(config).matched_categories(text)
     
-    if source.startswith('github:'):
-        score += source_weights['github']
-    elif source == 'hackernews':
-        score += source_weights['hackernews']
-    elif source.startswith('reddit:'):
-        # Extract subreddit name
-        subreddit = source.replace('reddit:', '')
-        key = f'reddit:{subreddit}'
-        score += source_weights.get(key, source_weights['reddit:default'])
+    # 1. Source credibility
+    score += source_weight(opp.get('source', ''), config)
     
     # 2. Engagement signals
     engagement = opp.get('engagement_data', {})
@@ -72,7 +88,7 @@ def score_opportunity(opp, config=None):
     pain_config = config['pain_point_signals']
     
     for signal_type, signal_data in pain_config.items():
-        if any(phrase in text for phrase in signal_data['phrases']):
+        if ('pain_point_signals', signal_type) in signal_hits:
             score += signal_data['score']
     
     # 4. Specificity
@@ -92,18 +108,153 @@ def score_opportunity(opp, config=None):
     comp_config = config['competition_signals']
     
     for signal_type, signal_data in comp_config.items():
-        if any(phrase in text for phrase in signal_data['phrases']):
+        if ('competition_signals', signal_type) in signal_hits:
             score += signal_data['score']
     
     # 6. Market signals
     market_config = config['market_signals']
     
     for signal_type, signal_data in market_config.items():
-        if any(phrase in text for phrase in signal_data['phrases']):
+        if ('market_signals', signal_type) in signal_hits:
             score += signal_data['score']
     
     return min(score, 100)
 
+def config_phrases(config):
+    """All distinct signal phrases in a config, in config order"""
+    phrases = []
+    for section in SIGNAL_SECTIONS:
+        for signal_data in config.get(section, {}).values():
+            phrases.extend(signal_data['phrases'])
+    return list(dict.fromkeys(phrases))
+
+def extract_features(opps, phrases=None):
+    """
+    Columnar, config-independent inputs to scoring for a batch of opportunities
+    
+    Text is scanned once per opportunity; the result can be scored against
+    any config whose phrases are all in the vocabulary (see score_features).
+    
+    Args:
+        opps: List of opportunity dicts
+        phrases: Phrase vocabulary (defaults to the global config's phrases)
+    
+    Returns:
+        dict of NumPy arrays
+    """
+    if phrases is None:
+        phrases = config_phrases(SCORING_CONFIG)
+    phrases = list(dict.fromkeys(phrases))
+    phrase_matcher = get_matcher({phrase: [phrase] for phrase in phrases})
+    column = {phrase: i for i, phrase in enumerate(phrases)}
+    
+    n = len(opps)
+    phrase_hits = np.zeros((n, len(phrases)), dtype=bool)
+    reactions = np.zeros(n)
+    comments = np.zeros(n)
+    hn_score = np.zeros(n)
+    body_len = np.zeros(n, dtype=np.int64)
+    has_digits = np.zeros(n, dtype=bool)
+    sources = []
+    
+    for i, opp in enumerate(opps):
+        body = opp.get('body', '')
+        text = (opp.get('title', '') + ' ' + body).lower()
+        for phrase in phrase_matcher.matched_categories(text):
+            phrase_hits[i, column[phrase]] = True
+        
+        engagement = opp.get('engagement_data', {})
+        reactions[i] = engagement.get('reactions', 0)
+        comments[i] = engagement.get('comments', 0)
+        hn_score[i] = engagement.get('score', 0)
+        body_len[i] = len(body)
+        has_digits[i] = any(char.isdigit() for char in body)
+        sources.append(opp.get('source', ''))
+    
+    unique_sources, source_index = np.unique(np.array(sources, dtype=object), return_inverse=True)
+    
+    return {
+        'phrases': phrases,
+        'phrase_hits': phrase_hits,
+        'unique_sources': list(unique_sources),
+        'source_index': source_index.reshape(-1),
+        'reactions': reactions,
+        'comments': comments,
+        'hn_score': hn_score,
+        'body_len': body_len,
+        'has_digits': has_digits
+    }
+
+def score_features(features, config=None):
+    """
+    Score a feature batch against a config, same results as score_opportunity
+    
+    Args:
+        features: Output of extract_features
+        config: Optional scoring config (uses global if not provided)
+    
+    Returns:
+        np.ndarray: Scores 0-100
+    """
+    if config is None:
+        config = SCORING_CONFIG
+    
+    column = {phrase: i for i, phrase in enumerate(features['phrases'])}
+    missing = [p for p in config_phrases(config) if p not in column]
+    if missing:
+        raise ValueError(f"Config phrases not in feature vocabulary: {missing[:5]}")
+    
+    # 1. Source credibility (one lookup per distinct source)
+    weights = np.array([source_weight(s, config) for s in features['unique_sources']], dtype=float)
+    score = weights[features['source_index']] if len(weights) else np.zeros(len(features['body_len']))
+    
+    # 2. Engagement signals
+    eng_weights = config['engagement_weights']
+    score = score + np.minimum(
+        features['reactions'] * eng_weights['github_reaction_multiplier'],
+        eng_weights['github_reaction_max']
+    )
+    score += np.minimum(features['comments'], eng_weights['comments_max'])
+    score += np.minimum(features['hn_score'], eng_weights['hackernews_score_max'])
+    
+    # 3, 5, 6. Pain point, competition and market signals
+    phrase_hits = features['phrase_hits']
+    for section in SIGNAL_SECTIONS:
+        for signal_data in config[section].values():
+            cols = [column[p] for p in signal_data['phrases']]
+            if cols:
+                score += phrase_hits[:, cols].any(axis=1) * signal_data['score']
+    
+    # 4. Specificity
+    spec_config = config['specificity_scoring']
+    body_len = features['body_len']
+    score += np.where(
+        body_len > spec_config['long_body_threshold'], spec_config['long_body_score'],
+        np.where(body_len > spec_config['medium_body_threshold'], spec_config['medium_body_score'], 0)
+    )
+    score += features['has_digits'] * spec_config['contains_numbers_score']
+    
+    return np.minimum(score, 100)
+
+def score_opportunities(opps, config=None):
+    """
+    Score a batch of opportunities, same results as calling score_opportunity on each
+    
+    Args:
+        opps: List of opportunity dicts
+        config: Optional scoring config (uses global if not provided)
+    
+    Returns:
+        list: Scores 0-100, in input order
+    """
+    if config is None:
+        config = SCORING_CONFIG
+    if np is None or not opps:
+        return [score_opportunity(opp, config) for opp in opps]
+    
+    scores = score_features(extract_features(opps, config_phrases(config)), config)
+    return [int(s) if float(s).is_integer() else float(s) for s in scores]
+
 def reload_config():
     """Reload config from disk"""
     global SCORING_CONFIG
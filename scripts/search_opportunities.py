@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Search Opportunities
+Full-text search over processed opportunities in the opportunity store,
+ranked by relevance (bm25, title matches weighted higher).
+
+Usage:
+    python3 search_opportunities.py 'invoicing contractors' --days 90
+    python3 search_opportunities.py '"time tracking" NOT jira' --source reddit --min-score 60
+    python3 search_opportunities.py 'invoic*' --domain finance --since 2026-01-01 --json
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from opportunity_store import OpportunityStore
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def format_result(result, rank_no: int) -> str:
+    opp = result['opportunity']
+    lines = [
+        f"{rank_no}. {opp.get('title', '')} ({opp.get('score', 0)} pts)",
+        f"   {opp.get('source', '')} | {opp.get('domain', 'other')} | {opp.get('processed_at', '')[:10]}",
+        f"   {opp.get('url', '')}"
+    ]
+    snippet = ' '.join(result['snippet'].split())
+    if snippet:
+        lines.append(f"   {snippet}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text search over processed opportunities')
+    parser.add_argument('query', help='FTS5 query: words, "exact phrases", AND/OR/NOT, prefix*')
+    parser.add_argument('--source', help="Source or source prefix, e.g. 'reddit' or 'reddit:SaaS'")
+    parser.add_argument('--domain', help='Domain, e.g. finance')
+    parser.add_argument('--min-score', type=int)
+    parser.add_argument('--days', type=int, help='Only opportunities processed in the last N days')
+    parser.add_argument('--since', type=parse_date, help='Processed on or after YYYY-MM-DD')
+    parser.add_argument('--until', type=parse_date, help='Processed before YYYY-MM-DD')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON lines')
+    args = parser.parse_args()
+
+    since = args.since
+    if args.days:
+        since = max(since or datetime.min, datetime.now() - timedelta(days=args.days))
+
+    store = OpportunityStore()
+    try:
+        start = time.perf_counter()
+        results = store.search(args.query, source=args.source, domain=args.domain, min_score=args.min_score,
+                               since=since, until=args.until, limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        store.close()
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+        return
+
+    for i, result in enumerate(results, 1):
+        print(format_result(result, i))
+        print()
+    print(f"{len(results)} results in {elapsed_ms:.1f}ms")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
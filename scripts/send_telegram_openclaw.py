@@ -3,13 +3,13 @@
 Send Telegram Digest via OpenClaw
 Writes digest to a marker file that OpenClaw monitors and sends
 """
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
 from usage_tracker import UsageTracker
+from digest_state import load_summary
 from utils import setup_logging
-from config import LOG_DIR, PROCESSED_DIR, TELEGRAM_TOP_N
+from config import LOG_DIR, TELEGRAM_TOP_N
 from scoring import SCORING_CONFIG
 
 # Paths
@@ -20,32 +20,22 @@ OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
 # Setup logging
 logger = setup_logging(__name__, LOG_DIR / 'telegram.log')
 
-def load_today_opportunities():
-    """Load today's processed opportunities"""
-    today = datetime.now().strftime('%Y%m%d')
-    jsonl_file = PROCESSED_DIR / f'opportunities_{today}.jsonl'
-    
-    if not jsonl_file.exists():
-        return []
-    
-    opportunities = []
-    with open(jsonl_file, 'r') as f:
-        for line in f:
-            opportunities.append(json.loads(line))
+def load_today_summary():
+    """
+    Top N of today's processed opportunities, plus today's total and
+    high-quality counts
+    """
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    high_quality_threshold = SCORING_CONFIG.get('thresholds', {}).get('high_quality', 60)
     
-    return opportunities
+    ranking = load_summary(today).ranking
+    return ranking.top.items()[:TELEGRAM_TOP_N], ranking.total, ranking.count(high_quality_threshold)
 
-def format_telegram_message(opportunities):
+def format_telegram_message(top_n, total, high_quality):
     """Format top opportunities for Telegram"""
-    if not opportunities:
+    if not top_n:
         return None  # Don't send empty digest
     
-    # Sort by score
-    sorted_opps = sorted(opportunities, key=lambda x: x.get('score', 0), reverse=True)
-
-    # Get top N from config
-    top_n = sorted_opps[:TELEGRAM_TOP_N]
-    
     # Build message
     date_str = datetime.now().strftime('%b %d, %Y')
     msg = f"🎯 **SaaS Opportunities — {date_str}**\n\n"
@@ -75,9 +65,6 @@ def format_telegram_message(opportunities):
         msg += f"   🔗 {url}\n\n"
     
     # Summary
-    total = len(opportunities)
-    high_quality = len([o for o in opportunities if o.get('score', 0) >= high_quality_threshold])
-
     msg += f"📊 {total} collected | {high_quality} high quality ({high_quality_threshold}+)\n\n"
     
     # View full digest hint
@@ -94,17 +81,17 @@ def main():
         logger.info("Queueing Telegram Digest for OpenClaw")
         logger.info("=" * 60)
         
-        # Load opportunities
-        opportunities = load_today_opportunities()
-        logger.info(f"Loaded {len(opportunities)} opportunities")
+        # Load today's top opportunities and counts
+        top_n, total, high_quality = load_today_summary()
+        logger.info(f"Loaded top {len(top_n)} of {total} opportunities")
         
-        if not opportunities:
+        if not top_n:
             logger.info("No opportunities to send")
             print("ℹ️  No opportunities found today - skipping Telegram digest")
             return
         
         # Format message
-        message = format_telegram_message(opportunities)
+        message = format_telegram_message(top_n, total, high_quality)
         
         if not message:
             logger.info("Empty digest - not sending")
@@ -129,7 +116,7 @@ def main():
         
         logger.info("=" * 60)
         
-        job['items_processed'] = len(opportunities)
+        job['items_processed'] = total
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+Candidate generation for fuzzy title matching within a batch, and a
+persistent SimHash index for near-duplicates across processing runs.
+"""
+import hashlib
+import re
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from fuzzywuzzy import fuzz
+from config import (
+    SIMILARITY_INDEX_DB, CROSS_RUN_DEDUP_DAYS, SIMHASH_MAX_DISTANCE, STATE_LOCK_TIMEOUT
+)
+
+# Pad titles so short strings and word edges still produce shared n-grams
+_PAD_START = '\x02'
+_PAD_END = '\x03'
+
+
+class TitleIndex:
+    """
+    Index of kept titles answering "is this title similar to any kept one?".
+
+    Titles are blocked on character trigrams: a kept title is only compared
+    with fuzz.ratio if it shares at least one trigram with the query and its
+    length makes the threshold reachable. Pairs above a 75% ratio share long
+    common substrings in practice, so results match the all-pairs scan.
+    Titles no longer than the n-gram can match without sharing one ('cm' vs
+    'crm'), so they are compared with every kept title instead.
+    """
+
+    def __init__(self, threshold: int, ngram: int = 3):
+        self.threshold = threshold
+        self.ngram = ngram
+        self.titles: List[str] = []
+        self._exact: Set[str] = set()
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._short: List[int] = []
+
+    def _grams(self, title: str) -> Set[str]:
+        padded = _PAD_START + title + _PAD_END
+        if len(padded) <= self.ngram:
+            return {padded}
+        return {padded[i:i + self.ngram] for i in range(len(padded) - self.ngram + 1)}
+
+    def _length_compatible(self, len_a: int, len_b: int) -> bool:
+        """Upper bound of fuzz.ratio from lengths alone: 2*min/(a+b)."""
+        total = len_a + len_b
+        return total > 0 and 200 * min(len_a, len_b) >= self.threshold * total
+
+    def is_similar(self, title: str) -> bool:
+        """True if any indexed title has fuzz.ratio above the threshold."""
+        if title in self._exact:
+            return True  # fuzz.ratio of equal strings is 100
+
+        if len(title) <= self.ngram:
+            candidates = range(len(self.titles))
+        else:
+            shared = Counter()
+            for gram in self._grams(title):
+                for idx in self._postings.get(gram, ()):
+                    shared[idx] += 1
+            # Most-overlapping candidates first: a hit usually comes early
+            candidates = [idx for idx, _ in shared.most_common()]
+            candidates.extend(idx for idx in self._short if idx not in shared)
+
+        matcher = SequenceMatcher(None, b=title)
+        for idx in candidates:
+            seen = self.titles[idx]
+            if not self._length_compatible(len(title), len(seen)):
+                continue
+            # Shared-character count bounds any ratio from above; skip the full match when it can't pass
+            matcher.set_seq1(seen)
+            if 100 * matcher.quick_ratio() < self.threshold:
+                continue
+            if fuzz.ratio(title, seen) > self.threshold:
+                return True
+        return False
+
+    def add(self, title: str) -> None:
+        """Index a kept title."""
+        idx = len(self.titles)
+        self.titles.append(title)
+        self._exact.add(title)
+        if len(title) <= self.ngram:
+            self._short.append(idx)
+        for gram in self._grams(title):
+            self._postings[gram].append(idx)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+
+# Cross-run Index
+SIMHASH_BITS = 64
+_TOKEN_RE = re.compile(r"[a-z0-9$']+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word bigrams (unigrams for one-word texts)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = [' '.join(pair) for pair in zip(tokens, tokens[1:])] or tokens
+    if not features:
+        return 0
+
+    weights = [0] * SIMHASH_BITS
+    for feature, count in Counter(features).items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+
+    signature = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def opportunity_simhash(opp: Dict[str, Any]) -> int:
+    """SimHash of an opportunity's title and body."""
+    return simhash(opp.get('title', '') + ' ' + opp.get('body', ''))
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def split_bands(signature: int, n_bands: int) -> List[int]:
+    """Split a signature into n_bands contiguous bit ranges of near-equal width."""
+    bands = []
+    start = 0
+    for i in range(n_bands):
+        width = SIMHASH_BITS // n_bands + (1 if i < SIMHASH_BITS % n_bands else 0)
+        bands.append((signature >> start) & ((1 << width) - 1))
+        start += width
+    return bands
+
+
+class SimHashIndex:
+    """
+    Persistent SimHash signatures of processed opportunities.
+
+    Signatures are split into max_distance + 1 bands, each stored in an
+    indexed table. Two signatures within max_distance bits must agree
+    exactly on at least one band (pigeonhole), so a lookup is one index
+    probe per band instead of a scan over history. Rows older than
+    retention_days are ignored and expired.
+    """
+
+    def __init__(self, db_path: Path = SIMILARITY_INDEX_DB, max_distance: int = SIMHASH_MAX_DISTANCE,
+                 retention_days: int = CROSS_RUN_DEDUP_DAYS):
+        self.max_distance = max_distance
+        self.n_bands = max_distance + 1
+        self.retention_days = retention_days
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._init_db()
+
+    def _init_db(self) -> None:
+        """Create schema, re-banding stored signatures if max_distance changed."""
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS signatures (
+            opportunity_id TEXT PRIMARY KEY,
+            signature INTEGER NOT NULL,
+            added_at REAL NOT NULL
+        )''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS signature_bands (
+            band_no INTEGER NOT NULL,
+            band_value INTEGER NOT NULL,
+            opportunity_id TEXT NOT NULL
+        )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_bands ON signature_bands(band_no, band_value)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_opp ON signature_bands(opportunity_id)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_signatures_added_at ON signatures(added_at)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'n_bands'").fetchone()
+        if row is None or int(row[0]) != self.n_bands:
+            self._conn.execute('DELETE FROM signature_bands')
+            stored = self._conn.execute('SELECT opportunity_id, signature FROM signatures').fetchall()
+            for opportunity_id, signature in stored:
+                self._insert_bands(opportunity_id, signature & 0xFFFFFFFFFFFFFFFF)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('n_bands', ?)", (str(self.n_bands),))
+        self._conn.commit()
+
+    def _insert_bands(self, opportunity_id: str, signature: int) -> None:
+        self._conn.executemany(
+            'INSERT INTO signature_bands (band_no, band_value, opportunity_id) VALUES (?, ?, ?)',
+            [(band_no, value, opportunity_id)
+             for band_no, value in enumerate(split_bands(signature, self.n_bands))]
+        )
+
+    def _cutoff(self) -> float:
+        return time.time() - self.retention_days * 86400
+
+    def find_near_duplicate(self, signature: int) -> Optional[str]:
+        """opportunity_id of a stored signature within max_distance bits, or None."""
+        cutoff = self._cutoff()
+        checked = set()
+        for band_no, value in enumerate(split_bands(signature, self.n_bands)):
+            rows = self._conn.execute(
+                '''SELECT s.opportunity_id, s.signature FROM signature_bands b
+                   JOIN signatures s ON s.opportunity_id = b.opportunity_id
+                   WHERE b.band_no = ? AND b.band_value = ? AND s.added_at >= ?''',
+                (band_no, value, cutoff)
+            )
+            for opportunity_id, stored in rows:
+                if opportunity_id in checked:
+                    continue
+                checked.add(opportunity_id)
+                if bin((stored & 0xFFFFFFFFFFFFFFFF) ^ signature).count('1') <= self.max_distance:
+                    return opportunity_id
+        return None
+
+    def add(self, opportunity_id: str, signature: int) -> None:
+        """Store a signature (visible to lookups at once, durable on commit)."""
+        self._conn.execute('DELETE FROM signature_bands WHERE opportunity_id = ?', (opportunity_id,))
+        self._conn.execute(
+            'INSERT OR REPLACE INTO signatures (opportunity_id, signature, added_at) VALUES (?, ?, ?)',
+            (opportunity_id, _to_signed(signature), time.time())
+        )
+        self._insert_bands(opportunity_id, signature)
+
+    def commit(self) -> None:
+        """Persist added signatures and expire old ones."""
+        cutoff = self._cutoff()
+        self._conn.execute(
+            'DELETE FROM signature_bands WHERE opportunity_id IN '
+            '(SELECT opportunity_id FROM signatures WHERE added_at < ?)', (cutoff,)
+        )
+        self._conn.execute('DELETE FROM signatures WHERE added_at < ?', (cutoff,))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
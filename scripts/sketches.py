@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Quantile Sketches
+Mergeable KLL sketches of score, base score, LLM score delta and
+engagement, one per (day, metric, source), so p50/p90/p99 over any window
+are answered by merging a few daily sketches instead of rescanning
+opportunities. Cheap enough to keep for months, e.g. to see how a
+scoring_config.json change shifted the distribution.
+
+process_opportunities updates the day's sketches at the end of each run.
+The first run after they are created rebuilds them from the opportunity
+store, so every day the store holds is sketched.
+
+Usage:
+    python3 sketches.py --rebuild             # rebuild every day from the opportunity store
+    python3 sketches.py --days 30             # p50/p90/p99 per source over the last 30 days
+    python3 sketches.py --days 90 --metric engagement --source reddit
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from config import QUANTILE_SKETCH_DB, SKETCH_K, STATE_LOCK_TIMEOUT
+from opportunity_store import OpportunityStore
+
+logger = logging.getLogger(__name__)
+
+# Sketched metrics, by name, with their report labels
+METRICS = {
+    'score': 'score',
+    'base_score': 'base score',
+    'llm_delta': 'LLM score delta',
+    'engagement': 'engagement'
+}
+PERCENTILES = (50, 90, 99)
+# Applied runs remembered, so a run redone after a crash is not counted twice
+MAX_APPLIED_RUNS = 50
+
+# Each level's capacity shrinks by this factor below the level above it
+CAPACITY_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty).
+
+    Values live in levels; a value at level h stands for 2**h inputs. When
+    the sketch is full, a level is sorted and every other value promoted,
+    so memory stays around 3k values while rank error stays around 1.7/k.
+    Up to k values are kept exactly. Sketches of any inputs merge into a
+    sketch of their union.
+    """
+
+    def __init__(self, k: int = SKETCH_K):
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._size = 0
+        self._max_size = self._capacity(0)
+        # Seeded, so the same inputs always give the same sketch
+        self._rng = random.Random(0)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * CAPACITY_DECAY ** depth))
+
+    def _add_level(self) -> None:
+        self.levels.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def update(self, value: float) -> None:
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if self._size > self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        while self._size > self._max_size:
+            for h, items in enumerate(self.levels):
+                if len(items) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self._add_level()
+                items.sort()
+                # With an odd count the smallest value stays behind
+                start = len(items) % 2
+                promoted = items[start + self._rng.getrandbits(1)::2]
+                self.levels[h + 1].extend(promoted)
+                del items[start:]
+                self._size = sum(len(level) for level in self.levels)
+                break
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Fold in a sketch of other inputs"""
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self._add_level()
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self._size = sum(len(level) for level in self.levels)
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Approximate value at rank q (0..1) of the inputs, None if empty
+
+        While exact, the same element as sorted(values)[int(q * n)].
+        """
+        if not self.n:
+            return None
+        if q >= 1:
+            return self.max
+        weighted = sorted((value, 1 << h) for h, items in enumerate(self.levels) for value in items)
+        target = q * self.n
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen > target:
+                return value
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state (see from_dict)"""
+        return {'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(data['k'])
+        sketch.levels = [list(items) for items in data['levels']] or [[]]
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch._size = sum(len(items) for items in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.levels)))
+        return sketch
+
+
+def metric_values(opp: Dict[str, Any]) -> Dict[str, float]:
+    """
+    The sketched metrics of one opportunity
+
+    LLM score delta only for LLM-enhanced opportunities, engagement only
+    where the source reports any (comments, reactions, HN points).
+    """
+    score = opp.get('score', 0)
+    values = {'score': score, 'base_score': score}
+
+    llm_data = opp.get('llm_analysis')
+    if llm_data:
+        base, final = llm_data.get('base_score', 0), llm_data.get('final_score', 0)
+        if base:
+            values['base_score'] = base
+        if base and final:
+            values['llm_delta'] = final - base
+
+    engagement = opp.get('engagement_data', {})
+    counts = [engagement[key] for key in ('comments', 'reactions', 'score') if isinstance(engagement.get(key), (int, float))]
+    if counts:
+        values['engagement'] = sum(counts)
+    return values
+
+
+def source_matches(source: str, prefix: Optional[str]) -> bool:
+    """Exact source or source prefix ('reddit' matches 'reddit:SaaS')"""
+    return prefix is None or source == prefix or source.startswith(prefix + ':')
+
+
+def percentiles(sketch: KLLSketch) -> Dict[str, Any]:
+    """{'count', 'p50', 'p90', 'p99'} of a sketch"""
+    result: Dict[str, Any] = {'count': sketch.n}
+    for p in PERCENTILES:
+        result[f'p{p}'] = sketch.quantile(p / 100)
+    return result
+
+
+class SketchStore:
+    """
+    Daily sketches keyed by (day, metric, source), persisted in SQLite.
+
+    add() collects this run's opportunities; save() merges them into the
+    stored sketches in one transaction.
+    """
+
+    def __init__(self, db_path: Path = QUANTILE_SKETCH_DB, k: int = SKETCH_K):
+        self.k = k
+        self._pending: Dict[Tuple[str, str, str], KLLSketch] = {}
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS daily_sketches (
+            day TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            source TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            sketch TEXT NOT NULL,
+            PRIMARY KEY (day, metric, source)
+        )''')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS sketch_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS applied_runs (
+            run_id TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )''')
+        self._conn.commit()
+
+    @property
+    def built(self) -> bool:
+        """True once rebuilt from the opportunity store"""
+        return self._conn.execute("SELECT 1 FROM sketch_meta WHERE key = 'built_at'").fetchone() is not None
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        """Count a processed opportunity on its processing day"""
+        day = opp['processed_at'][:10]
+        source = opp.get('source', 'unknown')
+        for metric, value in metric_values(opp).items():
+            key = (day, metric, source)
+            sketch = self._pending.get(key)
+            if sketch is None:
+                sketch = self._pending[key] = KLLSketch(self.k)
+            sketch.update(value)
+
+    def save(self, run_id: Optional[str] = None) -> None:
+        """
+        Merge this run into the stored daily sketches
+
+        run_id identifies the run; a run already applied (redone after a
+        crash) is not counted again. Sketches not yet built are rebuilt from
+        the opportunity store, which by now holds this run's opportunities.
+        """
+        pending, self._pending = self._pending, {}
+        if not self.built:
+            logger.info("Building quantile sketches from the opportunity store")
+            store = OpportunityStore()
+            try:
+                self.rebuild(store.iter_recent(datetime.min))
+            finally:
+                store.close()
+            if run_id is not None:
+                with self._conn:
+                    self._mark_applied(run_id)
+            return
+
+        with self._conn:
+            if run_id is not None:
+                applied = self._conn.execute('SELECT 1 FROM applied_runs WHERE run_id = ?', (run_id,)).fetchone()
+                if applied:
+                    logger.info(f"Quantile sketches already include run {run_id}")
+                    return
+            self._merge_into_stored(pending)
+            if run_id is not None:
+                self._mark_applied(run_id)
+
+    def _mark_applied(self, run_id: str) -> None:
+        self._conn.execute('INSERT OR IGNORE INTO applied_runs (run_id, applied_at) VALUES (?, ?)',
+                           (run_id, datetime.now().isoformat()))
+        self._conn.execute('''DELETE FROM applied_runs WHERE run_id NOT IN (
+            SELECT run_id FROM applied_runs ORDER BY applied_at DESC LIMIT ?)''', (MAX_APPLIED_RUNS,))
+
+    def _merge_into_stored(self, pending: Dict[Tuple[str, str, str], KLLSketch]) -> None:
+        for (day, metric, source), sketch in sorted(pending.items()):
+            row = self._conn.execute(
+                'SELECT sketch FROM daily_sketches WHERE day = ? AND metric = ? AND source = ?',
+                (day, metric, source)
+            ).fetchone()
+            if row:
+                sketch = KLLSketch.from_dict(json.loads(row[0])).merge(sketch)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO daily_sketches (day, metric, source, count, sketch) VALUES (?, ?, ?, ?, ?)',
+                (day, metric, source, sketch.n, json.dumps(sketch.to_dict()))
+            )
+
+    def window(self, metric: str, first_day: date, last_day: date,
+               group: Callable[[str], str] = lambda source: source,
+               source: Optional[str] = None) -> Dict[str, KLLSketch]:
+        """
+        Merged sketches of metric from first_day to last_day (inclusive),
+        one per group(source), for sources matching source (exact or prefix)
+        """
+        merged: Dict[str, KLLSketch] = {}
+        rows = self._conn.execute(
+            'SELECT source, sketch FROM daily_sketches WHERE metric = ? AND day >= ? AND day <= ? ORDER BY day, source',
+            (metric, first_day.isoformat(), last_day.isoformat())
+        )
+        for row_source, data in rows:
+            if not source_matches(row_source, source):
+                continue
+            key = group(row_source)
+            sketch = KLLSketch.from_dict(json.loads(data))
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+        return merged
+
+    def total(self, metric: str, first_day: date, last_day: date, source: Optional[str] = None) -> KLLSketch:
+        """One merged sketch of metric over every matching source"""
+        return self.window(metric, first_day, last_day, group=lambda _: '', source=source).get('', KLLSketch(self.k))
+
+    def rebuild(self, opps: Iterable[Dict[str, Any]]) -> int:
+        """Replace every stored sketch with sketches of opps; returns opportunities read"""
+        count = 0
+        for opp in opps:
+            self.add(opp)
+            count += 1
+        pending, self._pending = self._pending, {}
+        with self._conn:
+            self._conn.execute('DELETE FROM daily_sketches')
+            self._merge_into_stored(pending)
+            self._conn.execute("INSERT OR REPLACE INTO sketch_meta (key, value) VALUES ('built_at', ?)",
+                               (datetime.now().isoformat(),))
+        return count
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def window_days(days_back: int, today: Optional[date] = None) -> Tuple[date, date]:
+    """First and last day of the last days_back days, today included"""
+    today = today or date.today()
+    return today - timedelta(days=days_back - 1), today
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily quantile sketches of scores and engagement')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild every day from the opportunity store')
+    parser.add_argument('--days', type=int, default=7, help='Window in days, today included')
+    parser.add_argument('--metric', choices=sorted(METRICS), help='Only this metric')
+    parser.add_argument('--source', help="Source or source prefix, e.g. 'reddit' or 'reddit:SaaS'")
+    args = parser.parse_args()
+
+    sketches = SketchStore()
+    try:
+        if args.rebuild:
+            store = OpportunityStore()
+            try:
+                count = sketches.rebuild(store.iter_recent(datetime.min))
+            finally:
+                store.close()
+            print(f"✅ Rebuilt quantile sketches from {count} opportunities")
+            return
+
+        first_day, last_day = window_days(args.days)
+        print(f"Percentiles {first_day} to {last_day} (p50 / p90 / p99)")
+        for metric in ([args.metric] if args.metric else METRICS):
+            print(f"\n{METRICS[metric]}")
+            by_source = sketches.window(metric, first_day, last_day, source=args.source)
+            overall = sketches.total(metric, first_day, last_day, source=args.source)
+            for name, sketch in [('all', overall)] + sorted(by_source.items()):
+                if sketch.n:
+                    result = percentiles(sketch)
+                    print(f"  {name}: {result['p50']} / {result['p90']} / {result['p99']} (n={result['count']})")
+    finally:
+        sketches.close()
+
+
+if __name__ == '__main__':
+    try:
+        main()
+        sys.exit(0)
+    except Exception as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(1)
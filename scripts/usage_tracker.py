@@ -34,6 +34,18 @@ class UsageTracker:
             success BOOLEAN DEFAULT 1,
             notes TEXT
         )''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS llm_call_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            job_name TEXT NOT NULL,
+            requests INTEGER DEFAULT 0,
+            retries INTEGER DEFAULT 0,
+            rate_limited INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            fallbacks INTEGER DEFAULT 0,
+            circuit_rejected INTEGER DEFAULT 0,
+            circuit_opened INTEGER DEFAULT 0
+        )''')
         conn.commit()
         conn.close()
     
@@ -89,6 +101,37 @@ class UsageTracker:
         conn.commit()
         conn.close()
     
+    def record_llm_stats(self, job_name, stats):
+        """Save one run's LLM call counters (requests, retries, fallbacks, ...)"""
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute('''INSERT INTO llm_call_stats
+            (timestamp, job_name, requests, retries, rate_limited, failures,
+             fallbacks, circuit_rejected, circuit_opened)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (datetime.now().isoformat(), job_name,
+             stats.get('requests', 0), stats.get('retries', 0), stats.get('rate_limited', 0),
+             stats.get('failures', 0), stats.get('fallbacks', 0),
+             stats.get('circuit_rejected', 0), stats.get('circuit_opened', 0))
+        )
+        conn.commit()
+        conn.close()
+    
+    def get_llm_stats(self, days=7):
+        """Summed LLM call counters for the last N days"""
+        conn = sqlite3.connect(str(self.db_path))
+        result = conn.execute('''
+            SELECT 
+                SUM(requests), SUM(retries), SUM(rate_limited), SUM(failures),
+                SUM(fallbacks), SUM(circuit_rejected), SUM(circuit_opened), COUNT(*)
+            FROM llm_call_stats
+            WHERE timestamp > datetime('now', '-' || ? || ' days')
+        ''', (days,)).fetchone()
+        conn.close()
+        
+        keys = ('requests', 'retries', 'rate_limited', 'failures', 'fallbacks',
+                'circuit_rejected', 'circuit_opened', 'runs')
+        return {key: value or 0 for key, value in zip(keys, result)}
+    
     def get_daily_usage(self, date=None):
         """Get usage for a specific date"""
         if date is None:
@@ -3,12 +3,23 @@
 SaaS Hunter - Utility Functions
 Shared utilities for duplicate detection, logging, and data validation.
 """
+import fcntl
 import json
 import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Set, Dict, Any, List
+from typing import Set, Dict, Any, List, Optional
 from datetime import datetime
-from config import SEEN_IDS_FILE
+from urllib.parse import urlparse
+from config import (
+    SEEN_IDS_FILE, FEED_CACHE_FILE, DEDUP_BACKEND, SEEN_IDS_DB, SEEN_IDS_TTL_DAYS,
+    STATE_LOCK_TIMEOUT
+)
 
 # Setup logging
 def setup_logging(name: str, log_file: Path = None) -> logging.Logger:
@@ -39,6 +50,69 @@ def setup_logging(name: str, log_file: Path = None) -> logging.Logger:
     return logger
 
 
+# State File Helpers
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = STATE_LOCK_TIMEOUT):
+    """Hold an exclusive advisory lock on lock_path, shared with other processes."""
+    with open(lock_path, 'a') as lock_file:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {lock_path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write_json(path: Path, data: Any, **dump_kwargs) -> None:
+    """Write JSON to a temp file and rename it over path, so readers never see a partial file."""
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class RecordSpool:
+    """
+    Anonymous scratch file of JSON records addressed by byte offset.
+
+    Lets a pipeline keep only offsets in memory and re-read full records
+    on demand. The file is removed when closed.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Write a record; returns its offset."""
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(json.dumps(record).encode('utf-8') + b'\n')
+        return offset
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        """Read back the record written at offset."""
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 # Duplicate Detection
 class DuplicateDetector:
     """Track and filter duplicate opportunities across collection runs."""
@@ -46,6 +120,8 @@ class DuplicateDetector:
     def __init__(self, seen_ids_file: Path = SEEN_IDS_FILE):
         self.seen_ids_file = seen_ids_file
         self.seen_ids: Set[str] = self._load_seen_ids()
+        # Collectors may fetch from worker threads
+        self._lock = threading.Lock()
     
     def _load_seen_ids(self) -> Set[str]:
         """Load previously seen IDs from file."""
@@ -61,26 +137,216 @@ class DuplicateDetector:
     def is_duplicate(self, source: str, source_id: str) -> bool:
         """Check if an opportunity has been seen before."""
         unique_id = f"{source}:{source_id}"
-        return unique_id in self.seen_ids
+        with self._lock:
+            return unique_id in self.seen_ids
     
     def mark_seen(self, source: str, source_id: str) -> None:
         """Mark an opportunity as seen."""
         unique_id = f"{source}:{source_id}"
-        self.seen_ids.add(unique_id)
+        with self._lock:
+            self.seen_ids.add(unique_id)
+    
+    def __len__(self) -> int:
+        return len(self.seen_ids)
     
     def save(self) -> None:
-        """Persist seen IDs to file."""
+        """
+        Persist seen IDs to file.
+
+        Other collectors may have saved since we loaded, so under a file lock
+        we re-read the file and write the union instead of overwriting it.
+        """
+        lock_path = self.seen_ids_file.with_name(self.seen_ids_file.name + '.lock')
         try:
-            with open(self.seen_ids_file, 'w') as f:
-                json.dump({
-                    'seen_ids': list(self.seen_ids),
+            with file_lock(lock_path):
+                with self._lock:
+                    self.seen_ids |= self._load_seen_ids()
+                    seen_ids = list(self.seen_ids)
+                atomic_write_json(self.seen_ids_file, {
+                    'seen_ids': seen_ids,
                     'last_updated': datetime.now().isoformat(),
-                    'total_count': len(self.seen_ids)
-                }, f, indent=2)
-        except IOError as e:
+                    'total_count': len(seen_ids)
+                }, indent=2)
+        except (IOError, TimeoutError) as e:
             logging.error(f"Failed to save seen IDs: {e}")
 
 
+class SQLiteDuplicateDetector:
+    """
+    DuplicateDetector backed by SQLite instead of one JSON document.
+
+    Lookups are indexed point queries, save() inserts only ids marked in
+    this run (one transaction), and ids older than ttl_days are expired.
+    """
+
+    def __init__(self, db_path: Path = SEEN_IDS_DB, ttl_days: int = SEEN_IDS_TTL_DAYS,
+                 seen_ids_file: Path = SEEN_IDS_FILE):
+        self.db_path = db_path
+        self.ttl_days = ttl_days
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        # Shared across collector worker threads, serialised by self._lock.
+        # Other processes may write concurrently: wait on their locks, and use
+        # WAL so readers never block the writer.
+        self._conn = sqlite3.connect(str(db_path), timeout=STATE_LOCK_TIMEOUT, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._init_db(seen_ids_file)
+
+    def _init_db(self, seen_ids_file: Path) -> None:
+        """Create schema and import the JSON store on first use."""
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS seen_ids (
+            unique_id TEXT PRIMARY KEY,
+            first_seen REAL NOT NULL
+        )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_ids_first_seen ON seen_ids(first_seen)')
+        self._conn.commit()
+
+        is_empty = self._conn.execute('SELECT 1 FROM seen_ids LIMIT 1').fetchone() is None
+        if is_empty and seen_ids_file and seen_ids_file.exists():
+            legacy = DuplicateDetector(seen_ids_file)
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO seen_ids (unique_id, first_seen) VALUES (?, ?)',
+                    ((unique_id, now) for unique_id in legacy.seen_ids)
+                )
+
+    def is_duplicate(self, source: str, source_id: str) -> bool:
+        """Check if an opportunity has been seen before."""
+        unique_id = f"{source}:{source_id}"
+        with self._lock:
+            if unique_id in self._pending:
+                return True
+            row = self._conn.execute('SELECT 1 FROM seen_ids WHERE unique_id = ?', (unique_id,)).fetchone()
+            return row is not None
+
+    def mark_seen(self, source: str, source_id: str) -> None:
+        """Mark an opportunity as seen (written on save)."""
+        unique_id = f"{source}:{source_id}"
+        with self._lock:
+            self._pending.add(unique_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            stored = self._conn.execute('SELECT COUNT(*) FROM seen_ids').fetchone()[0]
+            return stored + len(self._pending)
+
+    def save(self) -> None:
+        """Insert newly seen IDs and expire old ones in one transaction."""
+        with self._lock:
+            now = time.time()
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT OR IGNORE INTO seen_ids (unique_id, first_seen) VALUES (?, ?)',
+                        ((unique_id, now) for unique_id in self._pending)
+                    )
+                    if self.ttl_days > 0:
+                        cutoff = now - self.ttl_days * 86400
+                        self._conn.execute('DELETE FROM seen_ids WHERE first_seen < ?', (cutoff,))
+                self._pending.clear()
+            except sqlite3.Error as e:
+                logging.error(f"Failed to save seen IDs: {e}")
+
+
+def get_duplicate_detector(backend: str = DEDUP_BACKEND):
+    """Duplicate detector for the configured backend ('json' or 'sqlite')."""
+    if backend == 'sqlite':
+        return SQLiteDuplicateDetector()
+    return DuplicateDetector()
+
+
+# Feed Validator Cache
+class FeedCache:
+    """Remember HTTP validators and the newest entry seen for each feed URL."""
+
+    def __init__(self, cache_file: Path = FEED_CACHE_FILE):
+        self.cache_file = cache_file
+        self.feeds: Dict[str, Dict[str, Any]] = self._load()
+        self._updated: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load cached feed state from file."""
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f).get('feeds', {})
+            except (json.JSONDecodeError, IOError):
+                return {}
+        return {}
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """Cached state for a feed (empty dict if never fetched)."""
+        with self._lock:
+            return dict(self.feeds.get(url, {}))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for the next request."""
+        state = self.get(url)
+        headers = {}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        return headers
+
+    def update(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+               newest_entry_id: Optional[str] = None, newest_published: Optional[str] = None) -> None:
+        """Record validators and the newest entry from a successful fetch."""
+        with self._lock:
+            state = self.feeds.setdefault(url, {})
+            state['etag'] = etag
+            state['last_modified'] = last_modified
+            # Keep the previous marker when this response carried no dated entries
+            if newest_entry_id:
+                state['newest_entry_id'] = newest_entry_id
+                state['newest_published'] = newest_published
+            state['fetched_at'] = datetime.now().isoformat()
+            self._updated.add(url)
+
+    def save(self) -> None:
+        """
+        Persist feed state to file.
+
+        Other collectors may have saved since we loaded, so under a file lock
+        we re-read the file and only replace the feeds fetched in this run.
+        """
+        lock_path = self.cache_file.with_name(self.cache_file.name + '.lock')
+        try:
+            with file_lock(lock_path):
+                with self._lock:
+                    self.feeds = {**self._load(), **{url: self.feeds[url] for url in self._updated}}
+                    feeds = dict(self.feeds)
+                atomic_write_json(self.cache_file, {'feeds': feeds, 'last_updated': datetime.now().isoformat()})
+        except (IOError, TimeoutError) as e:
+            logging.error(f"Failed to save feed cache: {e}")
+
+
+# Rate Limiting
+class HostRateLimiter:
+    """Enforce a minimum interval between requests to the same host, across threads."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """Block until a request to the URL's host is allowed."""
+        if self.min_interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            # Reserve the slot before sleeping so other threads queue behind us
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 # HTML Cleaning
 def clean_html(html_content: str) -> str:
     """Remove HTML tags from content using BeautifulSoup."""
@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """
 Weekly Data Quality Review
-Analyzes the past week of SaaS Hunter data and generates improvement recommendations
+Analyzes the past week (or --days N) of SaaS Hunter data and generates improvement recommendations
+
+The window is the last N whole days, today included. Analyses are built
+from the daily rollups kept by process_opportunities, summed over the
+window. Without rollups, each analysis is an accumulator fed every
+opportunity once while it is streamed from the opportunity store; days
+are analyzed as separate partitions in parallel and their partial results
+merged, so memory does not grow with the window.
 """
-import json
+import argparse
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict, Counter
-from typing import List, Dict, Any
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from opportunity_store import OpportunityStore
+from rollups import RollupStore, engagement_mismatch, mismatch_example
+from sketches import METRICS, SketchStore, percentiles, window_days
 from utils import setup_logging
 
 # Paths
@@ -22,149 +34,391 @@ LOG_DIR = Path(__file__).parent.parent / 'logs'
 logger = setup_logging(__name__, LOG_DIR / 'weekly_review.log')
 
 
-def load_opportunities_from_week(days_back=7):
-    """Load all processed opportunities from the past week"""
-    cutoff = datetime.now() - timedelta(days=days_back)
-    opportunities = []
-    
-    for file in sorted(PROCESSED_DIR.glob('opportunities_*.jsonl')):
-        file_date = datetime.strptime(file.stem.split('_')[1], '%Y%m%d')
-        if file_date >= cutoff:
-            with open(file, 'r') as f:
-                for line in f:
-                    try:
-                        opp = json.loads(line.strip())
-                        opportunities.append(opp)
-                    except json.JSONDecodeError:
-                        continue
-    
-    return opportunities
+def period_label(days_back: int) -> str:
+    return 'this week' if days_back == 7 else f'in the last {days_back} days'
 
 
-def analyze_source_quality(opps: List[Dict]) -> Dict[str, Any]:
-    """Analyze quality metrics per source"""
-    by_source = defaultdict(list)
-    
-    for opp in opps:
-        source = opp.get('source', 'unknown')
-        by_source[source].append(opp)
-    
-    source_stats = {}
-    for source, source_opps in by_source.items():
-        scores = [o.get('score', 0) for o in source_opps]
-        source_stats[source] = {
-            'count': len(source_opps),
-            'avg_score': sum(scores) / len(scores) if scores else 0,
-            'max_score': max(scores) if scores else 0,
-            'min_score': min(scores) if scores else 0,
-            'high_quality_count': len([s for s in scores if s >= 60]),
-            'top_tier_count': len([s for s in scores if s >= 80])
+def day_partitions(days_back: int, now: Optional[datetime] = None) -> List[Tuple[datetime, datetime]]:
+    """(since, until] windows covering the last days_back whole days up to now, one per day"""
+    now = now or datetime.now()
+    first_day, _ = window_days(days_back, now.date())
+    partitions = []
+    start = datetime.combine(first_day, datetime.min.time())
+    while start < now:
+        end = min(now, start.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1))
+        partitions.append((start, end))
+        start = end
+    return partitions
+
+
+class Accumulator:
+    """
+    One analysis, fed each opportunity once.
+
+    States of the same analysis built over consecutive partitions combine
+    with merge() (earlier partition first) into the state of their union.
+    """
+
+    def add(self, opp: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def merge(self, other: 'Accumulator') -> 'Accumulator':
+        raise NotImplementedError
+
+    def add_rollup(self, row: Dict[str, Any]) -> None:
+        """Fold in one summed rollup row (see RollupStore.rows)"""
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class SourceQuality(Accumulator):
+    """Quality metrics per source"""
+
+    def __init__(self):
+        self.sources: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, opp):
+        score = opp.get('score', 0)
+        stats = self.sources.get(opp.get('source', 'unknown'))
+        if stats is None:
+            stats = self.sources[opp.get('source', 'unknown')] = {
+                'count': 0, 'score_total': 0, 'max_score': score, 'min_score': score,
+                'high_quality_count': 0, 'top_tier_count': 0
+            }
+        stats['count'] += 1
+        stats['score_total'] += score
+        stats['max_score'] = max(stats['max_score'], score)
+        stats['min_score'] = min(stats['min_score'], score)
+        stats['high_quality_count'] += score >= 60
+        stats['top_tier_count'] += score >= 80
+
+    def merge(self, other):
+        for source, theirs in other.sources.items():
+            ours = self.sources.get(source)
+            if ours is None:
+                self.sources[source] = dict(theirs)
+                continue
+            for key in ('count', 'score_total', 'high_quality_count', 'top_tier_count'):
+                ours[key] += theirs[key]
+            ours['max_score'] = max(ours['max_score'], theirs['max_score'])
+            ours['min_score'] = min(ours['min_score'], theirs['min_score'])
+        return self
+
+    def add_rollup(self, row):
+        stats = self.sources.setdefault(row['source'], {
+            'count': 0, 'score_total': 0, 'max_score': row['score_max'], 'min_score': row['score_min'],
+            'high_quality_count': 0, 'top_tier_count': 0
+        })
+        stats['count'] += row['count']
+        stats['score_total'] += row['score_total']
+        stats['max_score'] = max(stats['max_score'], row['score_max'])
+        stats['min_score'] = min(stats['min_score'], row['score_min'])
+        stats['high_quality_count'] += row['count'] if row['score_bucket'] >= 60 else 0
+        stats['top_tier_count'] += row['count'] if row['score_bucket'] >= 80 else 0
+
+    def result(self):
+        return {
+            source: {
+                'count': stats['count'],
+                'avg_score': stats['score_total'] / stats['count'],
+                'max_score': stats['max_score'],
+                'min_score': stats['min_score'],
+                'high_quality_count': stats['high_quality_count'],
+                'top_tier_count': stats['top_tier_count']
+            }
+            for source, stats in self.sources.items()
         }
-    
-    return source_stats
 
 
-def analyze_score_distribution(opps: List[Dict]) -> Dict[str, Any]:
-    """Analyze overall score distribution"""
-    scores = [o.get('score', 0) for o in opps]
-    
-    buckets = {
-        'excellent (80+)': len([s for s in scores if s >= 80]),
-        'high (60-79)': len([s for s in scores if 60 <= s < 80]),
-        'medium (40-59)': len([s for s in scores if 40 <= s < 60]),
-        'low (<40)': len([s for s in scores if s < 40])
-    }
-    
-    return {
-        'total': len(scores),
-        'average': sum(scores) / len(scores) if scores else 0,
-        'median': sorted(scores)[len(scores) // 2] if scores else 0,
-        'max': max(scores) if scores else 0,
-        'buckets': buckets
-    }
-
-
-def analyze_llm_usage(opps: List[Dict]) -> Dict[str, Any]:
-    """Analyze LLM enhancement usage and effectiveness"""
-    llm_enhanced = [o for o in opps if 'llm_analysis' in o]
-    
-    if not llm_enhanced:
+class ScoreDistribution(Accumulator):
+    """
+    Overall score distribution; a histogram gives the exact median without sorting
+
+    From rollups the histogram is per score bucket, so the median comes
+    from the quantile sketches instead (median_score).
+    """
+
+    def __init__(self):
+        self.histogram: Counter = Counter()
+        self.score_total = 0
+        self.max_score: Optional[int] = None
+        self.median_score: Optional[float] = None
+
+    def add(self, opp):
+        score = opp.get('score', 0)
+        self.histogram[score] += 1
+        self.score_total += score
+        self.max_score = score if self.max_score is None else max(self.max_score, score)
+
+    def merge(self, other):
+        if other.max_score is not None:
+            self.max_score = other.max_score if self.max_score is None else max(self.max_score, other.max_score)
+        self.histogram.update(other.histogram)
+        self.score_total += other.score_total
+        return self
+
+    def add_rollup(self, row):
+        self.max_score = row['score_max'] if self.max_score is None else max(self.max_score, row['score_max'])
+        self.histogram[row['score_bucket']] += row['count']
+        self.score_total += row['score_total']
+
+    def median(self):
+        """Same element as sorted(scores)[len(scores) // 2]"""
+        target = sum(self.histogram.values()) // 2
+        seen = 0
+        for score in sorted(self.histogram):
+            seen += self.histogram[score]
+            if seen > target:
+                return score
+        return 0
+
+    def result(self):
+        total = sum(self.histogram.values())
+
+        def count(low, high=None):
+            return sum(n for score, n in self.histogram.items() if score >= low and (high is None or score < high))
+
+        buckets = {
+            'excellent (80+)': count(80),
+            'high (60-79)': count(60, 80),
+            'medium (40-59)': count(40, 60),
+            'low (<40)': total - count(40)
+        }
         return {
-            'enabled': False,
-            'count': 0
+            'total': total,
+            'average': self.score_total / total if total else 0,
+            'median': self.median_score if self.median_score is not None else self.median(),
+            'max': self.max_score if total else 0,
+            'buckets': buckets
         }
-    
-    total_cost = sum(o.get('llm_analysis', {}).get('cost_usd', 0) for o in llm_enhanced)
-    total_tokens = sum(o.get('llm_analysis', {}).get('tokens', {}).get('total_tokens', 0) for o in llm_enhanced)
-    
-    # Calculate impact: how much did LLM change scores?
-    score_changes = []
-    for o in llm_enhanced:
-        llm_data = o.get('llm_analysis', {})
+
+
+class LLMUsage(Accumulator):
+    """LLM enhancement usage and effectiveness"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_cost = 0.0
+        self.total_tokens = 0
+        self.change_total = 0
+        self.change_count = 0
+        self.max_increase = None
+        self.max_decrease = None
+
+    def add(self, opp):
+        if 'llm_analysis' not in opp:
+            return
+        llm_data = opp.get('llm_analysis', {})
+        self.count += 1
+        self.total_cost += llm_data.get('cost_usd', 0)
+        self.total_tokens += llm_data.get('tokens', {}).get('total_tokens', 0)
+
+        # Calculate impact: how much did LLM change scores?
         base = llm_data.get('base_score', 0)
         final = llm_data.get('final_score', 0)
         if base and final:
-            score_changes.append(final - base)
-    
-    return {
-        'enabled': True,
-        'count': len(llm_enhanced),
-        'total_cost': total_cost,
-        'total_tokens': total_tokens,
-        'avg_cost_per_item': total_cost / len(llm_enhanced) if llm_enhanced else 0,
-        'score_changes': {
-            'avg_change': sum(score_changes) / len(score_changes) if score_changes else 0,
-            'max_increase': max(score_changes) if score_changes else 0,
-            'max_decrease': min(score_changes) if score_changes else 0
+            change = final - base
+            self.change_total += change
+            self.change_count += 1
+            self.max_increase = change if self.max_increase is None else max(self.max_increase, change)
+            self.max_decrease = change if self.max_decrease is None else min(self.max_decrease, change)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_cost += other.total_cost
+        self.total_tokens += other.total_tokens
+        self.change_total += other.change_total
+        self.change_count += other.change_count
+        for attr, pick in (('max_increase', max), ('max_decrease', min)):
+            ours, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if ours is None else pick(ours, theirs))
+        return self
+
+    def add_rollup(self, row):
+        self.count += row['llm_count']
+        self.total_cost += row['llm_cost']
+        self.total_tokens += row['llm_tokens']
+        self.change_total += row['llm_change_total']
+        self.change_count += row['llm_change_count']
+        for attr, field, pick in (('max_increase', 'llm_max_increase', max), ('max_decrease', 'llm_max_decrease', min)):
+            ours, theirs = getattr(self, attr), row[field]
+            if theirs is not None:
+                setattr(self, attr, theirs if ours is None else pick(ours, theirs))
+
+    def result(self):
+        if not self.count:
+            return {
+                'enabled': False,
+                'count': 0
+            }
+        return {
+            'enabled': True,
+            'count': self.count,
+            'total_cost': self.total_cost,
+            'total_tokens': self.total_tokens,
+            'avg_cost_per_item': self.total_cost / self.count,
+            'score_changes': {
+                'avg_change': self.change_total / self.change_count if self.change_count else 0,
+                'max_increase': self.max_increase or 0,
+                'max_decrease': self.max_decrease or 0
+            }
         }
-    }
 
 
-def analyze_engagement_patterns(opps: List[Dict]) -> Dict[str, Any]:
-    """Analyze engagement vs. score correlation"""
-    high_engagement_low_score = []
-    low_engagement_high_score = []
-    
-    for o in opps:
-        engagement = o.get('engagement_data', {})
-        score = o.get('score', 0)
-        
-        comments = engagement.get('comments', 0)
-        reactions = engagement.get('reactions', 0)
-        
-        total_engagement = comments + reactions
-        
-        # High engagement (10+) but low score (<50)
-        if total_engagement >= 10 and score < 50:
-            high_engagement_low_score.append({
-                'title': o.get('title', '')[:60],
-                'score': score,
-                'engagement': total_engagement,
-                'source': o.get('source', '')
-            })
-        
-        # Low engagement (<5) but high score (60+)
-        if total_engagement < 5 and score >= 60:
-            low_engagement_high_score.append({
-                'title': o.get('title', '')[:60],
-                'score': score,
-                'engagement': total_engagement,
-                'source': o.get('source', '')
-            })
-    
-    return {
-        'high_engagement_low_score': high_engagement_low_score[:5],  # Top 5
-        'low_engagement_high_score': low_engagement_high_score[:5]
-    }
+class EngagementPatterns(Accumulator):
+    """Engagement vs. score mismatches (first 5 of each kind)"""
+
+    LIMIT = 5
+
+    def __init__(self):
+        self.high_engagement_low_score: List[Dict[str, Any]] = []
+        self.low_engagement_high_score: List[Dict[str, Any]] = []
+
+    def add(self, opp):
+        kind = engagement_mismatch(opp)
+        if kind and len(getattr(self, kind)) < self.LIMIT:
+            getattr(self, kind).append(mismatch_example(opp))
+
+    def merge(self, other):
+        self.high_engagement_low_score = (self.high_engagement_low_score + other.high_engagement_low_score)[:self.LIMIT]
+        self.low_engagement_high_score = (self.low_engagement_high_score + other.low_engagement_high_score)[:self.LIMIT]
+        return self
+
+    def add_rollup(self, row):
+        pass  # Examples come from the rollups' daily examples instead (see rollup_analyses)
+
+    def result(self):
+        return {
+            'high_engagement_low_score': self.high_engagement_low_score,
+            'low_engagement_high_score': self.low_engagement_high_score
+        }
+
+
+class Domains(Accumulator):
+    """Domain distribution"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    def add(self, opp):
+        self.counts[opp.get('domain', 'other')] += 1
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        return self
+
+    def add_rollup(self, row):
+        self.counts[row['domain']] += row['count']
+
+    def result(self):
+        return dict(self.counts.most_common())
+
 
+# Analyses in the review, by result key
+ANALYSES = {
+    'source_quality': SourceQuality,
+    'score_distribution': ScoreDistribution,
+    'llm_usage': LLMUsage,
+    'engagement_patterns': EngagementPatterns,
+    'domains': Domains
+}
 
-def analyze_domains(opps: List[Dict]) -> Dict[str, int]:
-    """Analyze domain distribution"""
-    domains = [o.get('domain', 'other') for o in opps]
-    return dict(Counter(domains).most_common())
 
+def accumulate(opps: Iterable[Dict[str, Any]]) -> Dict[str, Accumulator]:
+    """Feed every analysis from one pass over opps"""
+    accumulators = {name: cls() for name, cls in ANALYSES.items()}
+    for opp in opps:
+        for accumulator in accumulators.values():
+            accumulator.add(opp)
+    return accumulators
+
+
+def accumulate_partition(partition: Tuple[datetime, datetime]) -> Dict[str, Accumulator]:
+    """Accumulators over one partition, streamed from the opportunity store"""
+    since, until = partition
+    store = OpportunityStore()
+    try:
+        return accumulate(store.iter_recent(since, until))
+    finally:
+        store.close()
+
+
+def run_analyses(days_back: int, workers: int) -> Dict[str, Any]:
+    """Analyze the last days_back days, one partition per day, merged in order"""
+    partitions = day_partitions(days_back)
+    if workers > 1 and len(partitions) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(partitions))) as executor:
+            parts = list(executor.map(accumulate_partition, partitions))
+    else:
+        parts = [accumulate_partition(partition) for partition in partitions]
+
+    merged = {name: cls() for name, cls in ANALYSES.items()}
+    for part in parts:
+        for name, accumulator in part.items():
+            merged[name].merge(accumulator)
+    return {name: accumulator.result() for name, accumulator in merged.items()}
+
+
+def rollup_analyses(days_back: int) -> Optional[Dict[str, Any]]:
+    """
+    Analyze the last days_back days by summing daily rollups
+
+    None if there are no rollups yet, or the score sketches that give the
+    median do not hold exactly the opportunities the rollups count.
+    """
+    first_day, last_day = window_days(days_back)
+    rollups = RollupStore()
+    try:
+        if not rollups.built:
+            return None
+        accumulators = {name: cls() for name, cls in ANALYSES.items()}
+        for row in rollups.rows(first_day, last_day):
+            for accumulator in accumulators.values():
+                accumulator.add_rollup(row)
+        examples = rollups.examples(first_day, last_day, limit=EngagementPatterns.LIMIT)
+    finally:
+        rollups.close()
+
+    accumulators['engagement_patterns'].high_engagement_low_score = examples['high_engagement_low_score']
+    accumulators['engagement_patterns'].low_engagement_high_score = examples['low_engagement_high_score']
 
-def generate_recommendations(analysis: Dict[str, Any]) -> List[str]:
+    sketches = SketchStore()
+    try:
+        scores = sketches.total('score', first_day, last_day)
+    finally:
+        sketches.close()
+    distribution = accumulators['score_distribution']
+    if scores.n != sum(distribution.histogram.values()):
+        logger.info(f"Score sketches hold {scores.n} opportunities, rollups {sum(distribution.histogram.values())}")
+        return None
+    distribution.median_score = scores.quantile(0.5)
+    return {name: accumulator.result() for name, accumulator in accumulators.items()}
+
+
+def sketch_percentiles(days_back: int) -> Dict[str, Any]:
+    """
+    p50/p90/p99 of each sketched metric, overall and per source, merged
+    from the daily quantile sketches of the last days_back days
+    """
+    first_day, last_day = window_days(days_back)
+    sketches = SketchStore()
+    try:
+        metrics = {}
+        for metric in METRICS:
+            metrics[metric] = {
+                'all': percentiles(sketches.total(metric, first_day, last_day)),
+                'sources': {source: percentiles(sketch)
+                            for source, sketch in sketches.window(metric, first_day, last_day).items()}
+            }
+    finally:
+        sketches.close()
+    return {'first_day': first_day.isoformat(), 'last_day': last_day.isoformat(), 'metrics': metrics}
+
+
+def generate_recommendations(analysis: Dict[str, Any], days_back: int = 7) -> List[str]:
     """Generate actionable improvement recommendations"""
     recommendations = []
     
@@ -198,7 +452,7 @@ def generate_recommendations(analysis: Dict[str, Any]) -> List[str]:
     # LLM effectiveness
     if analysis['llm_usage']['enabled']:
         llm = analysis['llm_usage']
-        weekly_cost = llm['total_cost']
+        weekly_cost = llm['total_cost'] * 7 / days_back
         monthly_projection = weekly_cost * 4.3
         
         if monthly_projection > 15:
@@ -237,15 +491,18 @@ def generate_recommendations(analysis: Dict[str, Any]) -> List[str]:
         )
     
     if not recommendations:
-        recommendations.append("✅ **All systems healthy**: No major issues detected this week.")
+        recommendations.append(f"✅ **All systems healthy**: No major issues detected {period_label(days_back)}.")
     
     return recommendations
 
 
-def generate_report(analysis: Dict[str, Any], recommendations: List[str]) -> str:
+def generate_report(analysis: Dict[str, Any], recommendations: List[str], days_back: int = 7) -> str:
     """Generate markdown report"""
     report = []
-    report.append("# 📊 SaaS Hunter - Weekly Data Quality Report")
+    if days_back == 7:
+        report.append("# 📊 SaaS Hunter - Weekly Data Quality Report")
+    else:
+        report.append(f"# 📊 SaaS Hunter - Data Quality Report (last {days_back} days)")
     report.append(f"\n**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}\n")
     
     # Overview
@@ -269,6 +526,26 @@ def generate_report(analysis: Dict[str, Any], recommendations: List[str]) -> str
         report.append(f"- {bucket}: {count} ({pct:.1f}%)")
     report.append("")
     
+    # Percentiles from the daily sketches
+    sketched = analysis.get('percentiles')
+    if sketched and sketched['metrics']['score']['all']['count']:
+        def triple(result):
+            return f"{result['p50']} / {result['p90']} / {result['p99']}"
+        
+        report.append("## 📐 Percentiles (p50 / p90 / p99)")
+        report.append(f"_Daily sketches, {sketched['first_day']} to {sketched['last_day']}_\n")
+        for metric, label in METRICS.items():
+            overall = sketched['metrics'][metric]['all']
+            if overall['count']:
+                report.append(f"- **{label}**: {triple(overall)} (n={overall['count']})")
+        for source, result in sorted(sketched['metrics']['score']['sources'].items()):
+            line = f"- {source}: score {triple(result)}"
+            engagement = sketched['metrics']['engagement']['sources'].get(source)
+            if engagement:
+                line += f", engagement {triple(engagement)}"
+            report.append(line)
+        report.append("")
+    
     # Source quality
     report.append("## 🔍 Source Quality")
     source_stats = analysis['source_quality']
@@ -301,7 +578,7 @@ def generate_report(analysis: Dict[str, Any], recommendations: List[str]) -> str
         report.append(f"- **Max increase**: {llm['score_changes']['max_increase']:+.1f}")
         report.append(f"- **Max decrease**: {llm['score_changes']['max_decrease']:+.1f}")
         
-        monthly_cost = llm['total_cost'] * 4.3
+        monthly_cost = llm['total_cost'] * 7 / days_back * 4.3
         report.append(f"- **Monthly projection**: ${monthly_cost:.2f}")
         report.append("")
     
@@ -314,41 +591,44 @@ def generate_report(analysis: Dict[str, Any], recommendations: List[str]) -> str
 
 
 def main():
-    """Run weekly review"""
+    """Run weekly (or --days N) review"""
+    parser = argparse.ArgumentParser(description='Data quality review of recent opportunities')
+    parser.add_argument('--days', type=int, default=7, help='Review window in days (30 monthly, 90 quarterly)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes analyzing day partitions in parallel')
+    args = parser.parse_args()
+    
     logger.info("=" * 60)
-    logger.info("Weekly Data Quality Review")
+    logger.info("Weekly Data Quality Review" if args.days == 7 else f"{args.days}-Day Data Quality Review")
     logger.info("=" * 60)
     
-    # Load data
-    logger.info("Loading opportunities from past 7 days...")
-    opps = load_opportunities_from_week(days_back=7)
-    logger.info(f"Loaded {len(opps)} opportunities")
+    logger.info(f"Analyzing opportunities from past {args.days} days...")
+    analysis = rollup_analyses(args.days)
+    if analysis is None:
+        # No usable rollups: stream each day's opportunities through every analysis once, merging the partial results
+        logger.info("Daily rollups unavailable for this window, analyzing from the opportunity store")
+        analysis = run_analyses(args.days, args.workers)
+    logger.info(f"Analyzed {analysis['score_distribution']['total']} opportunities")
+    analysis['percentiles'] = sketch_percentiles(args.days)
     
-    if not opps:
+    if not analysis['score_distribution']['total']:
         logger.warning("No opportunities found for review period")
         print("⚠️ No data to review")
         return
     
-    # Run analyses
-    logger.info("Running analyses...")
-    analysis = {
-        'source_quality': analyze_source_quality(opps),
-        'score_distribution': analyze_score_distribution(opps),
-        'llm_usage': analyze_llm_usage(opps),
-        'engagement_patterns': analyze_engagement_patterns(opps),
-        'domains': analyze_domains(opps)
-    }
-    
     # Generate recommendations
     logger.info("Generating recommendations...")
-    recommendations = generate_recommendations(analysis)
+    recommendations = generate_recommendations(analysis, args.days)
     
     # Generate report
-    report = generate_report(analysis, recommendations)
+    report = generate_report(analysis, recommendations, args.days)
     
     # Save report
     timestamp = datetime.now().strftime('%Y%m%d')
-    report_file = REPORTS_DIR / f'weekly_review_{timestamp}.md'
+    if args.days == 7:
+        report_file = REPORTS_DIR / f'weekly_review_{timestamp}.md'
+    else:
+        report_file = REPORTS_DIR / f'review_{args.days}d_{timestamp}.md'
     
     with open(report_file, 'w') as f:
         f.write(report)
@@ -357,7 +637,7 @@ def main():
     logger.info("=" * 60)
     
     # Print summary
-    print(f"✅ Weekly review complete")
+    print(f"✅ Review complete ({args.days} days)")
     print(f"📄 Report: {report_file}")
     print(f"\n{len(recommendations)} recommendations:")
     for rec in recommendations:
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Scripts are flat modules run from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
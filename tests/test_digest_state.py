@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import digest_state
+from digest_state import DigestState, floor_hour, load_summary
+from opportunity_store import OpportunityStore
+
+
+def make_opportunities(start, count):
+    return [{
+        'opportunity_id': f'opp{i}',
+        'processed_at': (start + timedelta(minutes=7 * i)).isoformat(),
+        'score': (i * 37) % 100,
+        'source': 'hackernews' if i % 2 else 'reddit:SaaS',
+        'domain': ['finance', 'development', 'other'][i % 3],
+        'title': f'Sick of tool {i}' if i % 4 == 0 else f'Looking for tool {i}',
+        'body': 'frustrated with pricing' if i % 5 == 0 else 'details',
+        'url': f'https://example.com/{i}'
+    } for i in range(count)]
+
+
+def rendered(summary):
+    """What the digest and Telegram show from a summary"""
+    ranking = summary.ranking
+    return {
+        'tiers': {name: ranking.tier(name) for name in ranking.tier_top},
+        'top': ranking.top.items(),
+        'counts': (ranking.total, ranking.tier_counts, ranking.cutoff_counts, ranking.average, ranking.max_score),
+        'domains': summary.domains.most_common(),
+        'keywords': summary.keywords.most_common()
+    }
+
+
+def test_state_and_store_paths_summarize_the_same_window(tmp_path, monkeypatch):
+    now = datetime.now()
+    opps = make_opportunities(floor_hour(now) - timedelta(hours=5), 40)
+    opps = [opp for opp in opps if opp['processed_at'] <= now.isoformat()]
+
+    state_file = tmp_path / 'digest_state.json'
+    state = DigestState(state_file)
+    state.started_at = now - timedelta(hours=6)
+    for opp in opps:
+        state.add(opp)
+    state.save()
+
+    store = OpportunityStore(tmp_path / 'opportunities.db')
+    store.upsert_many(opps)
+    store.close()
+
+    monkeypatch.setattr(digest_state, 'DigestState', lambda: DigestState(state_file))
+    monkeypatch.setattr(digest_state, 'OpportunityStore', lambda: OpportunityStore(tmp_path / 'opportunities.db'))
+
+    # Mid-hour, with opportunities earlier in the same hour
+    since = floor_hour(now) - timedelta(hours=3) + timedelta(minutes=31)
+    from_state = load_summary(since)
+
+    monkeypatch.setattr(DigestState, 'covers', lambda self, since, now=None: False)
+    from_store = load_summary(since)
+
+    assert from_state.total > 0
+    assert rendered(from_store) == rendered(from_state)
@@ -0,0 +1,93 @@
+import pytest
+
+import llm_scorer
+from llm_cache import LLMCache
+from llm_retry import CallStats, CircuitBreaker, UsageTotals
+
+
+BATCH_USAGE = {'input_tokens': 4000, 'output_tokens': 600, 'total_tokens': 4600, 'model': 'test'}
+SINGLE_USAGE = {'input_tokens': 800, 'output_tokens': 100, 'total_tokens': 900, 'model': 'test'}
+
+
+def test_unparseable_batch_reply_is_still_charged(monkeypatch):
+    calls = []
+
+    def fake_call(prompt, max_tokens=500):
+        calls.append(prompt)
+        usage = BATCH_USAGE if len(calls) == 1 else SINGLE_USAGE
+        return 'Sorry, I cannot help with that.', dict(usage)
+
+    monkeypatch.setattr(llm_scorer, 'call_openrouter', fake_call)
+    monkeypatch.setattr(llm_scorer, 'get_cache', lambda: None)
+    monkeypatch.setattr(llm_scorer, 'UNATTRIBUTED_USAGE', UsageTotals())
+
+    items = [(50, {'title': f'Opportunity {i}', 'body': 'text', 'source': 'hackernews'}) for i in range(3)]
+    results = llm_scorer.enhanced_score_batch(items)
+
+    assert results == [(50, None)] * 3
+    assert len(calls) == 4  # the batch, then each item alone
+    usage = llm_scorer.UNATTRIBUTED_USAGE.snapshot()
+    expected_cost = llm_scorer.calculate_cost(BATCH_USAGE) + 3 * llm_scorer.calculate_cost(SINGLE_USAGE)
+    assert usage['calls'] == 4
+    assert usage['total_tokens'] == BATCH_USAGE['total_tokens'] + 3 * SINGLE_USAGE['total_tokens']
+    assert abs(usage['cost_usd'] - expected_cost) < 1e-12
+
+
+def test_single_and_batch_analyses_are_cached_apart(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / 'llm_cache.db')
+    monkeypatch.setattr(llm_scorer, 'get_cache', lambda: cache)
+    monkeypatch.setattr(llm_scorer, 'call_openrouter', lambda prompt, max_tokens=500: (
+        '{"llm_score": 70, "reasoning": "Clear pain", "signals": ["pricing"]}', dict(SINGLE_USAGE)))
+    opp = {'title': 'Invoicing for contractors', 'body': 'text', 'source': 'hackernews'}
+
+    assert 'cached' not in llm_scorer.enhanced_score(50, opp)[1]
+
+    assert llm_scorer.enhanced_score(50, opp)[1]['cached']
+    assert llm_scorer._cached_score(50, opp, batched=True) is None
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'choices': [{'message': {'content': 'ok'}}], 'usage': {}}
+
+
+def open_breaker(monkeypatch, statuses):
+    """Open the breaker, past its cooldown, and answer calls with statuses in order"""
+    breaker = CircuitBreaker(threshold=1, cooldown=0)
+    breaker.record_failure()
+    monkeypatch.setattr(llm_scorer, 'CIRCUIT_BREAKER', breaker)
+    monkeypatch.setattr(llm_scorer, 'CALL_STATS', CallStats())
+    monkeypatch.setattr(llm_scorer, 'OPENROUTER_API_KEY', 'test')
+    monkeypatch.setattr(llm_scorer, 'LLM_MAX_RETRIES', 2)
+    monkeypatch.setattr(llm_scorer, 'backoff_delay', lambda attempt, retry_after=None: 0)
+    responses = iter(statuses)
+    monkeypatch.setattr(llm_scorer, 'http_post', lambda *args, **kwargs: FakeResponse(next(responses)))
+    return breaker
+
+
+def test_half_open_trial_retries_a_retryable_error(monkeypatch):
+    breaker = open_breaker(monkeypatch, [429, 503, 200])
+
+    content, _ = llm_scorer.call_openrouter('prompt')
+
+    assert content == 'ok'
+    assert not breaker.is_open
+    assert llm_scorer.CALL_STATS.snapshot()['retries'] == 2
+
+
+def test_failed_half_open_trial_reopens_the_breaker(monkeypatch):
+    breaker = open_breaker(monkeypatch, [429, 429, 429])
+
+    with pytest.raises(Exception, match='HTTP 429'):
+        llm_scorer.call_openrouter('prompt')
+
+    assert breaker.is_open
+    assert breaker.open_count == 2
+    assert breaker.allow()  # the next trial is let through after the cooldown
@@ -0,0 +1,20 @@
+from opportunity_store import OpportunityStore
+
+
+def opportunity(opportunity_id, source):
+    return {'opportunity_id': opportunity_id, 'processed_at': '2026-10-01T12:00:00', 'score': 50,
+            'source': source, 'domain': 'other', 'title': 'Invoicing for contractors', 'body': 'text'}
+
+
+def test_search_source_prefix_is_literal(tmp_path):
+    store = OpportunityStore(tmp_path / 'opportunities.db')
+    store.upsert_many([
+        opportunity('a', 'reddit_x:SaaS'),
+        opportunity('b', 'redditax:SaaS'),
+        opportunity('c', 'reddit_x'),
+    ])
+
+    found = {hit['opportunity']['opportunity_id'] for hit in store.search('invoicing', source='reddit_x')}
+    store.close()
+
+    assert found == {'a', 'c'}
@@ -0,0 +1,12 @@
+from similarity import TitleIndex
+
+
+def test_short_titles_match_without_a_shared_trigram():
+    index = TitleIndex(75)
+    index.add('crm')
+    assert index.is_similar('cm')
+
+    index = TitleIndex(75)
+    index.add('cm')
+    assert index.is_similar('crm')
+    assert not index.is_similar('invoicing for contractors')